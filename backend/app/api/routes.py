@@ -11,7 +11,7 @@ from backend.app.db.session import get_db
 from backend.app.models.incentive import Incentive, IncentiveEmbedding
 from backend.app.models.company import Company, CompanyEmbedding
 from backend.app.services.matching_service import MatchingService, MatchResult
-from backend.app.services.openai_client import ManagedOpenAIClient
+from backend.app.services.openai_client import get_client
 from backend.app.api.models import (
     IncentiveResponse, CompanyResponse, MatchingRequest, MatchingResponse,
     IncentiveListResponse, CompanyListResponse, HealthResponse, MatchResult as APIMatchResult,
@@ -22,7 +22,7 @@ from backend.app.api.models import (
 router = APIRouter()
 
 # Initialize services
-openai_client = ManagedOpenAIClient()
+openai_client = get_client()
 matching_service = MatchingService(openai_client=openai_client)
 
 # Import RAG service
@@ -12,6 +12,9 @@ from backend.app.models import (
     IncentiveEmbedding,
     Company,
     CompanyEmbedding,
+    CompanyBM25Weight,
+    CompanyDocumentFrequency,
+    CompanyBM25Stats,
     AwardedCase,
 )
 
@@ -38,6 +41,23 @@ def init_db() -> None:
         Base.metadata.create_all(bind=engine)
         logger.info("database_tables_created")
         
+        # create_all skips tables that already exist, so add any nullable
+        # columns and indexes introduced after those tables were created
+        with engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                for column in table.columns:
+                    if column.nullable and not column.primary_key:
+                        conn.execute(text(
+                            f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS "
+                            f"{column.name} {column.type.compile(dialect=engine.dialect)}"
+                        ))
+        logger.info("database_columns_created")
+        
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+        logger.info("database_indexes_created")
+        
         logger.info("database_init_completed")
         
     except Exception as e:
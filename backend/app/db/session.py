@@ -5,8 +5,9 @@ Database session management and connection.
 import os
 from typing import Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
+from pgvector.psycopg import register_vector
 
 # Get database URL from environment
 DATABASE_URL = os.getenv(
@@ -21,6 +22,17 @@ engine = create_engine(
     echo=os.getenv("SQL_ECHO", "false").lower() == "true",  # Log SQL queries if enabled
 )
 
+
+@event.listens_for(engine, "connect")
+def _register_vector_types(dbapi_connection, connection_record):
+    """Let psycopg bind numpy arrays as `vector` and load vectors as arrays."""
+    try:
+        register_vector(dbapi_connection)
+    except Exception:
+        # pgvector extension not created yet (e.g. before init_db)
+        dbapi_connection.rollback()
+
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
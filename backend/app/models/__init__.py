@@ -1,7 +1,13 @@
 """Database models."""
 
 from backend.app.models.incentive import Incentive, IncentiveEmbedding
-from backend.app.models.company import Company, CompanyEmbedding
+from backend.app.models.company import (
+    Company,
+    CompanyEmbedding,
+    CompanyBM25Weight,
+    CompanyDocumentFrequency,
+    CompanyBM25Stats,
+)
 from backend.app.models.awarded_case import AwardedCase
 
 __all__ = [
@@ -9,5 +15,8 @@ __all__ = [
     "IncentiveEmbedding",
     "Company",
     "CompanyEmbedding",
+    "CompanyBM25Weight",
+    "CompanyDocumentFrequency",
+    "CompanyBM25Stats",
     "AwardedCase",
 ]
@@ -4,12 +4,13 @@ Company database models.
 
 from typing import Optional
 
-from sqlalchemy import String, Text, ARRAY, CheckConstraint, Index, ForeignKey
+from sqlalchemy import String, Text, Float, Integer, ARRAY, CheckConstraint, Index, ForeignKey, text, LargeBinary, event
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from pgvector.sqlalchemy import Vector
 
 from backend.app.db.base import Base
+from backend.app.models.embedding_text import company_embedding_text, text_digest
 
 
 class Company(Base):
@@ -40,6 +41,10 @@ class Company(Base):
     website: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     raw: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
     
+    # Text embedded for this row and its digest, kept in sync on insert/update
+    embedding_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    embedding_text_sha256: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    
     # Relationship to embedding
     embedding: Mapped[Optional["CompanyEmbedding"]] = relationship(
         "CompanyEmbedding",
@@ -57,6 +62,14 @@ class Company(Base):
         return f"<Company(id={self.company_id}, name={self.name})>"
 
 
+@event.listens_for(Company, "before_insert")
+@event.listens_for(Company, "before_update")
+def _set_embedding_text(mapper, connection, target: Company) -> None:
+    """Store the embedding text (and its digest) built from the row's fields."""
+    target.embedding_text = company_embedding_text(target)
+    target.embedding_text_sha256 = text_digest(target.embedding_text)
+
+
 class CompanyEmbedding(Base):
     """Company embeddings for vector search."""
     
@@ -69,12 +82,86 @@ class CompanyEmbedding(Base):
     )
     embedding: Mapped[Optional[list[float]]] = mapped_column(Vector(1536), nullable=True)
     
+    # Digest of the text the embedding was computed from (stale if it differs
+    # from the parent's embedding_text_sha256)
+    text_sha256: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    
     # Relationship
     company: Mapped["Company"] = relationship(
         "Company",
         back_populates="embedding"
     )
     
+    # ANN index for cosine distance (<=>) ordering, built over a half-precision
+    # copy of the embedding: half the index size and memory traffic per probe
+    __table_args__ = (
+        Index(
+            "idx_company_embeddings_hnsw_half",
+            text("(embedding::halfvec(1536)) halfvec_cosine_ops"),
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+        ),
+    )
+    
     def __repr__(self) -> str:
         return f"<CompanyEmbedding(company_id={self.company_id})>"
 
+
+
+class CompanyBM25Weight(Base):
+    """
+    Precomputed BM25 term weights per company.
+    
+    Each row holds the full Lucene BM25 contribution (TF saturation,
+    length normalization and IDF) of one token in one company document,
+    so a query is scored by summing weights of its tokens.
+    """
+    
+    __tablename__ = "company_bm25_weights"
+    
+    # Token first so lookups by query token use the primary key index
+    token: Mapped[str] = mapped_column(Text, primary_key=True)
+    company_id: Mapped[str] = mapped_column(
+        String,
+        ForeignKey("companies.company_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    weight: Mapped[float] = mapped_column(Float, nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<CompanyBM25Weight(token={self.token}, company_id={self.company_id})>"
+
+
+class CompanyDocumentFrequency(Base):
+    """
+    Number of company documents containing each token.
+    
+    Written by the BM25 index job; used to compute IDF for the
+    per-candidate BM25 fallback.
+    """
+    
+    __tablename__ = "company_df"
+    
+    token: Mapped[str] = mapped_column(Text, primary_key=True)
+    df: Mapped[int] = mapped_column(Integer, nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<CompanyDocumentFrequency(token={self.token}, df={self.df})>"
+
+
+class CompanyBM25Stats(Base):
+    """
+    Corpus statistics of the last BM25 index build (a single row).
+    
+    Lets the per-candidate BM25 fallback use the same IDF and length
+    normalization as the precomputed weights.
+    """
+    
+    __tablename__ = "company_bm25_stats"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+    documents: Mapped[int] = mapped_column(Integer, nullable=False)
+    avg_doc_len: Mapped[float] = mapped_column(Float, nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<CompanyBM25Stats(documents={self.documents}, avg_doc_len={self.avg_doc_len})>"
@@ -0,0 +1,117 @@
+"""
+Text representations of incentives and companies used for embeddings.
+
+Stored on the rows themselves (kept in sync by mapper events), so batch
+embedding runs read the text instead of rebuilding it, and can tell from its
+digest which embeddings are stale.
+"""
+
+import hashlib
+from itertools import chain
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+
+if TYPE_CHECKING:
+    from backend.app.models.company import Company
+    from backend.app.models.incentive import Incentive
+
+# Postgres channel notified when rows get a new or changed embedding text
+# (listened to by the embedding worker)
+EMBEDDINGS_CHANNEL = "embeddings_todo"
+
+
+def text_digest(text: str) -> bytes:
+    """SHA-256 digest of an embedding text."""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def incentive_embedding_text(incentive: "Incentive") -> str:
+    """
+    Create text representation of incentive for embedding.
+    
+    Combines title, description, and AI-extracted fields.
+    
+    Args:
+        incentive: Incentive model instance
+    
+    Returns:
+        Text for embedding
+    """
+    parts = [
+        f"Título: {incentive.title}",
+    ]
+    
+    if incentive.description:
+        parts.append(f"Descrição: {incentive.description[:500]}")  # Truncate long descriptions
+    
+    if incentive.ai_description:
+        ai_desc = incentive.ai_description
+        
+        if ai_desc.get("caes"):
+            parts.append(f"CAE: {', '.join(ai_desc['caes'])}")
+        
+        if ai_desc.get("geographic_location"):
+            parts.append(f"Localização: {ai_desc['geographic_location']}")
+        
+        if ai_desc.get("company_size"):
+            parts.append(f"Tamanho de empresa: {', '.join(ai_desc['company_size'])}")
+        
+        if ai_desc.get("investment_objectives"):
+            parts.append(f"Objetivos: {', '.join(ai_desc['investment_objectives'])}")
+        
+        if ai_desc.get("specific_purposes"):
+            parts.append(f"Finalidades: {', '.join(ai_desc['specific_purposes'][:3])}")  # Top 3
+    
+    return "\n".join(parts)
+
+
+def company_embedding_text(company: "Company") -> str:
+    """
+    Create text representation of company for embedding.
+    
+    Args:
+        company: Company model instance
+    
+    Returns:
+        Text for embedding
+    """
+    parts = [f"Empresa: {company.name}"]
+    
+    if company.cae_codes:
+        parts.append(f"CAE: {', '.join(company.cae_codes)}")
+    
+    if company.district:
+        location_parts = [company.district]
+        if company.county:
+            location_parts.append(company.county)
+        parts.append(f"Localização: {', '.join(location_parts)}")
+    
+    if company.size:
+        parts.append(f"Tamanho: {company.size}")
+    
+    return "\n".join(parts)
+
+
+@event.listens_for(Session, "after_flush")
+def _notify_embedding_worker(session: Session, flush_context: Any) -> None:
+    """
+    Wake the embedding worker when a flush writes a new or changed text.
+    
+    NOTIFY is transactional: delivered on commit, dropped on rollback, and
+    sent once per transaction however many rows changed.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    
+    for obj in chain(session.new, session.dirty):
+        state = inspect(obj)
+        if (
+            "embedding_text_sha256" in state.mapper.attrs
+            and state.attrs.embedding_text_sha256.history.has_changes()
+        ):
+            session.connection().execute(
+                text("SELECT pg_notify(:channel, '')"), {"channel": EMBEDDINGS_CHANNEL}
+            )
+            return
@@ -6,12 +6,13 @@ from datetime import datetime, date
 from decimal import Decimal
 from typing import Optional
 
-from sqlalchemy import String, Text, Date, Numeric, TIMESTAMP, ARRAY, Index, ForeignKey
+from sqlalchemy import String, Text, Date, Numeric, TIMESTAMP, ARRAY, Index, ForeignKey, LargeBinary, event, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from pgvector.sqlalchemy import Vector
 
 from backend.app.db.base import Base
+from backend.app.models.embedding_text import incentive_embedding_text, text_digest
 
 
 class Incentive(Base):
@@ -39,6 +40,10 @@ class Incentive(Base):
     # Source
     source_link: Mapped[str] = mapped_column(Text, nullable=False)
     
+    # Text embedded for this row and its digest, kept in sync on insert/update
+    embedding_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    embedding_text_sha256: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True),
@@ -70,6 +75,14 @@ class Incentive(Base):
         return f"<Incentive(id={self.incentive_id}, title={self.title[:50]})>"
 
 
+@event.listens_for(Incentive, "before_insert")
+@event.listens_for(Incentive, "before_update")
+def _set_embedding_text(mapper, connection, target: Incentive) -> None:
+    """Store the embedding text (and its digest) built from the row's fields."""
+    target.embedding_text = incentive_embedding_text(target)
+    target.embedding_text_sha256 = text_digest(target.embedding_text)
+
+
 class IncentiveEmbedding(Base):
     """Incentive embeddings for vector search."""
     
@@ -82,12 +95,27 @@ class IncentiveEmbedding(Base):
     )
     embedding: Mapped[Optional[list[float]]] = mapped_column(Vector(1536), nullable=True)
     
+    # Digest of the text the embedding was computed from (stale if it differs
+    # from the parent's embedding_text_sha256)
+    text_sha256: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    
     # Relationship
     incentive: Mapped["Incentive"] = relationship(
         "Incentive",
         back_populates="embedding"
     )
     
+    # ANN index for cosine distance (<=>) ordering over a half-precision copy
+    # of the embedding, as for company embeddings
+    __table_args__ = (
+        Index(
+            "idx_incentive_embeddings_hnsw_half",
+            text("(embedding::halfvec(1536)) halfvec_cosine_ops"),
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+        ),
+    )
+    
     def __repr__(self) -> str:
         return f"<IncentiveEmbedding(incentive_id={self.incentive_id})>"
 
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Script para construir o índice BM25 das empresas.
+
+Este script:
+1. Tokeniza o documento de cada empresa (nome, CAE, descrição, distrito)
+2. Calcula TF, comprimento médio dos documentos e IDF sobre o corpus
+3. Grava os pesos BM25 por (token, empresa) em company_bm25_weights
+
+Deve ser executado depois de carregar ou atualizar empresas.
+
+Usage:
+    python -m backend.app.scripts.build_bm25_index
+"""
+
+import sys
+from pathlib import Path
+
+import structlog
+from dotenv import load_dotenv
+
+# Add project root to sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+load_dotenv()
+
+from backend.app.db.session import SessionLocal
+from backend.app.services.bm25_index import build_company_bm25_index
+
+logger = structlog.get_logger()
+
+
+def main():
+    """Main function."""
+    print("\n" + "="*60)
+    print("BUILDING COMPANY BM25 INDEX")
+    print("="*60 + "\n")
+    
+    db = SessionLocal()
+    try:
+        stats = build_company_bm25_index(db)
+        
+        print(f"\n✅ BM25 Index Built!")
+        print(f"   Documents: {stats['documents']}")
+        print(f"   Unique tokens: {stats['tokens']}")
+        print(f"   Weight rows: {stats['rows']}")
+        print(f"   Avg document length: {stats['avg_doc_len']:.1f}")
+        
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrupted by user")
+        db.rollback()
+        sys.exit(1)
+    
+    except Exception as e:
+        print(f"\n\n❌ Error: {e}")
+        logger.error("script_failed", error=str(e), exc_info=True)
+        db.rollback()
+        sys.exit(1)
+    
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
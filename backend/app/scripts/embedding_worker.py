@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Worker que gera embeddings fora do caminho de escrita.
+
+Este script:
+1. Gera os embeddings em falta ou desatualizados (incentivos e empresas)
+2. Fica à escuta no canal Postgres embeddings_todo, notificado no commit de
+   linhas com texto de embedding novo ou alterado
+3. Repete a cada notificação (ou a cada --poll-interval segundos)
+
+Os scripts de carregamento só escrevem as linhas; os pedidos à OpenAI são
+feitos aqui, em lotes.
+
+Usage:
+    python -m backend.app.scripts.embedding_worker [--batch-size N] [--poll-interval SEC] [--once]
+"""
+
+import sys
+import argparse
+import select
+from pathlib import Path
+
+import psycopg
+import structlog
+from dotenv import load_dotenv
+
+# Add project root to sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+load_dotenv()
+
+from backend.app.db.session import engine
+from backend.app.models.embedding_text import EMBEDDINGS_CHANNEL
+from scraper.extractors.embedding_service import EmbeddingService
+
+logger = structlog.get_logger()
+
+
+def run_worker(batch_size: int = 64, poll_interval: float = 300.0, once: bool = False) -> None:
+    """
+    Generate missing embeddings, then again whenever rows change.
+    
+    Args:
+        batch_size: Texts per embeddings request
+        poll_interval: Seconds to wait for a notification before a pass anyway
+            (picks up rows whose embedding failed in an earlier pass)
+        once: Run a single pass and return
+    """
+    embedding_service = EmbeddingService()
+    
+    # Plain psycopg connection: LISTEN needs a connection outside the pool
+    dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    with psycopg.connect(dsn, autocommit=True) as listen_conn:
+        # Listen before the first pass, so rows committed during it wake the
+        # next one
+        listen_conn.execute(f"LISTEN {EMBEDDINGS_CHANNEL}")
+        logger.info("embedding_worker_started", batch_size=batch_size, poll_interval=poll_interval)
+        
+        while True:
+            stats = embedding_service.embed_all(batch_size=batch_size)
+            logger.info("embedding_worker_pass_completed", **{
+                f"{kind}_{key}": value
+                for kind, kind_stats in stats.items()
+                for key, value in kind_stats.items()
+            })
+            
+            if once:
+                return
+            
+            # Sleep until notified (or the poll interval passes); the query
+            # reads and discards the pending notifications, however many
+            if select.select([listen_conn], [], [], poll_interval)[0]:
+                listen_conn.execute("SELECT 1")
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Generate embeddings in the background")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=64,
+        help="Texts per embeddings request"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=300.0,
+        help="Seconds between passes when no notification arrives"
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Run a single pass and exit"
+    )
+    
+    args = parser.parse_args()
+    
+    try:
+        run_worker(batch_size=args.batch_size, poll_interval=args.poll_interval, once=args.once)
+    
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrupted by user")
+        sys.exit(1)
+    
+    except Exception as e:
+        print(f"\n\n❌ Error: {e}")
+        logger.error("script_failed", error=str(e), exc_info=True)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
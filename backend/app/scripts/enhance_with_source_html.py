@@ -30,7 +30,7 @@ load_dotenv()
 from backend.app.db.session import SessionLocal
 from backend.app.models.incentive import Incentive
 from scraper.extractors.llm_extractor import LLMExtractor
-from backend.app.services.openai_client import ManagedOpenAIClient
+from backend.app.services.openai_client import get_client
 from backend.app.services.document_cost_tracker import document_cost_tracker
 
 logger = structlog.get_logger()
@@ -201,7 +201,7 @@ def main():
     print("\n🔄 Melhorando incentivos com HTML das páginas fonte...\n")
     
     # Initialize OpenAI client and extractor
-    openai_client = ManagedOpenAIClient()
+    openai_client = get_client()
     llm_extractor = LLMExtractor(openai_client=openai_client)
     
     with SessionLocal() as db:
@@ -20,8 +20,8 @@ import structlog
 from sqlalchemy.orm import Session
 
 from backend.app.db.session import SessionLocal
-from backend.app.models import Incentive
-from backend.app.services.openai_client import ManagedOpenAIClient
+from backend.app.models import Incentive, IncentiveEmbedding
+from backend.app.services.openai_client import get_client
 from scraper.extractors.llm_extractor import LLMExtractor
 from scraper.extractors.embedding_service import EmbeddingService
 
@@ -55,7 +55,7 @@ def extract_ai_descriptions(
         Statistics dict
     """
     # Initialize services
-    openai_client = ManagedOpenAIClient(max_per_request_eur=0.30)
+    openai_client = get_client(max_per_request_eur=0.30)
     extractor = LLMExtractor(openai_client=openai_client)
     
     # Get incentives to process
@@ -157,7 +157,7 @@ def generate_embeddings(
     Returns:
         Statistics dict
     """
-    openai_client = ManagedOpenAIClient(max_per_request_eur=0.30)
+    openai_client = get_client(max_per_request_eur=0.30)
     embedding_service = EmbeddingService(openai_client=openai_client)
     
     logger.info("embedding_generation_started")
@@ -172,6 +172,11 @@ def generate_embeddings(
     
     incentives = incentives.all()
     
+    # Ids that already have an embedding, fetched once instead of per row
+    existing_ids = None if force else {
+        incentive_id for (incentive_id,) in db.query(IncentiveEmbedding.incentive_id)
+    }
+    
     success_count = 0
     failed_count = 0
     
@@ -179,7 +184,8 @@ def generate_embeddings(
         try:
             document_id = f"incentive_{incentive.incentive_id}"
             result = embedding_service.generate_incentive_embedding(
-                db, incentive, force_refresh=force, document_id=document_id
+                db, incentive, force_refresh=force, document_id=document_id,
+                existing_ids=existing_ids, commit=False
             )
             if result:
                 success_count += 1
@@ -192,6 +198,12 @@ def generate_embeddings(
                 error=str(e)
             )
             failed_count += 1
+        
+        # One commit per batch of rows instead of one per embedding
+        if i % 50 == 0:
+            db.commit()
+    
+    db.commit()
     
     stats = {
         "total": len(incentives),
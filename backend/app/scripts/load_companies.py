@@ -5,11 +5,12 @@ Script para carregar dados das empresas do CSV para a base de dados.
 Este script:
 1. Lê o ficheiro companies_sample.csv
 2. Normaliza os dados (CAE codes, localização, tamanho)
-3. Gera embeddings para as empresas
-4. Carrega tudo na base de dados
+3. Carrega tudo na base de dados
+4. Gera os embeddings das empresas em lotes (ou deixa-os para o
+   embedding_worker, com --skip-embeddings)
 
 Usage:
-    python -m backend.app.scripts.load_companies [--csv-path PATH] [--limit N]
+    python -m backend.app.scripts.load_companies [--csv-path PATH] [--limit N] [--skip-embeddings]
 """
 
 import sys
@@ -30,7 +31,6 @@ load_dotenv()
 
 from backend.app.db.session import SessionLocal
 from backend.app.models.company import Company, CompanyEmbedding
-from backend.app.services.openai_client import ManagedOpenAIClient
 from scraper.extractors.embedding_service import EmbeddingService
 
 logger = structlog.get_logger()
@@ -211,10 +211,6 @@ def load_companies_from_csv(
     """
     logger.info("loading_companies_started", csv_path=csv_path, limit=limit, force=force)
     
-    # Initialize services
-    openai_client = ManagedOpenAIClient()
-    embedding_service = EmbeddingService(openai_client)
-    
     with SessionLocal() as db:
         # Check if companies already exist
         existing_count = db.query(Company).count()
@@ -225,7 +221,6 @@ def load_companies_from_csv(
                 'loaded': 0,
                 'skipped': existing_count,
                 'errors': 0,
-                'total_cost_eur': 0.0
             }
         
         # Clear existing data if force
@@ -239,7 +234,6 @@ def load_companies_from_csv(
         companies_loaded = 0
         companies_skipped = 0
         companies_errors = 0
-        total_cost = 0.0
         
         try:
             with open(csv_path, 'r', encoding='utf-8') as f:
@@ -344,21 +338,10 @@ def load_companies_from_csv(
                             companies_skipped += 1
                             continue
                         
-                        # Save company
+                        # Save company (embedded afterwards, in batches)
                         db.add(company)
                         db.flush()  # Get the ID
                         
-                        # Generate embedding
-                        document_id = f"company_{company.company_id}"
-                        embedding_result = embedding_service.generate_company_embedding(
-                            db, company, force_refresh=True
-                        )
-                        
-                        if embedding_result:
-                            # Get cost for this company from the embedding result
-                            cost = embedding_result.cost_eur if hasattr(embedding_result, 'cost_eur') else 0.0
-                            total_cost += cost
-                        
                         companies_loaded += 1
                         
                         if companies_loaded % 100 == 0:
@@ -382,15 +365,13 @@ def load_companies_from_csv(
                 logger.info("companies_loading_complete",
                           total_loaded=companies_loaded,
                           total_skipped=companies_skipped,
-                          total_errors=companies_errors,
-                          total_cost_eur=total_cost)
+                          total_errors=companies_errors)
                 
                 return {
                     'total': companies_loaded + companies_skipped + companies_errors,
                     'loaded': companies_loaded,
                     'skipped': companies_skipped,
                     'errors': companies_errors,
-                    'total_cost_eur': total_cost
                 }
                 
         except Exception as e:
@@ -418,6 +399,11 @@ def main():
         action="store_true",
         help="Force reload even if companies exist"
     )
+    parser.add_argument(
+        "--skip-embeddings",
+        action="store_true",
+        help="Skip embedding generation (left to the embedding worker)"
+    )
     
     args = parser.parse_args()
     
@@ -437,7 +423,21 @@ def main():
         print(f"   Loaded: {stats['loaded']}")
         print(f"   Skipped: {stats['skipped']}")
         print(f"   Errors: {stats['errors']}")
-        print(f"   Cost: €{stats['total_cost_eur']:.4f}")
+        
+        # Embed every company still without an up-to-date embedding, one
+        # request per batch instead of one per loaded row
+        if not args.skip_embeddings:
+            print("\n" + "="*60)
+            print("GENERATING COMPANY EMBEDDINGS")
+            print("="*60 + "\n")
+            
+            with SessionLocal() as db:
+                embedding_stats = EmbeddingService().generate_batch_company_embeddings(db)
+            
+            print(f"\n✅ Embedding Generation Complete!")
+            print(f"   Total: {embedding_stats['total']}")
+            print(f"   Success: {embedding_stats['success']}")
+            print(f"   Failed: {embedding_stats['failed']}")
         
     except KeyboardInterrupt:
         print("\n\n⚠️  Interrupted by user")
@@ -21,7 +21,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 from backend.app.db.session import SessionLocal
 from backend.app.models.incentive import Incentive
 from backend.app.services.matching_service import MatchingService
-from backend.app.services.openai_client import ManagedOpenAIClient
+from backend.app.services.openai_client import get_client
 
 logger = structlog.get_logger()
 
@@ -76,7 +76,7 @@ def search_matches_for_incentive(incentive_id: str, limit: int = 5):
     load_dotenv()
     
     db = SessionLocal()
-    openai_client = ManagedOpenAIClient()
+    openai_client = get_client()
     matching_service = MatchingService(openai_client=openai_client)
 
     try:
@@ -0,0 +1,330 @@
+"""
+BM25 index for company documents.
+
+Company-side BM25 work (tokenization, term frequencies, length
+normalization, IDF) is done once at index time and stored as per-token
+weights in `company_bm25_weights`. A query is then scored with a single
+indexed SQL aggregation instead of re-tokenizing every candidate.
+Document frequencies are kept in `company_df`, and the corpus size and
+average document length in `company_bm25_stats`, so the per-candidate
+fallback scores companies added since the build exactly like indexed
+ones. Every indexed company also has a zero-weight row
+for INDEXED_TOKEN, so scoring can tell companies without matching tokens
+from companies added after the index was built.
+
+Weights use the Lucene BM25 formula:
+    idf = ln((N - df + 0.5) / (df + 0.5) + 1)
+    weight = tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_len / avg_doc_len)) * idf
+"""
+
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import structlog
+from sqlalchemy import text, insert, delete
+from sqlalchemy.orm import Session
+
+from backend.app.models.company import (
+    Company,
+    CompanyBM25Weight,
+    CompanyDocumentFrequency,
+    CompanyBM25Stats,
+)
+
+logger = structlog.get_logger()
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Token of the zero-weight row written for every indexed company (never
+# produced by the tokenizer)
+INDEXED_TOKEN = ""
+
+# Rows per INSERT batch when writing the index
+INSERT_BATCH_SIZE = 5000
+
+# Company documents whose token stats are kept in memory
+DOC_STATS_CACHE_SIZE = 50_000
+
+# Tokenizer: tokens are maximal runs of word characters. ASCII text is
+# scrubbed with str.translate (a C table sweep); other text goes through one
+# findall, since translate falls back to a slow path for non-ASCII strings.
+_WORD_RE = re.compile(r'\w+')
+_ASCII_SCRUB = str.maketrans({
+    c: ' ' for c in map(chr, range(128))
+    if not (c.isalnum() or c == '_' or c.isspace())
+})
+_STOP_WORDS = frozenset({
+    'de', 'da', 'do', 'em', 'para', 'com', 'por', 'que', 'e', 'a', 'o',
+    'as', 'os', 'um', 'uma', 'uns', 'umas',
+})
+
+
+def tokenize_text(text: str) -> List[str]:
+    """
+    Tokenize text for BM25 scoring.
+    
+    Args:
+        text: Text to tokenize
+    
+    Returns:
+        List of tokens
+    """
+    text = text.lower()
+    if text.isascii():
+        words = text.translate(_ASCII_SCRUB).split()
+    else:
+        words = _WORD_RE.findall(text)
+    
+    # Drop very short tokens and common words
+    return [
+        token for token in words
+        if len(token) > 2 and token not in _STOP_WORDS
+    ]
+
+
+def company_document_text(company) -> str:
+    """
+    Build the BM25 document text for a company.
+    
+    Args:
+        company: Company, or a candidate row carrying `raw_description`
+            (the projected `raw['description']`) instead of `raw`
+    
+    Returns:
+        Lowercased document text
+    """
+    doc_parts = [company.name]
+    
+    if company.cae_codes:
+        doc_parts.extend(company.cae_codes)
+    
+    description = getattr(company, 'raw_description', None)
+    if description is None and getattr(company, 'raw', None):
+        description = company.raw.get('description')
+    if description:
+        doc_parts.append(description)
+    
+    if company.district:
+        doc_parts.append(company.district)
+    
+    return ' '.join(doc_parts).lower()
+
+
+@lru_cache(maxsize=DOC_STATS_CACHE_SIZE)
+def document_stats(document_text: str) -> Tuple[Dict[str, int], int]:
+    """
+    Token counts and length of a document, memoized by its text.
+    
+    Keying on the document text means a company whose fields change gets
+    fresh stats on its next lookup. The returned dict is shared between
+    callers and must not be modified.
+    
+    Args:
+        document_text: Document text (see `company_document_text`)
+    
+    Returns:
+        Tuple of (token counts, document length in tokens)
+    """
+    tokens = tokenize_text(document_text)
+    return Counter(tokens), len(tokens)
+
+
+def build_company_bm25_index(db: Session) -> Dict[str, float]:
+    """
+    Rebuild the company BM25 weights table from the companies table.
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        Dict with index statistics
+    """
+    logger.info("bm25_index_build_started")
+    
+    # Pass 1: term frequencies per company and document frequencies
+    doc_counts: Dict[str, Counter] = {}
+    doc_freq: Counter = Counter()
+    total_len = 0
+    
+    for company in db.query(Company).yield_per(1000):
+        counts = Counter(tokenize_text(company_document_text(company)))
+        doc_counts[company.company_id] = counts
+        doc_freq.update(counts.keys())
+        total_len += sum(counts.values())
+    
+    n_docs = len(doc_counts)
+    if n_docs == 0:
+        logger.warning("bm25_index_no_companies")
+        return {"documents": 0, "tokens": 0, "rows": 0, "avg_doc_len": 0.0}
+    
+    avg_doc_len = total_len / n_docs
+    idf = {
+        token: math.log((n_docs - df + 0.5) / (df + 0.5) + 1)
+        for token, df in doc_freq.items()
+    }
+    
+    # Pass 2: write weights and document frequencies
+    db.execute(delete(CompanyBM25Weight))
+    db.execute(delete(CompanyDocumentFrequency))
+    db.execute(delete(CompanyBM25Stats))
+    
+    db.execute(insert(CompanyBM25Stats), [{"id": 1, "documents": n_docs, "avg_doc_len": avg_doc_len}])
+    
+    df_rows = [{"token": token, "df": df} for token, df in doc_freq.items()]
+    for i in range(0, len(df_rows), INSERT_BATCH_SIZE):
+        db.execute(insert(CompanyDocumentFrequency), df_rows[i:i + INSERT_BATCH_SIZE])
+    
+    batch = []
+    rows_written = 0
+    for company_id, counts in doc_counts.items():
+        batch.append({"token": INDEXED_TOKEN, "company_id": company_id, "weight": 0.0})
+        doc_len = sum(counts.values())
+        length_norm = K1 * (1 - B + B * doc_len / avg_doc_len)
+        for token, tf in counts.items():
+            batch.append({
+                "token": token,
+                "company_id": company_id,
+                "weight": tf * (K1 + 1) / (tf + length_norm) * idf[token],
+            })
+        if len(batch) >= INSERT_BATCH_SIZE:
+            db.execute(insert(CompanyBM25Weight), batch)
+            rows_written += len(batch)
+            batch = []
+    
+    if batch:
+        db.execute(insert(CompanyBM25Weight), batch)
+        rows_written += len(batch)
+    
+    db.commit()
+    
+    stats = {
+        "documents": n_docs,
+        "tokens": len(doc_freq),
+        "rows": rows_written,
+        "avg_doc_len": avg_doc_len,
+    }
+    logger.info("bm25_index_build_complete", **stats)
+    
+    return stats
+
+
+def index_available(db: Session) -> bool:
+    """
+    Check whether the BM25 weights table exists and has been populated.
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        True if the index can be used for scoring
+    """
+    # Savepoint: a failure must not roll back the caller's transaction
+    try:
+        with db.begin_nested():
+            return bool(db.execute(
+                text("SELECT EXISTS (SELECT 1 FROM company_bm25_weights)")
+            ).scalar())
+    except Exception as e:
+        logger.warning("bm25_index_unavailable", error=str(e))
+        return False
+
+
+def load_idf(db: Session) -> Optional[Dict[str, float]]:
+    """
+    Load the IDF of every indexed token.
+    
+    Uses the same Lucene IDF as the index weights, with N the number of
+    documents at build time (the current number of companies for an index
+    built before company_bm25_stats existed).
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        Dict mapping token to IDF (empty if the index has not been built),
+        or None on failure
+    """
+    try:
+        with db.begin_nested():
+            result = db.execute(text("""
+                SELECT token, ln((n.total - df + 0.5) / (df + 0.5) + 1) AS idf
+                FROM company_df, (
+                    SELECT COALESCE(
+                        (SELECT documents FROM company_bm25_stats),
+                        (SELECT COUNT(*) FROM companies)
+                    ) AS total
+                ) n
+            """))
+            return {row.token: float(row.idf) for row in result}
+    
+    except Exception as e:
+        logger.warning("bm25_idf_unavailable", error=str(e))
+        return None
+
+
+def load_avg_doc_len(db: Session) -> Optional[float]:
+    """
+    Load the average company document length of the last index build.
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        Average length in tokens, or None if the index has not been built
+        (or the query failed)
+    """
+    try:
+        with db.begin_nested():
+            value = db.execute(text("SELECT avg_doc_len FROM company_bm25_stats")).scalar()
+            return float(value) if value is not None else None
+    
+    except Exception as e:
+        logger.warning("bm25_stats_unavailable", error=str(e))
+        return None
+
+
+def score_companies(
+    db: Session,
+    query_tokens: Sequence[str],
+    company_ids: Sequence[str]
+) -> Optional[Dict[str, float]]:
+    """
+    Score companies against query tokens using the precomputed weights.
+    
+    Indexed companies without any matching token score 0; companies
+    absent from the result are not in the index (added after it was built,
+    or the index predates INDEXED_TOKEN) and must be scored another way.
+    
+    Args:
+        db: Database session
+        query_tokens: Unique query tokens
+        company_ids: Candidate company IDs to score
+    
+    Returns:
+        Dict mapping each indexed company_id to its raw BM25 score, or None
+        on failure
+    """
+    if not company_ids:
+        return {}
+    
+    try:
+        with db.begin_nested():
+            result = db.execute(
+                text("""
+                    SELECT company_id, SUM(weight) AS bm25
+                    FROM company_bm25_weights
+                    WHERE token = ANY(:tokens) AND company_id = ANY(:cand_ids)
+                    GROUP BY company_id
+                """),
+                {'tokens': [INDEXED_TOKEN, *query_tokens], 'cand_ids': list(company_ids)}
+            )
+            return {row.company_id: float(row.bm25) for row in result}
+    
+    except Exception as e:
+        logger.error("bm25_index_scoring_failed", error=str(e))
+        return None
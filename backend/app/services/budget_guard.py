@@ -12,12 +12,15 @@ from __future__ import annotations
 
 import re
 import json
+import time
 import logging
 from dataclasses import dataclass, asdict
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Any, Optional, Callable
 
+import orjson
 import requests
 
 logger = logging.getLogger("budget_guard")
@@ -50,16 +53,54 @@ FALLBACK_PRICES = {
         "input_usd": 0.150,   # $0.150 per 1M tokens
         "output_usd": 0.600,  # $0.600 per 1M tokens
     },
+    "gpt-4o": {
+        "input_usd": 2.50,    # $2.50 per 1M tokens
+        "output_usd": 10.00,  # $10.00 per 1M tokens
+    },
     "text-embedding-3-small": {
         "embedding_usd": 0.020,  # $0.020 per 1M tokens
     },
 }
 
+# Streaming settings for price pages (stop reading once prices are found)
+STREAM_CHUNK_SIZE = 16384
+# Longest text a price pattern can match: each chunk is searched together
+# with this much of the text before it, so matches can span chunk boundaries
+STREAM_MATCH_MAX_CHARS = 4096
+
+# Price patterns
+_RE_CENTS_IN = re.compile(r"(?i)(\d+(?:\.\d+)?)\s*cents?\s+per\s+1M\s+input\s+tokens")
+_RE_CENTS_OUT = re.compile(r"(?i)(\d+(?:\.\d+)?)\s*cents?\s+per\s+1M\s+output\s+tokens")
+_RE_DOLLARS_IN = re.compile(r"\$\s*(\d+(?:\.\d+)?)\s*/\s*1M\s*input", re.I)
+_RE_DOLLARS_OUT = re.compile(r"\$\s*(\d+(?:\.\d+)?)\s*/\s*1M\s*output", re.I)
+_RE_EMBED_CARD_PRICE = re.compile(r"\$\s*(\d+(?:\.\d+)?)\s*(?:per|/)\s*1M\s*tokens", re.I)
+_RE_EMBED_PRICING_PAGE = re.compile(
+    r"text-embedding-3-small.{0,4000}?\$\s*(\d+(?:\.\d+)?)\s*(?:/|per)\s*1M", re.I | re.S
+)
+
+# Structured data islands embedded in pages (schema.org JSON-LD, Next.js state)
+_JSON_ISLAND_OPENERS = (
+    '<script type="application/ld+json">',
+    '<script id="__NEXT_DATA__" type="application/json">',
+)
+_PRICE_KEYS = ("price", "pricePerMillionTokens", "price_per_1m_tokens")
+
 # Cache settings
 PRICE_CACHE_HOURS = 24
 EXCHANGE_RATE_CACHE_HOURS = 12  # Update twice a day
+NS_PER_HOUR = 3_600_000_000_000
 # Use local cache directory in project root
 CACHE_DIR = Path(__file__).parent.parent.parent.parent / ".cache"
+EXCHANGE_RATE_CACHE_FILE = CACHE_DIR / "exchange_rate.json"
+
+# Create the cache directory once at import instead of on every cache access
+try:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+except PermissionError as e:
+    logger.warning(f"Cannot create cache directory {CACHE_DIR}: {e}")
+
+# Per-model price cache paths, resolved on first access
+_CACHE_PATHS: dict[str, Path] = {}
 
 
 @dataclass
@@ -75,6 +116,20 @@ class ModelPrices:
         return asdict(self)
 
 
+def _cache_age_ns(data: dict) -> int:
+    """
+    Get age of a cache entry in nanoseconds.
+    
+    Entries written before `cached_at_ns` existed only carry an ISO
+    `cached_at` timestamp, which is parsed as a fallback.
+    """
+    cached_at_ns = data.get("cached_at_ns")
+    if cached_at_ns is None:
+        cached_at = datetime.fromisoformat(data["cached_at"])
+        cached_at_ns = int((cached_at - datetime(1970, 1, 1)).total_seconds() * 1_000_000_000)
+    return time.time_ns() - cached_at_ns
+
+
 def fetch_exchange_rate(timeout: int = 10) -> float:
     """
     Fetch current USD to EUR exchange rate from API.
@@ -119,21 +174,19 @@ def get_exchange_rate_cached(force_refresh: bool = False) -> float:
     Returns:
         EUR per 1 USD
     """
-    cache_file = CACHE_DIR / "exchange_rate.json"
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    cache_file = EXCHANGE_RATE_CACHE_FILE
     
     # Try cache first
     if not force_refresh and cache_file.exists():
         try:
             data = json.loads(cache_file.read_text())
-            cached_at = datetime.fromisoformat(data["cached_at"])
-            age = datetime.utcnow() - cached_at
+            age_ns = _cache_age_ns(data)
             
-            if age.total_seconds() < EXCHANGE_RATE_CACHE_HOURS * 3600:
+            if age_ns < EXCHANGE_RATE_CACHE_HOURS * NS_PER_HOUR:
                 rate = data["eur_per_usd"]
                 logger.info(
                     f"Using cached exchange rate: 1 USD = {rate:.4f} EUR "
-                    f"(age: {age.total_seconds()/3600:.1f}h)"
+                    f"(age: {age_ns / NS_PER_HOUR:.1f}h)"
                 )
                 return rate
         except Exception as e:
@@ -145,7 +198,7 @@ def get_exchange_rate_cached(force_refresh: bool = False) -> float:
         
         # Save to cache
         cache_data = {
-            "cached_at": datetime.utcnow().isoformat(),
+            "cached_at_ns": time.time_ns(),
             "eur_per_usd": rate,
         }
         cache_file.write_text(json.dumps(cache_data, indent=2))
@@ -189,15 +242,17 @@ def _usd_to_eur(amount_usd: float, eur_per_usd: Optional[float] = None) -> float
 
 def _get_cache_path(model_name: str) -> Path:
     """Get cache file path for a model."""
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    return CACHE_DIR / f"prices_{model_name}.json"
+    path = _CACHE_PATHS.get(model_name)
+    if path is None:
+        path = _CACHE_PATHS[model_name] = CACHE_DIR / f"prices_{model_name}.json"
+    return path
 
 
 def _save_prices_cache(model_name: str, prices: ModelPrices) -> None:
     """Save prices to cache."""
     cache_path = _get_cache_path(model_name)
     data = {
-        "cached_at": datetime.utcnow().isoformat(),
+        "cached_at_ns": time.time_ns(),
         "prices": prices.to_dict(),
     }
     cache_path.write_text(json.dumps(data, indent=2))
@@ -213,20 +268,197 @@ def _load_prices_cache(model_name: str, max_age_hours: int = PRICE_CACHE_HOURS)
     
     try:
         data = json.loads(cache_path.read_text())
-        cached_at = datetime.fromisoformat(data["cached_at"])
-        age = datetime.utcnow() - cached_at
+        age_ns = _cache_age_ns(data)
         
-        if age.total_seconds() < max_age_hours * 3600:
-            logger.info(f"Using cached prices for {model_name} (age: {age.total_seconds()/3600:.1f}h)")
+        if age_ns < max_age_hours * NS_PER_HOUR:
+            logger.info(f"Using cached prices for {model_name} (age: {age_ns / NS_PER_HOUR:.1f}h)")
             return ModelPrices(**data["prices"])
         else:
-            logger.info(f"Cache expired for {model_name} (age: {age.total_seconds()/3600:.1f}h)")
+            logger.info(f"Cache expired for {model_name} (age: {age_ns / NS_PER_HOUR:.1f}h)")
             return None
     except Exception as e:
         logger.warning(f"Failed to load cache for {model_name}: {e}")
         return None
 
 
+def _extract_price_from_ld(data, model_name: str) -> Optional[str]:
+    """
+    Find the USD price of a model inside parsed structured data.
+    
+    Walks the JSON tree looking for an object that mentions the model
+    name and carries a price, either directly or in schema.org `offers`.
+    
+    Args:
+        data: Parsed JSON payload
+        model_name: Model name to look for
+        
+    Returns:
+        Price as a string, or None if not found
+    """
+    if isinstance(data, list):
+        for item in data:
+            price = _extract_price_from_ld(item, model_name)
+            if price is not None:
+                return price
+        return None
+    
+    if not isinstance(data, dict):
+        return None
+    
+    mentions_model = any(
+        isinstance(v, str) and model_name in v.lower() for v in data.values()
+    )
+    if mentions_model:
+        candidates = [data]
+        offers = data.get("offers")
+        if isinstance(offers, dict):
+            candidates.append(offers)
+        elif isinstance(offers, list):
+            candidates.extend(o for o in offers if isinstance(o, dict))
+        
+        for candidate in candidates:
+            if candidate.get("priceCurrency", "USD") != "USD":
+                continue
+            for key in _PRICE_KEYS:
+                value = candidate.get(key)
+                if isinstance(value, (int, float, str)):
+                    try:
+                        return str(float(value))
+                    except ValueError:
+                        pass
+    
+    for value in data.values():
+        if isinstance(value, (dict, list)):
+            price = _extract_price_from_ld(value, model_name)
+            if price is not None:
+                return price
+    
+    return None
+
+
+class _JsonIslandScanner:
+    """
+    Collects the JSON payloads of data islands (see _JSON_ISLAND_OPENERS)
+    from a page fed in chunks.
+    
+    An island is buffered from its opening tag to its `</script>`, however
+    long, and returned once, when complete; outside islands only enough
+    text to spot an opener split across chunks is kept.
+    """
+    
+    _CLOSER = "</script>"
+    _OPENER_CARRY = max(len(opener) for opener in _JSON_ISLAND_OPENERS) - 1
+    
+    def __init__(self):
+        self._buffer = ""
+        self._in_island = False
+        self._searched = 0  # Island text already searched for the closer
+    
+    def feed(self, chunk: str) -> list[str]:
+        """
+        Add a chunk of the page.
+        
+        Args:
+            chunk: Next piece of the page
+            
+        Returns:
+            Payloads of the islands completed by this chunk
+        """
+        self._buffer += chunk
+        payloads = []
+        
+        while True:
+            if self._in_island:
+                end = self._buffer.find(
+                    self._CLOSER, max(self._searched - len(self._CLOSER) + 1, 0)
+                )
+                if end < 0:
+                    self._searched = len(self._buffer)
+                    return payloads
+                payloads.append(self._buffer[:end])
+                self._buffer = self._buffer[end + len(self._CLOSER):]
+                self._in_island = False
+            else:
+                starts = [
+                    (start, opener) for opener in _JSON_ISLAND_OPENERS
+                    if (start := self._buffer.find(opener)) >= 0
+                ]
+                if not starts:
+                    self._buffer = self._buffer[-self._OPENER_CARRY:]
+                    return payloads
+                start, opener = min(starts)
+                self._buffer = self._buffer[start + len(opener):]
+                self._in_island = True
+                self._searched = 0
+
+
+def _stream_search(
+    url: str,
+    patterns: dict[str, re.Pattern],
+    done: Callable[[dict[str, str]], bool],
+    timeout: int = 20,
+    headers: Optional[dict] = None,
+    structured: Optional[Callable[[Any], dict[str, str]]] = None
+) -> dict[str, str]:
+    """
+    Stream a web page and search it for price patterns.
+    
+    The response is read in chunks and the connection is closed as soon as
+    `done` reports that enough patterns were found, so the rest of the page
+    is never downloaded or decoded.
+    
+    Args:
+        url: Page URL
+        patterns: Named compiled patterns (first group is captured)
+        done: Predicate over the matches found so far
+        timeout: Request timeout in seconds
+        headers: Optional request headers
+        structured: Optional extractor applied to each parsed data island
+            (JSON-LD / Next.js state) once it is complete, before the regex
+            patterns
+        
+    Returns:
+        Dict mapping pattern name to the first captured group found
+    """
+    found: dict[str, str] = {}
+    tail = ""
+    islands = _JsonIslandScanner() if structured is not None else None
+    
+    with requests.get(url, timeout=timeout, headers=headers, stream=True) as r:
+        r.raise_for_status()
+        
+        for chunk in r.iter_content(chunk_size=STREAM_CHUNK_SIZE, decode_unicode=True):
+            if isinstance(chunk, bytes):
+                # No charset known to requests - decode as UTF-8
+                chunk = chunk.decode("utf-8", errors="replace")
+            
+            if islands is not None:
+                # Each island is parsed once; broken ones are left to the regexes
+                for payload in islands.feed(chunk):
+                    try:
+                        data = orjson.loads(payload)
+                    except orjson.JSONDecodeError:
+                        continue
+                    for name, value in structured(data).items():
+                        found.setdefault(name, value)
+                if done(found):
+                    break
+            
+            # Only the new chunk and the tail a match could start in
+            text = tail + chunk
+            for name, pattern in patterns.items():
+                if name not in found:
+                    m = pattern.search(text)
+                    if m:
+                        found[name] = m.group(1)
+            tail = text[-STREAM_MATCH_MAX_CHARS:]
+            
+            if done(found):
+                break
+    
+    return found
+
+
 def fetch_gpt4o_mini_prices(timeout: int = 20) -> ModelPrices:
     """
     Fetch gpt-4o-mini prices from official OpenAI announcement.
@@ -240,27 +472,28 @@ def fetch_gpt4o_mini_prices(timeout: int = 20) -> ModelPrices:
     Raises:
         RuntimeError: If prices cannot be extracted
     """
-    r = requests.get(GPT4O_MINI_NEWS_URL, timeout=timeout)
-    r.raise_for_status()
-    html = r.text
-    
-    # Try to find prices in cents
-    cents_in = re.findall(r"(?i)(\d+(?:\.\d+)?)\s*cents?\s+per\s+1M\s+input\s+tokens", html)
-    cents_out = re.findall(r"(?i)(\d+(?:\.\d+)?)\s*cents?\s+per\s+1M\s+output\s+tokens", html)
+    # Prices may be written in cents or in dollars - stop at the first complete pair
+    found = _stream_search(
+        GPT4O_MINI_NEWS_URL,
+        patterns={
+            "cents_in": _RE_CENTS_IN,
+            "cents_out": _RE_CENTS_OUT,
+            "dollars_in": _RE_DOLLARS_IN,
+            "dollars_out": _RE_DOLLARS_OUT,
+        },
+        done=lambda f: ("cents_in" in f and "cents_out" in f)
+        or ("dollars_in" in f and "dollars_out" in f),
+        timeout=timeout,
+    )
     
-    if cents_in and cents_out:
-        usd_in = float(cents_in[0]) / 100.0
-        usd_out = float(cents_out[0]) / 100.0
+    if "cents_in" in found and "cents_out" in found:
+        usd_in = float(found["cents_in"]) / 100.0
+        usd_out = float(found["cents_out"]) / 100.0
+    elif "dollars_in" in found and "dollars_out" in found:
+        usd_in = float(found["dollars_in"])
+        usd_out = float(found["dollars_out"])
     else:
-        # Try to find prices in dollars
-        dollars_in = re.findall(r"\$\s*(\d+(?:\.\d+)?)\s*/\s*1M\s*input", html, re.I)
-        dollars_out = re.findall(r"\$\s*(\d+(?:\.\d+)?)\s*/\s*1M\s*output", html, re.I)
-        
-        if dollars_in and dollars_out:
-            usd_in = float(dollars_in[0])
-            usd_out = float(dollars_out[0])
-        else:
-            raise RuntimeError("Failed to extract gpt-4o-mini prices from webpage")
+        raise RuntimeError("Failed to extract gpt-4o-mini prices from webpage")
     
     logger.info(f"Fetched gpt-4o-mini prices: ${usd_in:.4f} input, ${usd_out:.4f} output per 1M tokens")
     
@@ -290,24 +523,36 @@ def fetch_embedding_small_price(timeout: int = 20) -> ModelPrices:
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
     }
     
-    # Try model card first
-    r = requests.get(EMBED_MODEL_CARD_URL, timeout=timeout, headers=headers)
-    r.raise_for_status()
-    html = r.text
+    # Structured data (JSON-LD / Next.js islands) is tried before regex scanning
+    def structured(data: Any) -> dict[str, str]:
+        price = _extract_price_from_ld(data, "text-embedding-3-small")
+        return {"price": price} if price is not None else {}
     
-    m = re.search(r"\$\s*(\d+(?:\.\d+)?)\s*(?:per|/)\s*1M\s*tokens", html, re.I)
+    # Try model card first
+    found = _stream_search(
+        EMBED_MODEL_CARD_URL,
+        patterns={"price": _RE_EMBED_CARD_PRICE},
+        done=lambda f: "price" in f,
+        timeout=timeout,
+        headers=headers,
+        structured=structured,
+    )
     
-    if not m:
+    if "price" not in found:
         # Fallback to pricing page
-        r2 = requests.get(OPENAI_PRICING_URL, timeout=timeout, headers=headers)
-        r2.raise_for_status()
-        html2 = r2.text
-        m = re.search(r"text-embedding-3-small.*?\$\s*(\d+(?:\.\d+)?)\s*(?:/|per)\s*1M", html2, re.I | re.S)
+        found = _stream_search(
+            OPENAI_PRICING_URL,
+            patterns={"price": _RE_EMBED_PRICING_PAGE},
+            done=lambda f: "price" in f,
+            timeout=timeout,
+            headers=headers,
+            structured=structured,
+        )
         
-        if not m:
+        if "price" not in found:
             raise RuntimeError("Failed to extract text-embedding-3-small price from webpage")
     
-    usd = float(m.group(1))
+    usd = float(found["price"])
     logger.info(f"Fetched text-embedding-3-small price: ${usd:.4f} per 1M tokens")
     
     return ModelPrices(embedding_per_million=_usd_to_eur(usd))
@@ -416,6 +661,49 @@ def get_embedding_prices_cached(force_refresh: bool = False) -> ModelPrices:
         return prices
 
 
+def get_gpt4o_prices() -> ModelPrices:
+    """
+    Get gpt-4o prices.
+    
+    gpt-4o is only used to verify gpt-4o-mini extractions, so its list
+    prices are taken from FALLBACK_PRICES instead of being scraped.
+    
+    Returns:
+        ModelPrices with input/output prices
+    """
+    exchange_rate = get_exchange_rate_cached()
+    return ModelPrices(
+        input_per_million=_usd_to_eur(FALLBACK_PRICES["gpt-4o"]["input_usd"], exchange_rate),
+        output_per_million=_usd_to_eur(FALLBACK_PRICES["gpt-4o"]["output_usd"], exchange_rate),
+    )
+
+
+# Chat model name -> prices getter
+_CHAT_PRICES: dict[str, Callable[[], ModelPrices]] = {
+    "gpt-4o-mini": get_gpt4o_mini_prices_cached,
+    "gpt-4o": get_gpt4o_prices,
+}
+
+
+def get_chat_prices(model: str) -> ModelPrices:
+    """
+    Get the prices of a chat model.
+    
+    Args:
+        model: Model name
+        
+    Returns:
+        ModelPrices with input/output prices
+        
+    Raises:
+        ValueError: If no prices are known for the model
+    """
+    get_prices = _CHAT_PRICES.get(model)
+    if get_prices is None:
+        raise ValueError(f"No prices known for model {model}")
+    return get_prices()
+
+
 def plan_output_tokens(
     tokens_in: int,
     price_in_per_million: float,
@@ -504,6 +792,27 @@ def shrink_context(text: str, max_tokens: int, tokenizer: Callable[[str], int])
     return result
 
 
+def _chat_cost(get_prices: Callable[[], ModelPrices], tokens_in: int, tokens_out: int) -> float:
+    """Cost in EUR of a chat completion at the prices returned by get_prices."""
+    prices = get_prices()
+    cost_in = (tokens_in / 1_000_000) * prices.input_per_million
+    cost_out = (tokens_out / 1_000_000) * prices.output_per_million
+    return cost_in + cost_out
+
+
+def _embedding_cost(tokens_in: int, tokens_out: int) -> float:
+    """Cost in EUR of a text-embedding-3-small request (output is free)."""
+    prices = get_embedding_prices_cached()
+    return (tokens_in / 1_000_000) * prices.embedding_per_million
+
+
+# Exact model name -> pricing function (avoids per-call string scans)
+_PRICERS: dict[str, Callable[[int, int], float]] = {
+    **{model: partial(_chat_cost, get_prices) for model, get_prices in _CHAT_PRICES.items()},
+    "text-embedding-3-small": _embedding_cost,
+}
+
+
 def estimate_cost(
     tokens_in: int,
     tokens_out: int,
@@ -519,15 +828,15 @@ def estimate_cost(
         
     Returns:
         Estimated cost in EUR
+        
+    Raises:
+        ValueError: If no prices are known for the model (pricing it as
+            another model could under-count the budget)
     """
-    if "embed" in model.lower():
-        prices = get_embedding_prices_cached()
-        return (tokens_in / 1_000_000) * prices.embedding_per_million
-    else:
-        prices = get_gpt4o_mini_prices_cached()
-        cost_in = (tokens_in / 1_000_000) * prices.input_per_million
-        cost_out = (tokens_out / 1_000_000) * prices.output_per_million
-        return cost_in + cost_out
+    pricer = _PRICERS.get(model)
+    if pricer is None:
+        raise ValueError(f"No prices known for model {model}")
+    return pricer(tokens_in, tokens_out)
 
 
 def format_cost_info(
@@ -18,6 +18,10 @@ class DocumentCostTracker:
         self.document_costs: Dict[str, float] = {}
         self.max_cost_per_document = 0.30  # €0.30 per document
         
+        # Running aggregates so get_stats() doesn't scan all documents
+        self._total_cost = 0.0
+        self._count = 0
+        
     def can_spend(self, document_id: str, estimated_cost: float) -> bool:
         """
         Check if we can spend the estimated cost for this document.
@@ -53,10 +57,13 @@ class DocumentCostTracker:
             document_id: Document identifier
             actual_cost: Actual cost in EUR
         """
+        if document_id not in self.document_costs:
+            self._count += 1
         current_cost = self.document_costs.get(document_id, 0.0)
         new_cost = current_cost + actual_cost
         
         self.document_costs[document_id] = new_cost
+        self._total_cost += actual_cost
         
         logger.info(
             "document_cost_recorded",
@@ -99,7 +106,8 @@ class DocumentCostTracker:
             document_id: Document identifier
         """
         if document_id in self.document_costs:
-            del self.document_costs[document_id]
+            self._total_cost -= self.document_costs.pop(document_id)
+            self._count -= 1
             logger.info("document_cost_reset", document_id=document_id)
     
     def get_stats(self) -> Dict[str, any]:
@@ -109,8 +117,8 @@ class DocumentCostTracker:
         Returns:
             Dictionary with statistics
         """
-        total_documents = len(self.document_costs)
-        total_cost = sum(self.document_costs.values())
+        total_documents = self._count
+        total_cost = self._total_cost
         
         return {
             "total_documents_processed": total_documents,
@@ -10,10 +10,17 @@ Implements a hybrid scoring approach:
 Final score: (0.55 * cosine + 0.25 * bm25 + 0.20 * llm) * penalties
 """
 
+import asyncio
+import heapq
+import json
+import math
+import time
+
 import numpy as np
-from typing import List, Dict, Optional, Tuple, Set
+from typing import List, Dict, Optional, Tuple, Set, NamedTuple, Union
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 
 import structlog
 from sqlalchemy.orm import Session
@@ -22,11 +29,99 @@ from sqlalchemy.types import String
 from rank_bm25 import BM25Okapi
 
 from backend.app.models.incentive import Incentive, IncentiveEmbedding
-from backend.app.models.company import Company, CompanyEmbedding
-from backend.app.services.openai_client import ManagedOpenAIClient
+from backend.app.models.company import Company
+from backend.app.services.openai_client import ManagedOpenAIClient, get_client
+from backend.app.services.ttl_cache import TTLCache
+from backend.app.services.bm25_index import (
+    K1,
+    B,
+    tokenize_text,
+    company_document_text,
+    document_stats,
+    index_available,
+    load_idf,
+    load_avg_doc_len,
+    score_companies,
+)
 
 logger = structlog.get_logger()
 
+# HNSW candidate list size at query time (pgvector default is 40)
+HNSW_EF_SEARCH = 100
+
+# Candidates re-ranked by the LLM
+RERANK_TOP_N = 20
+
+# Candidates decided without the LLM: (score, reason)
+AUTO_MATCH = (0.9, "match direto CAE+localização")
+AUTO_REJECT = (0.1, "critérios não cumpridos")
+AUTO_MATCH_MIN_VECTOR = 0.85
+AUTO_MATCH_MIN_SHARED_CAES = 2
+
+# Geographic matching: terms meaning "anywhere in the country" and the
+# districts covered by each region name
+_NATIONWIDE_TERMS = ('portugal', 'nacional', 'todo o país', 'todas as regiões')
+_REGION_TO_DISTRICTS: Dict[str, frozenset] = {
+    'algarve': frozenset({'faro'}),
+    'centro': frozenset({'coimbra', 'leiria', 'aveiro'}),
+    'norte': frozenset({'porto', 'braga', 'vila real'}),
+    'lisboa': frozenset({'lisboa', 'setúbal'}),
+}
+
+
+@lru_cache(maxsize=1024)
+def _geo_rules(geo_location: str) -> Tuple[bool, frozenset]:
+    """
+    Resolve a (lowercased) incentive location into matching rules.
+    
+    Args:
+        geo_location: Incentive geographic location, lowercased
+        
+    Returns:
+        Tuple of (covers the whole country, districts covered by the
+        regions mentioned)
+    """
+    nationwide = any(term in geo_location for term in _NATIONWIDE_TERMS)
+    region_districts = frozenset().union(*(
+        districts for region, districts in _REGION_TO_DISTRICTS.items()
+        if region in geo_location
+    ))
+    return nationwide, region_districts
+
+
+# Average company document length assumed by the BM25 fallback until it is
+# loaded from the index statistics
+FALLBACK_AVG_DOC_LEN = 50
+
+# BM25 fallback IDF: refresh interval and value for unknown tokens
+IDF_REFRESH_SEC = 3600
+DEFAULT_IDF = 1.0
+
+
+class CandidateRow(NamedTuple):
+    """Candidate company row as read by the scoring code (no ORM state)."""
+    company_id: str
+    name: str
+    cae_codes: Optional[List[str]]
+    size: Optional[str]
+    district: Optional[str]
+    raw_description: Optional[str]
+    vector_similarity: float
+
+
+@dataclass(slots=True, frozen=True)
+class IncentiveContext:
+    """Per-incentive values used when scoring candidates, computed once per match."""
+    incentive_id: str
+    caes: frozenset
+    allowed_sizes: Optional[frozenset]  # None: no size restriction
+    geo_location: str
+    nationwide: bool
+    region_districts: frozenset
+    query_tokens: List[str]
+    query_set: frozenset
+    query_embedding: Optional[np.ndarray] = None  # float32, bound as-is to pgvector
+
 
 @dataclass
 class MatchResult:
@@ -54,7 +149,7 @@ class MatchingService:
             openai_client: OpenAI client for LLM re-ranking
             weights: Custom weights for scoring components
         """
-        self.client = openai_client or ManagedOpenAIClient()
+        self.client = openai_client or get_client()
         
         # Weights emphasizing LLM as specified in roadmap
         self.weights = weights or {
@@ -69,17 +164,75 @@ class MatchingService:
             'cae_mismatch': 0.7,   # Less severe: 0.5 -> 0.7
             'geo_mismatch': 0.9    # Much less severe: 0.7 -> 0.9
         }
+        
+        # Whether the precomputed BM25 index has been built (checked lazily)
+        self._bm25_index_ready = False
+        
+        # Recent LLM re-ranking results, keyed by incentive version + candidate set
+        self._rerank_cache = TTLCache(max_items=4096, ttl_sec=900)
+        
+        # BM25 query tokens, keyed by incentive version
+        self._query_tokens_cache = TTLCache(max_items=1024, ttl_sec=3600)
+        
+        # Global token IDF and average document length for the BM25
+        # fallback (loaded with the index statistics)
+        self._idf_cache: Dict[str, float] = {}
+        self._avg_doc_len: float = FALLBACK_AVG_DOC_LEN
+        self._idf_cache_ts: Optional[float] = None
     
-    def _apply_deterministic_filters(
+    def _incentive_context(
         self,
         incentive: Incentive,
-        company: Company
+        embedding: Optional[np.ndarray] = None
+    ) -> IncentiveContext:
+        """
+        Compute the per-incentive values used when scoring candidates.
+        
+        Args:
+            incentive: Incentive to match
+            embedding: Incentive embedding, if loaded
+            
+        Returns:
+            IncentiveContext for the incentive
+        """
+        ai_desc = incentive.ai_description or {}
+        
+        # Size restriction, unless "não aplicável"
+        allowed_sizes = None
+        if ai_desc.get('company_size'):
+            sizes = ai_desc['company_size']
+            if 'não aplicável' not in [s.lower() for s in sizes]:
+                allowed_sizes = frozenset(sizes)
+        
+        geo_location = ai_desc.get('geographic_location', '').lower()
+        nationwide, region_districts = _geo_rules(geo_location)
+        
+        query_tokens = self._build_query_tokens(incentive)
+        
+        return IncentiveContext(
+            incentive_id=incentive.incentive_id,
+            caes=frozenset(ai_desc.get('caes', [])),
+            allowed_sizes=allowed_sizes,
+            geo_location=geo_location,
+            nationwide=nationwide,
+            region_districts=region_districts,
+            query_tokens=query_tokens,
+            query_set=frozenset(query_tokens),
+            query_embedding=(
+                np.asarray(embedding, dtype=np.float32) if embedding is not None else None
+            ),
+        )
+    
+    def _apply_deterministic_filters(
+        self,
+        ctx: IncentiveContext,
+        company: Union[Company, CandidateRow]
     ) -> Tuple[float, Dict[str, float]]:
         """
         Apply deterministic filters and calculate penalty.
         
         Args:
-            incentive: Incentive to match
+            ctx: Context of the incentive to match
             company: Company to evaluate
             
         Returns:
@@ -88,61 +241,39 @@ class MatchingService:
         penalty = 1.0
         penalties_applied = {}
         
-        ai_desc = incentive.ai_description or {}
-        
         # 1. Company size filter
-        if ai_desc.get('company_size'):
-            allowed_sizes = ai_desc['company_size']
-            
-            # Skip penalty if "não aplicável"
-            if 'não aplicável' not in [s.lower() for s in allowed_sizes]:
-                if company.size and company.size not in allowed_sizes:
-                    penalty *= self.penalties['size_mismatch']
-                    penalties_applied['size'] = self.penalties['size_mismatch']
-                    logger.debug("size_penalty_applied",
-                               company_id=company.company_id,
-                               company_size=company.size,
-                               required_sizes=allowed_sizes)
+        if ctx.allowed_sizes is not None:
+            if company.size and company.size not in ctx.allowed_sizes:
+                penalty *= self.penalties['size_mismatch']
+                penalties_applied['size'] = self.penalties['size_mismatch']
+                logger.debug("size_penalty_applied",
+                           company_id=company.company_id,
+                           company_size=company.size,
+                           required_sizes=sorted(ctx.allowed_sizes))
         
         # 2. CAE codes filter
-        incentive_caes = set(ai_desc.get('caes', []))
-        company_caes = set(company.cae_codes or [])
-        
-        if incentive_caes and company_caes:
+        if ctx.caes and company.cae_codes:
             # Check for intersection
-            if not incentive_caes.intersection(company_caes):
+            if ctx.caes.isdisjoint(company.cae_codes):
                 penalty *= self.penalties['cae_mismatch']
                 penalties_applied['cae'] = self.penalties['cae_mismatch']
                 logger.debug("cae_penalty_applied",
                            company_id=company.company_id,
-                           company_caes=list(company_caes),
-                           required_caes=list(incentive_caes))
+                           company_caes=list(company.cae_codes),
+                           required_caes=list(ctx.caes))
         
         # 3. Geographic location filter (improved)
-        geo_location = ai_desc.get('geographic_location', '').lower()
+        geo_location = ctx.geo_location
         if geo_location and company.district:
             company_district = company.district.lower()
             
-            # More intelligent geographic matching
-            geo_match = False
-            
-            # Direct district match
-            if company_district in geo_location:
-                geo_match = True
-            
-            # Check for common geographic terms
-            elif any(term in geo_location for term in ['portugal', 'nacional', 'todo o país', 'todas as regiões']):
-                geo_match = True
-            
-            # Check for regional matches (e.g., "Algarve" matches "Faro")
-            elif 'algarve' in geo_location and company_district == 'faro':
-                geo_match = True
-            elif 'centro' in geo_location and company_district in ['coimbra', 'leiria', 'aveiro']:
-                geo_match = True
-            elif 'norte' in geo_location and company_district in ['porto', 'braga', 'vila real']:
-                geo_match = True
-            elif 'lisboa' in geo_location and company_district in ['lisboa', 'setúbal']:
-                geo_match = True
+            # Direct district match, nationwide scope, or a district of a
+            # region mentioned (e.g., "Algarve" matches "Faro")
+            geo_match = (
+                ctx.nationwide
+                or company_district in geo_location
+                or company_district in ctx.region_districts
+            )
             
             # Apply penalty only if no match found
             if not geo_match:
@@ -170,37 +301,140 @@ class MatchingService:
         Returns:
             Cosine similarity (0-1)
         """
-        vec1 = np.array(embedding1)
-        vec2 = np.array(embedding2)
-        
-        # Normalize vectors
-        vec1_norm = vec1 / np.linalg.norm(vec1)
-        vec2_norm = vec2 / np.linalg.norm(vec2)
-        
-        # Calculate cosine similarity
-        similarity = np.dot(vec1_norm, vec2_norm)
+        similarity = self._cosine_batch(embedding1, np.asarray(embedding2)[np.newaxis, :])[0]
         
         # Ensure it's in [0, 1] range
         return float((similarity + 1) / 2)
     
+    def _cosine_batch(
+        self,
+        query_embedding: List[float],
+        matrix: np.ndarray
+    ) -> np.ndarray:
+        """
+        Calculate cosine similarity of one embedding against many at once.
+        
+        Rows are L2-normalized once and scored with a single matrix-vector
+        product instead of one dot product per pair.
+        
+        Args:
+            query_embedding: Query embedding vector (d,)
+            matrix: Candidate embeddings (N, d)
+            
+        Returns:
+            Raw cosine similarities (N,), in [-1, 1]
+        """
+        m = np.ascontiguousarray(matrix, dtype=np.float32)
+        q = np.asarray(query_embedding, dtype=np.float32)
+        
+        # Normalize rows and query (zero vectors stay zero)
+        row_norms = np.linalg.norm(m, axis=1, keepdims=True)
+        m = m / np.where(row_norms == 0, 1.0, row_norms)
+        q_norm = np.linalg.norm(q)
+        if q_norm:
+            q = q / q_norm
+        
+        return m @ q
+    
     def _calculate_bm25_score(
         self,
-        incentive: Incentive,
-        company: Company,
+        ctx: IncentiveContext,
+        company: Union[Company, CandidateRow],
         bm25_index: Optional[BM25Okapi] = None
     ) -> float:
         """
         Calculate BM25 score for text matching.
         
         Args:
-            incentive: Incentive to match
+            ctx: Context of the incentive to match
             company: Company to evaluate
             bm25_index: Pre-computed BM25 index (optional)
             
         Returns:
             Normalized BM25 score (0-1)
         """
-        # Create search query from incentive
+        return float(self._bm25_scores_batch(ctx, [company])[0])
+    
+    def _bm25_scores_batch(
+        self,
+        ctx: IncentiveContext,
+        companies: List[Union[Company, CandidateRow]]
+    ) -> np.ndarray:
+        """
+        Calculate BM25 scores for many companies in one vectorized pass.
+        
+        Used for companies missing from the precomputed BM25 index, with the
+        same Lucene formula, IDF and average document length as the index
+        weights, so both kinds of scores can be ranked together. The loop
+        over companies only collects term frequencies; scoring and the
+        sigmoid are applied to the whole batch with NumPy.
+        
+        Args:
+            ctx: Context of the incentive to match
+            companies: Companies to evaluate
+            
+        Returns:
+            Normalized BM25 scores (N,), in [0, 1]
+        """
+        query_terms = sorted(ctx.query_set)
+        
+        if not query_terms:
+            return np.zeros(len(companies))
+        
+        # Term frequencies (N x T) and document lengths (N,)
+        tf = np.zeros((len(companies), len(query_terms)))
+        doc_len = np.zeros(len(companies))
+        for i, company in enumerate(companies):
+            doc_token_counts, doc_len[i] = document_stats(company_document_text(company))
+            tf[i] = [doc_token_counts.get(token, 0) for token in query_terms]
+        
+        # Global IDF per query term (1.0 for tokens not in the index)
+        idf = np.array([self._idf_cache.get(token, DEFAULT_IDF) for token in query_terms])
+        
+        # BM25: idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_len / avg_doc_len))
+        length_norm = K1 * (1 - B + B * doc_len / self._avg_doc_len)
+        scores = (tf * (K1 + 1) / (tf + length_norm[:, np.newaxis])) @ idf
+        
+        # Same mapping as _normalize_bm25, applied to the whole batch
+        return 1 / (1 + np.exp(-(scores / len(query_terms)) * 5))
+    
+    def _normalize_bm25(self, score: float, query_len: int) -> float:
+        """
+        Map a raw BM25 score to the 0-1 range.
+        
+        Args:
+            score: Raw BM25 score (sum over matching query tokens)
+            query_len: Number of unique query tokens
+            
+        Returns:
+            Normalized BM25 score (0-1)
+        """
+        # Normalize by query length
+        normalized_score = score / query_len if query_len else 0.0
+        
+        # Apply sigmoid to get 0-1 range
+        sigmoid_score = 1 / (1 + math.exp(-normalized_score * 5))  # Scale factor of 5
+        
+        return float(sigmoid_score)
+    
+    def _build_query_tokens(self, incentive: Incentive) -> List[str]:
+        """
+        Build BM25 query tokens from an incentive.
+        
+        Args:
+            incentive: Incentive to match
+            
+        Returns:
+            List of query tokens
+        """
+        # Tokens only change when the incentive does
+        updated_at = getattr(incentive, 'updated_at', None)
+        cache_key = (incentive.incentive_id, updated_at)
+        if updated_at is not None:
+            cached = self._query_tokens_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         query_parts = [incentive.title]
         
         if incentive.description:
@@ -220,58 +454,66 @@ class MatchingService:
         query_text = ' '.join(query_parts).lower()
         query_tokens = self._tokenize_text(query_text)
         
-        # Create document from company
-        doc_parts = [company.name]
-        
-        if company.cae_codes:
-            doc_parts.extend(company.cae_codes)
+        if updated_at is not None:
+            self._query_tokens_cache.set(cache_key, query_tokens)
         
-        if company.raw and company.raw.get('description'):
-            doc_parts.append(company.raw['description'])
-        
-        if company.district:
-            doc_parts.append(company.district)
-        
-        doc_text = ' '.join(doc_parts).lower()
-        doc_tokens = self._tokenize_text(doc_text)
-        
-        # Calculate improved BM25-like score
-        query_set = set(query_tokens)
-        doc_set = set(doc_tokens)
-        
-        intersection = query_set.intersection(doc_set)
+        return query_tokens
+    
+    def _bm25_scores_from_index(
+        self,
+        db: Session,
+        ctx: IncentiveContext,
+        company_ids: List[str]
+    ) -> Optional[Dict[str, float]]:
+        """
+        Score all candidates with one query against the precomputed BM25 index.
         
-        if not query_set:
-            return 0.0
+        Args:
+            db: Database session
+            ctx: Context of the incentive to match
+            company_ids: Candidate company IDs
+            
+        Returns:
+            Dict mapping each indexed company_id to its normalized BM25
+            score (0-1), or None if the index is not available
+        """
+        if not self._bm25_index_ready:
+            self._bm25_index_ready = index_available(db)
+            if not self._bm25_index_ready:
+                return None
         
-        # Calculate term frequency in document
-        doc_token_counts = {}
-        for token in doc_tokens:
-            doc_token_counts[token] = doc_token_counts.get(token, 0) + 1
+        query_set = ctx.query_set
+        raw_scores = score_companies(db, sorted(query_set), company_ids)
+        if raw_scores is None:
+            return None
         
-        # Calculate BM25-like score with term frequency
-        score = 0.0
-        for token in intersection:
-            tf = doc_token_counts.get(token, 0)
-            if tf > 0:
-                # Simple BM25 formula: tf / (tf + k1 * (1 - b + b * (doc_len / avg_doc_len)))
-                # Simplified version with k1=1.2, b=0.75, avg_doc_len=50
-                doc_len = len(doc_tokens)
-                avg_doc_len = 50
-                k1, b = 1.2, 0.75
-                
-                idf = 1.0  # Simplified IDF
-                bm25_term = (tf * idf) / (tf + k1 * (1 - b + b * (doc_len / avg_doc_len)))
-                score += bm25_term
+        return {
+            company_id: self._normalize_bm25(score, len(query_set))
+            for company_id, score in raw_scores.items()
+        }
+    
+    def _refresh_idf(self, db: Session) -> None:
+        """
+        Reload the global IDF table and average document length if they are
+        older than IDF_REFRESH_SEC.
         
-        # Normalize by query length
-        normalized_score = score / len(query_set) if query_set else 0.0
+        On failure the previous values are kept until the next refresh.
         
-        # Apply sigmoid to get 0-1 range
-        import math
-        sigmoid_score = 1 / (1 + math.exp(-normalized_score * 5))  # Scale factor of 5
+        Args:
+            db: Database session
+        """
+        now = time.monotonic()
+        if self._idf_cache_ts is not None and now - self._idf_cache_ts < IDF_REFRESH_SEC:
+            return
         
-        return float(sigmoid_score)
+        self._idf_cache_ts = now
+        idf = load_idf(db)
+        if idf is not None:
+            self._idf_cache = idf
+            logger.info("bm25_idf_loaded", tokens=len(idf))
+        avg_doc_len = load_avg_doc_len(db)
+        if avg_doc_len:
+            self._avg_doc_len = avg_doc_len
     
     def _tokenize_text(self, text: str) -> List[str]:
         """
@@ -283,26 +525,51 @@ class MatchingService:
         Returns:
             List of tokens
         """
-        import re
+        return tokenize_text(text)
+    
+    def _split_rerank_candidates(
+        self,
+        incentive: Incentive,
+        candidates: List[Dict]
+    ) -> Tuple[Dict[str, Tuple[float, str]], List[CandidateRow]]:
+        """
+        Settle clear-cut candidates without the LLM.
         
-        # Remove punctuation and split
-        text = re.sub(r'[^\w\s]', ' ', text.lower())
-        tokens = text.split()
+        Clear matches pass every filter, are very close in embedding space
+        and share several CAE codes with the incentive. Clear mismatches
+        failed at least two filters. Only the rest is sent to the LLM.
         
-        # Remove very short tokens and common words
-        stop_words = {'de', 'da', 'do', 'em', 'para', 'com', 'por', 'que', 'e', 'a', 'o', 'as', 'os', 'um', 'uma', 'uns', 'umas'}
+        Args:
+            incentive: Incentive to match
+            candidates: Scored candidates (as built in find_matches)
+            
+        Returns:
+            Tuple of (decided company_id -> (score, reason), companies for the LLM)
+        """
+        incentive_caes = set((incentive.ai_description or {}).get('caes', []))
         
-        filtered_tokens = []
-        for token in tokens:
-            if len(token) > 2 and token not in stop_words:
-                filtered_tokens.append(token)
+        decided = {}
+        ambiguous = []
+        for candidate in candidates:
+            company = candidate['company']
+            penalty = candidate['component_scores']['penalty']
+            shared_caes = incentive_caes.intersection(company.cae_codes or [])
+            
+            if (penalty == 1.0
+                    and candidate['component_scores']['vector'] > AUTO_MATCH_MIN_VECTOR
+                    and len(shared_caes) >= AUTO_MATCH_MIN_SHARED_CAES):
+                decided[company.company_id] = AUTO_MATCH
+            elif len(candidate['penalties_applied']) >= 2:
+                decided[company.company_id] = AUTO_REJECT
+            else:
+                ambiguous.append(company)
         
-        return filtered_tokens
+        return decided, ambiguous
     
     def _llm_rerank(
         self,
         incentive: Incentive,
-        companies: List[Company],
+        companies: List[Union[Company, CandidateRow]],
         document_id: Optional[str] = None
     ) -> Dict[str, Tuple[float, str]]:
         """
@@ -316,9 +583,114 @@ class MatchingService:
         Returns:
             Dict mapping company_id to (score, explanation)
         """
+        companies = companies[:RERANK_TOP_N]  # Limit to top 20
+        if not companies:
+            return {}
+        
+        cache_key, cached = self._rerank_cache_lookup(incentive, companies)
+        if cached is not None:
+            return cached
+        
+        try:
+            result = self.client.chat_completion(
+                messages=self._rerank_messages(incentive, companies),
+                model="gpt-4o-mini",
+                temperature=0.0,
+                response_format={"type": "json_object"},
+                document_id=document_id
+            )
+            return self._parse_rerank_result(incentive, companies, result, cache_key)
+            
+        except Exception as e:
+            logger.error("llm_reranking_failed",
+                        incentive_id=incentive.incentive_id,
+                        error=str(e),
+                        exc_info=True)
+            return {}
+    
+    async def _llm_rerank_async(
+        self,
+        incentive: Incentive,
+        companies: List[Union[Company, CandidateRow]],
+        document_id: Optional[str] = None
+    ) -> Dict[str, Tuple[float, str]]:
+        """
+        Async variant of _llm_rerank (same prompt, caching and result).
+        
+        Args:
+            incentive: Incentive to match
+            companies: List of companies to evaluate
+            document_id: Document ID for cost tracking
+            
+        Returns:
+            Dict mapping company_id to (score, explanation)
+        """
+        companies = companies[:RERANK_TOP_N]  # Limit to top 20
         if not companies:
             return {}
         
+        cache_key, cached = self._rerank_cache_lookup(incentive, companies)
+        if cached is not None:
+            return cached
+        
+        try:
+            result = await self.client.chat_completion_async(
+                messages=self._rerank_messages(incentive, companies),
+                model="gpt-4o-mini",
+                temperature=0.0,
+                response_format={"type": "json_object"},
+                document_id=document_id
+            )
+            return self._parse_rerank_result(incentive, companies, result, cache_key)
+            
+        except Exception as e:
+            logger.error("llm_reranking_failed",
+                        incentive_id=incentive.incentive_id,
+                        error=str(e),
+                        exc_info=True)
+            return {}
+    
+    def _rerank_cache_lookup(
+        self,
+        incentive: Incentive,
+        companies: List[Union[Company, CandidateRow]]
+    ) -> Tuple[tuple, Optional[Dict[str, Tuple[float, str]]]]:
+        """
+        Look up a previous re-ranking of the same candidates.
+        
+        Args:
+            incentive: Incentive to match
+            companies: Companies to evaluate
+            
+        Returns:
+            Tuple of (cache key, cached result or None)
+        """
+        # Same incentive (and version) with the same candidates -> same ranking
+        cache_key = (
+            incentive.incentive_id,
+            getattr(incentive, 'updated_at', None),
+            tuple(sorted(c.company_id for c in companies))
+        )
+        cached = self._rerank_cache.get(cache_key)
+        if cached is not None:
+            logger.info("llm_reranking_cache_hit", incentive_id=incentive.incentive_id)
+        return cache_key, cached
+    
+    def _rerank_messages(
+        self,
+        incentive: Incentive,
+        companies: List[Union[Company, CandidateRow]]
+    ) -> List[Dict[str, str]]:
+        """
+        Build the re-ranking prompt.
+        
+        Args:
+            incentive: Incentive to match
+            companies: Companies to evaluate
+            
+        Returns:
+            Chat messages
+        """
         # Create prompt for LLM
         incentive_desc = f"""
 Incentivo: {incentive.title}
@@ -333,7 +705,7 @@ Descrição: {incentive.description or 'N/A'}
                 incentive_desc += f"\nCritérios: {', '.join(ai_desc['eligibility_criteria'][:3])}"
         
         companies_desc = []
-        for i, company in enumerate(companies[:20], 1):  # Limit to top 20
+        for i, company in enumerate(companies, 1):
             comp_desc = f"{i}. {company.name}"
             if company.cae_codes:
                 comp_desc += f" (CAE: {', '.join(company.cae_codes[:3])})"
@@ -341,12 +713,14 @@ Descrição: {incentive.description or 'N/A'}
                 comp_desc += f" - {company.district}"
             companies_desc.append(comp_desc)
         
-        prompt = f"""Avalia a adequação destas empresas ao seguinte incentivo.
+        # Static part first (role, instructions, incentive) so it forms an
+        # identical prefix across calls for the same incentive and can be
+        # served from the provider's prompt cache; only companies vary.
+        system_prompt = f"""Você é um especialista em matching de incentivos públicos com empresas.
 
-{incentive_desc}
+Avalia a adequação das empresas indicadas ao seguinte incentivo.
 
-Empresas:
-{chr(10).join(companies_desc)}
+{incentive_desc}
 
 Para cada empresa, atribui:
 1. Score de 0-10 (0=inadequada, 10=perfeita)
@@ -361,44 +735,53 @@ Responde em JSON:
 }}
 """
         
-        try:
-            result = self.client.chat_completion(
-                messages=[
-                    {"role": "system", "content": "Você é um especialista em matching de incentivos públicos com empresas."},
-                    {"role": "user", "content": prompt}
-                ],
-                model="gpt-4o-mini",
-                temperature=0.0,
-                response_format={"type": "json_object"},
-                document_id=document_id
-            )
-            
-            import json
-            response_data = json.loads(result["response"])
-            
-            # Map results back to companies
-            results = {}
-            for ranking in response_data.get("rankings", []):
-                idx = ranking.get("company_index", 0) - 1
-                if 0 <= idx < len(companies):
-                    company = companies[idx]
-                    score = ranking.get("score", 5) / 10.0  # Normalize to 0-1
-                    reason = ranking.get("reason", "")
-                    results[company.company_id] = (score, reason)
-            
-            logger.info("llm_reranking_complete",
-                       incentive_id=incentive.incentive_id,
-                       companies_evaluated=len(companies),
-                       cost_eur=result.get("cost_eur", 0))
-            
-            return results
+        prompt = f"""Empresas:
+{chr(10).join(companies_desc)}
+"""
+        
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _parse_rerank_result(
+        self,
+        incentive: Incentive,
+        companies: List[Union[Company, CandidateRow]],
+        result: Dict,
+        cache_key: tuple
+    ) -> Dict[str, Tuple[float, str]]:
+        """
+        Map the LLM rankings back to companies and cache them.
+        
+        Args:
+            incentive: Incentive to match
+            companies: Companies that were evaluated (prompt order)
+            result: chat_completion result
+            cache_key: Key from _rerank_cache_lookup
             
-        except Exception as e:
-            logger.error("llm_reranking_failed",
-                        incentive_id=incentive.incentive_id,
-                        error=str(e),
-                        exc_info=True)
-            return {}
+        Returns:
+            Dict mapping company_id to (score, explanation)
+        """
+        response_data = json.loads(result["response"])
+        
+        # Map results back to companies
+        results = {}
+        for ranking in response_data.get("rankings", []):
+            idx = ranking.get("company_index", 0) - 1
+            if 0 <= idx < len(companies):
+                company = companies[idx]
+                score = ranking.get("score", 5) / 10.0  # Normalize to 0-1
+                reason = ranking.get("reason", "")
+                results[company.company_id] = (score, reason)
+        
+        logger.info("llm_reranking_complete",
+                   incentive_id=incentive.incentive_id,
+                   companies_evaluated=len(companies),
+                   cost_eur=result.get("cost_eur", 0))
+        
+        self._rerank_cache.set(cache_key, results)
+        return results
     
     def find_matches(
         self,
@@ -421,6 +804,104 @@ Responde em JSON:
         Returns:
             List of MatchResult objects
         """
+        prepared = self._score_candidates(
+            db, incentive_id, candidate_pool, max(RERANK_TOP_N, top_k)
+        )
+        if prepared is None:
+            return []
+        incentive, scored_candidates = prepared
+        
+        # 4. LLM re-ranking for top candidates
+        llm_scores = {}
+        if use_llm and scored_candidates:
+            llm_scores, top_candidates = self._rerank_inputs(incentive, scored_candidates)
+            document_id = f"rerank_{incentive_id}"
+            llm_scores.update(self._llm_rerank(incentive, top_candidates, document_id))
+        
+        return self._build_results(incentive, scored_candidates, llm_scores, top_k, use_llm)
+    
+    async def find_matches_batch(
+        self,
+        db: Session,
+        incentive_ids: List[str],
+        top_k: int = 5,
+        candidate_pool: int = 100,
+        use_llm: bool = True,
+        max_concurrent: int = 8
+    ) -> Dict[str, List[MatchResult]]:
+        """
+        Find top matching companies for several incentives.
+        
+        Candidate retrieval and scoring share the database session and run
+        one incentive at a time; the LLM re-ranking calls, which dominate
+        latency, run concurrently (at most `max_concurrent` in flight).
+        
+        Args:
+            db: Database session
+            incentive_ids: IDs of incentives to match
+            top_k: Number of top matches to return per incentive
+            candidate_pool: Number of candidates to consider
+            use_llm: Whether to use LLM for re-ranking
+            max_concurrent: Maximum concurrent LLM requests
+            
+        Returns:
+            Dict mapping incentive_id to its list of MatchResult objects
+        """
+        prepared = {}
+        for incentive_id in incentive_ids:
+            result = self._score_candidates(
+                db, incentive_id, candidate_pool, max(RERANK_TOP_N, top_k)
+            )
+            if result is not None:
+                prepared[incentive_id] = result
+        
+        semaphore = asyncio.Semaphore(max_concurrent)
+        
+        async def rerank(incentive_id: str) -> Dict[str, Tuple[float, str]]:
+            incentive, scored_candidates = prepared[incentive_id]
+            if not use_llm or not scored_candidates:
+                return {}
+            
+            llm_scores, top_candidates = self._rerank_inputs(incentive, scored_candidates)
+            async with semaphore:
+                llm_scores.update(await self._llm_rerank_async(
+                    incentive, top_candidates, f"rerank_{incentive_id}"
+                ))
+            return llm_scores
+        
+        all_llm_scores = await asyncio.gather(*(rerank(i) for i in prepared))
+        
+        matches = {incentive_id: [] for incentive_id in incentive_ids}
+        for (incentive_id, (incentive, scored_candidates)), llm_scores in zip(
+            prepared.items(), all_llm_scores
+        ):
+            matches[incentive_id] = self._build_results(
+                incentive, scored_candidates, llm_scores, top_k, use_llm
+            )
+        
+        return matches
+    
+    def _score_candidates(
+        self,
+        db: Session,
+        incentive_id: str,
+        candidate_pool: int,
+        keep: int
+    ) -> Optional[Tuple[Incentive, List[Dict]]]:
+        """
+        Retrieve candidates and compute their preliminary (non-LLM) scores.
+        
+        Args:
+            db: Database session
+            incentive_id: ID of incentive to match
+            candidate_pool: Number of candidates to consider
+            keep: Number of best-scored candidates to return
+            
+        Returns:
+            Tuple of (incentive, top `keep` scored candidates sorted by
+            preliminary score), or None if the incentive or its embedding
+            is missing
+        """
         # Load incentive and its embedding
         incentive = db.query(Incentive).filter(
             Incentive.incentive_id == incentive_id
@@ -428,7 +909,7 @@ Responde em JSON:
         
         if not incentive:
             logger.error("incentive_not_found", incentive_id=incentive_id)
-            return []
+            return None
         
         incentive_embedding = db.query(IncentiveEmbedding).filter(
             IncentiveEmbedding.incentive_id == incentive_id
@@ -436,100 +917,151 @@ Responde em JSON:
         
         if not incentive_embedding or incentive_embedding.embedding is None:
             logger.error("incentive_embedding_not_found", incentive_id=incentive_id)
-            return []
+            return None
+        
+        # Everything that depends only on the incentive, computed once.
+        # The embedding is kept as the float32 array loaded by the pgvector
+        # adapter and bound as-is below (no text serialization); any later
+        # Python-side rescoring should reuse ctx.query_embedding.
+        ctx = self._incentive_context(incentive, incentive_embedding.embedding)
         
         # Get candidate companies using vector similarity
-        # Using raw SQL for pgvector compatibility
-        incentive_emb_list = incentive_embedding.embedding.tolist() if hasattr(incentive_embedding.embedding, 'tolist') else list(incentive_embedding.embedding)
-        embedding_str = '[' + ','.join(map(str, incentive_emb_list)) + ']'
+        # Recall/speed trade-off of the HNSW index for this transaction
+        db.execute(text(f"SET LOCAL hnsw.ef_search = {HNSW_EF_SEARCH}"))
         
-        # Use raw SQL query for vector similarity
+        # Raw SQL with the <=> operator on halfvec so the HNSW index is used
+        # for ordering; the returned similarity is exact (full precision).
+        # Only the fields the scorer reads are projected: the similarity is
+        # computed in the database and only the description is taken from raw.
         sql_query = text("""
             SELECT 
-                c.company_id, c.name, c.cae_codes, c.size, c.district, c.county, c.parish, c.website, c.raw,
-                ce.embedding,
-                (1 - cosine_distance(ce.embedding, :embedding)) as vector_similarity
+                c.company_id, c.name, c.cae_codes, c.size, c.district,
+                c.raw->>'description' AS raw_description,
+                1 - (ce.embedding <=> :embedding) AS vector_similarity
             FROM companies c
             JOIN company_embeddings ce ON c.company_id = ce.company_id
             WHERE ce.embedding IS NOT NULL
-            ORDER BY vector_similarity DESC
+            ORDER BY CAST(ce.embedding AS halfvec(1536)) <=> CAST(:embedding AS halfvec(1536))
             LIMIT :limit
         """)
         
-        result = db.execute(sql_query, {'embedding': embedding_str, 'limit': candidate_pool})
-        
-        # Convert results to our expected format
-        candidates = []
-        for row in result:
-            # Create mock objects for compatibility
-            company = Company(
-                company_id=row.company_id,
-                name=row.name,
-                cae_codes=row.cae_codes,
-                size=row.size,
-                district=row.district,
-                county=row.county,
-                parish=row.parish,
-                website=row.website,
-                raw=row.raw
-            )
-            
-            embedding = CompanyEmbedding(
-                company_id=row.company_id,
-                embedding=row.embedding
+        result = db.execute(sql_query, {'embedding': ctx.query_embedding, 'limit': candidate_pool})
+        
+        # Plain rows for scoring; no ORM entities are needed here
+        candidates = [
+            CandidateRow(
+                row.company_id,
+                row.name,
+                row.cae_codes,
+                row.size,
+                row.district,
+                row.raw_description,
+                row.vector_similarity
             )
-            
-            candidates.append((company, embedding, row.vector_similarity))
+            for row in result
+        ]
         
         logger.info("candidates_retrieved",
                    incentive_id=incentive_id,
                    candidates_count=len(candidates))
         
-        # Calculate scores for each candidate
-        scored_candidates = []
+        # BM25 for all candidates in one indexed query; candidates missing
+        # from the index (not built, or companies loaded since) are scored in
+        # one vectorized pass
+        bm25_by_id = self._bm25_scores_from_index(
+            db, ctx, [company.company_id for company in candidates]
+        ) or {}
+        unindexed = [company for company in candidates if company.company_id not in bm25_by_id]
+        if unindexed:
+            self._refresh_idf(db)
+            bm25_by_id.update(zip(
+                (company.company_id for company in unindexed),
+                self._bm25_scores_batch(ctx, unindexed)
+            ))
+        bm25_scores = np.array([bm25_by_id[company.company_id] for company in candidates])
         
-        for company, embedding, vector_sim in candidates:
-            # 1. Apply deterministic filters
-            penalty, penalties_applied = self._apply_deterministic_filters(
-                incentive, company
-            )
-            
-            # 2. Vector similarity (already calculated)
-            vector_score = float(vector_sim)
-            
-            # 3. BM25 score
-            bm25_score = self._calculate_bm25_score(incentive, company)
-            
-            # Store component scores
-            component_scores = {
-                'vector': vector_score,
-                'bm25': bm25_score,
-                'penalty': penalty
+        # Deterministic filters (per candidate; the penalties applied are
+        # kept for the explanation)
+        filter_results = [
+            self._apply_deterministic_filters(ctx, company)
+            for company in candidates
+        ]
+        
+        # Columnar scoring: one vector per component, combined in one pass
+        vector_scores = np.array([company.vector_similarity for company in candidates], dtype=np.float64)
+        penalties = np.array([penalty for penalty, _ in filter_results], dtype=np.float64)
+        prelim_scores = (
+            self.weights['vector'] * vector_scores +
+            self.weights['bm25'] * bm25_scores
+        ) * penalties
+        
+        # Select the best `keep` by preliminary score (O(N log K); ties keep
+        # retrieval order) and only build records for those
+        scores = prelim_scores.tolist()
+        order = heapq.nlargest(keep, range(len(scores)), key=scores.__getitem__)
+        scored_candidates = [
+            {
+                'company': candidates[i],
+                'score': scores[i],
+                'component_scores': {
+                    'vector': float(vector_scores[i]),
+                    'bm25': float(bm25_scores[i]),
+                    'penalty': float(penalties[i])
+                },
+                'penalties_applied': filter_results[i][1]
             }
-            
-            # Calculate preliminary score (without LLM)
-            prelim_score = (
-                self.weights['vector'] * vector_score +
-                self.weights['bm25'] * bm25_score
-            ) * penalty
-            
-            scored_candidates.append({
-                'company': company,
-                'score': prelim_score,
-                'component_scores': component_scores,
-                'penalties_applied': penalties_applied
-            })
+            for i in order
+        ]
         
-        # Sort by preliminary score
-        scored_candidates.sort(key=lambda x: x['score'], reverse=True)
+        return incentive, scored_candidates
+    
+    def _rerank_inputs(
+        self,
+        incentive: Incentive,
+        scored_candidates: List[Dict]
+    ) -> Tuple[Dict[str, Tuple[float, str]], List[CandidateRow]]:
+        """
+        Pick the top candidates for re-ranking and settle the clear-cut ones.
         
-        # 4. LLM re-ranking for top candidates
-        llm_scores = {}
-        if use_llm and scored_candidates:
-            top_candidates = [c['company'] for c in scored_candidates[:20]]
-            document_id = f"rerank_{incentive_id}"
-            llm_scores = self._llm_rerank(incentive, top_candidates, document_id)
+        Args:
+            incentive: Incentive to match
+            scored_candidates: Candidates sorted by preliminary score
+            
+        Returns:
+            Tuple of (scores decided without the LLM, companies for the LLM)
+        """
+        llm_scores, top_candidates = self._split_rerank_candidates(
+            incentive, scored_candidates[:RERANK_TOP_N]
+        )
+        if llm_scores:
+            logger.info("llm_calls_saved",
+                       incentive_id=incentive.incentive_id,
+                       decided_without_llm=len(llm_scores),
+                       sent_to_llm=len(top_candidates))
+        
+        return llm_scores, top_candidates
+    
+    def _build_results(
+        self,
+        incentive: Incentive,
+        scored_candidates: List[Dict],
+        llm_scores: Dict[str, Tuple[float, str]],
+        top_k: int,
+        use_llm: bool
+    ) -> List[MatchResult]:
+        """
+        Combine preliminary and LLM scores into the final ranked matches.
         
+        Args:
+            incentive: Incentive being matched
+            scored_candidates: Candidates sorted by preliminary score
+            llm_scores: company_id -> (LLM score, reason)
+            top_k: Number of top matches to return
+            use_llm: Whether LLM scores are part of the final score
+            
+        Returns:
+            List of MatchResult objects, best first
+        """
         # Combine all scores
         final_results = []
         
@@ -575,7 +1107,7 @@ Responde em JSON:
         final_results.sort(key=lambda x: x.score, reverse=True)
         
         logger.info("matching_complete",
-                   incentive_id=incentive_id,
+                   incentive_id=incentive.incentive_id,
                    matches_found=len(final_results),
                    top_score=final_results[0].score if final_results else 0)
         
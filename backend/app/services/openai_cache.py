@@ -3,35 +3,295 @@ SQLite cache for OpenAI API responses.
 Prevents duplicate requests and tracks costs.
 """
 
+import atexit
 import hashlib
 import json
 import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields, replace
 from datetime import datetime
+from functools import cached_property
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Sequence, Tuple, Union, Callable
 
+import numpy as np
+import orjson
 import structlog
 
 logger = structlog.get_logger()
 
+# Cache key hash: BLAKE3 if installed, otherwise SHA-256 (hardware-accelerated
+# through OpenSSL on CPUs with SHA extensions). Keys carry a scheme prefix so
+# they never collide with keys produced by another hash or an older format.
+# The cache stores only hashes, not the prompts or texts they were computed
+# from, so old keys cannot be rehashed in bulk: rows are moved to the current
+# key lazily, on the first miss that recomputes their legacy key (batched per
+# call by get_embeddings_batch).
+_KEY_HASHERS: Dict[str, Callable] = {"s256": hashlib.sha256}
+try:
+    from blake3 import blake3
+    _KEY_HASHERS["b3"] = blake3
+    KEY_SCHEME = "b3"
+except ImportError:
+    KEY_SCHEME = "s256"
+_key_hasher = _KEY_HASHERS[KEY_SCHEME]
+
+# Connection settings: WAL lets readers proceed during writes and turns each
+# commit into a WAL append; NORMAL sync is safe with WAL (no corruption, at
+# most the last commits lost on power failure).
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",  # 64 MB page cache
+    "PRAGMA mmap_size=268435456",  # 256 MB memory-mapped I/O
+)
+
+# Embeddings are stored as raw float16 bytes (3 KB for 1536 dimensions
+# instead of ~25 KB of JSON text). The dtype is stored per row so older
+# JSON-only rows and future formats can still be decoded.
+EMBEDDING_DTYPE = "float16"
+
+# Embeddings cache table; embedding_json only holds embeddings written before
+# embedding_blob (NULL otherwise)
+_EMBEDDING_CACHE_TABLE = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        text_hash TEXT PRIMARY KEY,
+        model TEXT NOT NULL,
+        embedding_json TEXT,
+        embedding_blob BLOB,
+        dtype TEXT,
+        dimension INTEGER NOT NULL,
+        tokens INTEGER NOT NULL,
+        cost_eur REAL NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_accessed TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        access_count INTEGER DEFAULT 1
+    )
+"""
+_EMBEDDING_CACHE_COLUMNS = (
+    "text_hash, model, embedding_json, embedding_blob, dtype, dimension, "
+    "tokens, cost_eur, created_at, last_accessed, access_count"
+)
+
+# response_json payloads above this size are stored compressed in
+# response_json_blob: zstd if installed, otherwise zlib. The codec is stored
+# per row, so a cache written with one stays readable wherever it is available.
+JSON_COMPRESS_MIN_BYTES = 2048
+try:
+    import zstandard
+    _zstd_compressor = zstandard.ZstdCompressor(level=3)
+    _zstd_decompressor = zstandard.ZstdDecompressor()
+    JSON_CODEC = "zstd"
+except ImportError:
+    zstandard = None
+    JSON_CODEC = "zlib"
+
+
+def _compress(data: bytes) -> bytes:
+    """Compress with JSON_CODEC."""
+    if JSON_CODEC == "zstd":
+        return _zstd_compressor.compress(data)
+    return zlib.compress(data, 6)
+
+
+def _decompress(blob: bytes, codec: str) -> Optional[bytes]:
+    """Decompress a blob, or None if its codec is not available here."""
+    if codec == "zlib":
+        return zlib.decompress(blob)
+    if codec == "zstd" and zstandard is not None:
+        return _zstd_decompressor.decompress(blob)
+    return None
+
+# Entries kept in memory per cache (LLM responses and embeddings each)
+MEM_CACHE_SIZE = 4096
+
+# Cost rows after which planner statistics are first gathered
+ANALYZE_MIN_ROWS = 1000
+
+# Pending hit counts that force an access stats flush
+ACCESS_FLUSH_SIZE = 1000
+
+# Keys per SELECT ... IN (...) when looking up embeddings in bulk
+SELECT_CHUNK_SIZE = 500
+
+# Seconds the current UTC date string is reused before being recomputed
+DATE_REFRESH_SEC = 30
+
+
+@dataclass
+class CachedLLMResponse:
+    """
+    LLM response served from the cache.
+    
+    `response_json` is parsed from the stored JSON text on first access, so
+    hits that only read `response` never parse it. Also supports the dict
+    access (`cached["usage"]`, `cached.get(...)`) of the former return value.
+    """
+    response: str
+    usage: Dict[str, int]
+    original_cost_eur: float
+    cost_eur: float = 0.0  # No cost for cache hit
+    from_cache: bool = True
+    _json_raw: Optional[Union[str, bytes]] = field(default=None, repr=False)
+    
+    @cached_property
+    def response_json(self) -> Optional[Dict]:
+        return json.loads(self._json_raw) if self._json_raw else None
+    
+    def _keys(self) -> List[str]:
+        return [f.name for f in fields(self) if not f.name.startswith("_")] + ["response_json"]
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._keys():
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys()
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+    
+    def copy(self) -> "CachedLLMResponse":
+        """Copy sharing the stored JSON text but not its parsed object."""
+        return replace(self)
+
 
 class OpenAICache:
     """SQLite-based cache for OpenAI API responses."""
     
-    def __init__(self, cache_path: str = ".cache/openai_cache.db"):
+    def __init__(
+        self,
+        cache_path: str = ".cache/openai_cache.db",
+        mem_cache_size: int = MEM_CACHE_SIZE
+    ):
         """
         Initialize cache.
         
         Args:
             cache_path: Path to SQLite database file
+            mem_cache_size: Hot entries kept in memory per table (0 disables)
         """
         self.cache_path = Path(cache_path)
         self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # One connection for the lifetime of the cache (keeps SQLite's page
+        # and statement caches warm); autocommit, shared across threads
+        # under a lock
+        self._lock = threading.Lock()
+        self._conn = self._connect()
         self._init_db()
+        
+        # In-process LRU in front of SQLite for repeated keys within a run.
+        self._mem_cap = mem_cache_size
+        self._llm_mem: "OrderedDict[str, CachedLLMResponse]" = OrderedDict()
+        self._emb_mem: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._date_cache = (0.0, "")
+        
+        # Hits are counted in memory and written to access_count/last_accessed
+        # together with the next cost tracking write, instead of one UPDATE
+        # per hit
+        self._llm_hits: Counter = Counter()
+        self._emb_hits: Counter = Counter()
+        atexit.register(self.close)
+    
+    def _configure(self, conn: sqlite3.Connection) -> sqlite3.Connection:
+        """Apply PRAGMAs (journal_mode persists in the file, the rest are per connection)."""
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a configured autocommit connection to the cache database.
+        
+        No row_factory is set: rows stay plain tuples (the C fast path) and
+        are indexed by position throughout, stats queries included.
+        """
+        return self._configure(sqlite3.connect(
+            self.cache_path,
+            check_same_thread=False,
+            isolation_level=None
+        ))
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._flush_access_stats()
+                self._conn.execute("PRAGMA optimize")
+                self._conn.close()
+                self._conn = None
+    
+    def _today(self) -> str:
+        """Current UTC date (ISO format), recomputed at most every DATE_REFRESH_SEC."""
+        now = time.time()
+        computed_at, today = self._date_cache
+        if now - computed_at > DATE_REFRESH_SEC:
+            today = datetime.utcfromtimestamp(now).date().isoformat()
+            self._date_cache = (now, today)
+        return today
+    
+    def _record_hit(self, hits: Counter, key: str):
+        """Count a cache hit, flushing when many are pending (lock held)."""
+        hits[key] += 1
+        if len(self._llm_hits) + len(self._emb_hits) >= ACCESS_FLUSH_SIZE:
+            self._flush_access_stats()
+    
+    def _flush_access_stats(self):
+        """Write pending hit counts to the access stats columns (lock held)."""
+        for table, column, hits in (
+            ("llm_cache", "cache_key", self._llm_hits),
+            ("embedding_cache", "text_hash", self._emb_hits),
+        ):
+            if hits:
+                self._conn.executemany(
+                    f"""
+                    UPDATE {table}
+                    SET last_accessed = CURRENT_TIMESTAMP, access_count = access_count + ?
+                    WHERE {column} = ?
+                    """,
+                    [(count, key) for key, count in hits.items()]
+                )
+                hits.clear()
+    
+    def _mem_get(self, mem: OrderedDict, key: str) -> Optional[Any]:
+        """Look up a hot entry (lock held). Returns a copy callers may modify."""
+        entry = mem.get(key)
+        if entry is None:
+            return None
+        mem.move_to_end(key)
+        return entry.copy()
+    
+    def _mem_put(self, mem: OrderedDict, key: str, entry: Any):
+        """Store a hot entry, evicting the oldest if full (lock held)."""
+        if self._mem_cap <= 0:
+            return
+        mem[key] = entry
+        mem.move_to_end(key)
+        while len(mem) > self._mem_cap:
+            mem.popitem(last=False)
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run several statements in one write transaction (one commit)."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
     
     def _init_db(self):
         """Create cache tables if they don't exist."""
-        conn = sqlite3.connect(self.cache_path)
+        conn = self._conn
         
         # LLM completions cache
         conn.execute("""
@@ -41,6 +301,8 @@ class OpenAICache:
                 prompt_hash TEXT NOT NULL,
                 response_text TEXT NOT NULL,
                 response_json TEXT,
+                response_json_blob BLOB,
+                json_codec TEXT,
                 input_tokens INTEGER NOT NULL,
                 output_tokens INTEGER NOT NULL,
                 cost_eur REAL NOT NULL,
@@ -51,20 +313,23 @@ class OpenAICache:
         """)
         
         # Embeddings cache
+        conn.execute(_EMBEDDING_CACHE_TABLE.format(name="embedding_cache"))
+        
+        # Validated extraction results, keyed on the extractor's inputs (so
+        # a hit skips building and sending the prompt altogether)
         conn.execute("""
-            CREATE TABLE IF NOT EXISTS embedding_cache (
-                text_hash TEXT PRIMARY KEY,
-                model TEXT NOT NULL,
-                embedding_json TEXT NOT NULL,
-                dimension INTEGER NOT NULL,
-                tokens INTEGER NOT NULL,
-                cost_eur REAL NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_accessed TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                access_count INTEGER DEFAULT 1
+            CREATE TABLE IF NOT EXISTS extraction_cache (
+                input_key TEXT PRIMARY KEY,
+                result_json TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
         
+        # Binary columns, added to caches created before them
+        self._add_missing_columns("llm_cache", {"response_json_blob": "BLOB", "json_codec": "TEXT"})
+        self._add_missing_columns("embedding_cache", {"embedding_blob": "BLOB", "dtype": "TEXT"})
+        self._make_embedding_json_nullable()
+        
         # Cost tracking
         conn.execute("""
             CREATE TABLE IF NOT EXISTS cost_tracking (
@@ -76,71 +341,217 @@ class OpenAICache:
                 input_tokens INTEGER,
                 output_tokens INTEGER,
                 cost_eur REAL NOT NULL,
-                from_cache INTEGER DEFAULT 0
+                from_cache INTEGER DEFAULT 0,
+                requests INTEGER DEFAULT 1
             )
         """)
+        # Rows aggregate several requests since track_costs_batch groups them
+        self._add_missing_columns("cost_tracking", {"requests": "INTEGER DEFAULT 1"})
         
         # Indexes
         conn.execute("CREATE INDEX IF NOT EXISTS idx_cost_date ON cost_tracking(date)")
+        # Covers get_stats, which then never reads the table rows (replaces
+        # idx_cost_cover, from before the requests column)
+        conn.execute("DROP INDEX IF EXISTS idx_cost_cover")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cost_totals "
+            "ON cost_tracking(date, model, from_cache, cost_eur, requests)"
+        )
         conn.execute("CREATE INDEX IF NOT EXISTS idx_cost_timestamp ON cost_tracking(timestamp)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_prompt ON llm_cache(prompt_hash)")
         
-        conn.commit()
-        conn.close()
+        # Planner statistics: gathered once the cache holds some data, then
+        # kept current by PRAGMA optimize on close
+        has_stats = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        ).fetchone()
+        if not has_stats and conn.execute(
+            "SELECT COUNT(*) FROM cost_tracking"
+        ).fetchone()[0] >= ANALYZE_MIN_ROWS:
+            conn.execute("ANALYZE")
         
         logger.info("cache_initialized", path=str(self.cache_path))
     
+    def _make_embedding_json_nullable(self):
+        """
+        Rebuild an older embedding_cache whose embedding_json is NOT NULL.
+        
+        Rows written with an embedding_blob have no JSON; SQLite cannot drop
+        a NOT NULL constraint in place, so the table is copied once (empty
+        JSON placeholders become NULL).
+        """
+        with self._transaction() as conn:
+            not_null = {row[1]: row[3] for row in conn.execute("PRAGMA table_info(embedding_cache)")}
+            if not not_null["embedding_json"]:
+                return
+            
+            conn.execute(_EMBEDDING_CACHE_TABLE.format(name="embedding_cache_new"))
+            conn.execute(f"""
+                INSERT INTO embedding_cache_new ({_EMBEDDING_CACHE_COLUMNS})
+                SELECT {_EMBEDDING_CACHE_COLUMNS.replace("embedding_json", "NULLIF(embedding_json, '')")}
+                FROM embedding_cache
+            """)
+            conn.execute("DROP TABLE embedding_cache")
+            conn.execute("ALTER TABLE embedding_cache_new RENAME TO embedding_cache")
+        
+        logger.info("cache_embedding_table_rebuilt")
+    
+    def _add_missing_columns(self, table: str, columns: Dict[str, str]):
+        """Add columns (name -> SQL type) that an older cache file lacks."""
+        existing = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+        for name, sql_type in columns.items():
+            if name not in existing:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}")
+    
+    def prompt_key(self, prompt: Union[str, Iterable[bytes]], model: str, params: Dict) -> str:
+        """
+        Cache key for an LLM request.
+        
+        Callers that both look up and save a response can compute it once
+        and pass it as `cache_key` to get_llm_response/save_llm_response.
+        
+        Args:
+            prompt: The prompt text, or its UTF-8 encoding in chunks (same key
+                without building the joined text)
+            model: Model name
+            params: Request parameters
+        """
+        if isinstance(prompt, str):
+            return self._hash_prompt(prompt, model, params)
+        return self._hash_prompt_chunks(prompt, model, params)
+    
     def _hash_prompt(self, prompt: str, model: str, params: Dict) -> str:
         """Create unique hash for prompt + model + params."""
-        content = f"{model}::{prompt}::{json.dumps(params, sort_keys=True)}"
-        return hashlib.sha256(content.encode()).hexdigest()
+        return self._hash_prompt_chunks((prompt.encode(),), model, params)
+    
+    def _hash_prompt_chunks(
+        self,
+        chunks: Iterable[bytes],
+        model: str,
+        params: Dict,
+        scheme: Optional[str] = None
+    ) -> str:
+        """Hash for a prompt given as encoded chunks + model + params."""
+        scheme = scheme or KEY_SCHEME
+        # Feed the parts separately instead of hashing one concatenated copy
+        hasher = _KEY_HASHERS[scheme]()
+        hasher.update(model.encode())
+        hasher.update(b"\x00")
+        for chunk in chunks:
+            hasher.update(chunk)
+        hasher.update(b"\x00")
+        # Params are hashed in full: their canonical JSON is well under 200
+        # bytes (~0.3 µs to serialize and hash), and keys must stay identical
+        # across processes sharing the cache file, which rules out
+        # process-local short IDs
+        hasher.update(orjson.dumps(params, option=orjson.OPT_SORT_KEYS))
+        return f"{scheme}:{hasher.hexdigest()}"
     
     def _hash_text(self, text: str) -> str:
         """Create hash of text."""
-        return hashlib.sha256(text.encode()).hexdigest()
+        return f"{KEY_SCHEME}:{_key_hasher(text.encode()).hexdigest()}"
+    
+    def _legacy_prompt_keys(self, prompt: str, model: str, params: Dict) -> List[str]:
+        """
+        Earlier cache key formats: plain SHA-256 of `model::prompt::params`,
+        then versioned keys with params serialized by the json module; with
+        BLAKE3 installed, also the SHA-256 keys written without it.
+        """
+        params_json = json.dumps(params, sort_keys=True)
+        unversioned = hashlib.sha256(f"{model}::{prompt}::{params_json}".encode()).hexdigest()
+        json_params = f"{model}\x00{prompt}\x00{params_json}".encode()
+        keys = [unversioned, f"{KEY_SCHEME}:{_key_hasher(json_params).hexdigest()}"]
+        if KEY_SCHEME != "s256":
+            keys.append(f"s256:{hashlib.sha256(json_params).hexdigest()}")
+            keys.append(self._hash_prompt_chunks((prompt.encode(),), model, params, scheme="s256"))
+        return keys
+    
+    def _legacy_text_keys(self, text: str) -> List[str]:
+        """
+        Text hash formats used before: plain SHA-256 (before versioned keys)
+        and, with BLAKE3 installed, the SHA-256 keys written without it.
+        """
+        digest = hashlib.sha256(text.encode()).hexdigest()
+        return [digest] if KEY_SCHEME == "s256" else [digest, f"s256:{digest}"]
+    
+    def _migrate_key(self, table: str, column: str, legacy_keys: Sequence[str], new_key: str) -> bool:
+        """
+        Move a row stored under one of the legacy keys to its current key.
+        
+        Called on a cache miss, so existing entries stay reachable after a
+        key format change. Must be called with the lock held.
+        
+        Returns:
+            True if a legacy row was found and migrated
+        """
+        placeholders = ", ".join("?" * len(legacy_keys))
+        cursor = self._conn.execute(
+            f"UPDATE OR IGNORE {table} SET {column} = ? WHERE {column} IN ({placeholders})",
+            (new_key, *legacy_keys)
+        )
+        if cursor.rowcount:
+            logger.debug("cache_key_migrated", table=table, key=new_key[:12])
+        return cursor.rowcount > 0
     
     def get_llm_response(
         self,
-        prompt: str,
+        prompt: Union[str, Callable[[], str]],
         model: str,
-        params: Dict
-    ) -> Optional[Dict[str, Any]]:
+        params: Dict,
+        cache_key: Optional[str] = None
+    ) -> Optional[CachedLLMResponse]:
         """
         Get cached LLM response.
         
         Args:
-            prompt: The prompt text
+            prompt: The prompt text, or a callable returning it (only called
+                when the text is needed: no cache_key, or a miss that may
+                be stored under a legacy key)
             model: Model name
             params: Request parameters (temperature, max_tokens, etc.)
+            cache_key: Precomputed prompt_key(prompt, model, params)
             
         Returns:
-            Dict with response and metadata, or None if not cached
+            CachedLLMResponse (dict-compatible), or None if not cached
         """
-        cache_key = self._hash_prompt(prompt, model, params)
-        
-        conn = sqlite3.connect(self.cache_path)
-        cursor = conn.execute(
-            """
-            SELECT response_text, response_json, input_tokens, output_tokens, cost_eur
+        if callable(prompt) and cache_key is None:
+            prompt = prompt()
+        if cache_key is None:
+            cache_key = self._hash_prompt(prompt, model, params)
+        query = """
+            SELECT response_text, response_json, input_tokens, output_tokens, cost_eur,
+                   response_json_blob, json_codec
             FROM llm_cache
             WHERE cache_key = ?
-            """,
-            (cache_key,)
-        )
-        row = cursor.fetchone()
+        """
         
-        if row:
-            # Update access stats
-            conn.execute(
-                """
-                UPDATE llm_cache
-                SET last_accessed = CURRENT_TIMESTAMP, access_count = access_count + 1
-                WHERE cache_key = ?
-                """,
-                (cache_key,)
-            )
-            conn.commit()
+        with self._lock:
+            hot = self._mem_get(self._llm_mem, cache_key)
+            if hot:
+                self._record_hit(self._llm_hits, cache_key)
+                return hot
+            
+            row = self._conn.execute(query, (cache_key,)).fetchone()
             
+            if not row and self._migrate_key(
+                "llm_cache", "cache_key",
+                self._legacy_prompt_keys(prompt() if callable(prompt) else prompt, model, params),
+                cache_key
+            ):
+                row = self._conn.execute(query, (cache_key,)).fetchone()
+            
+            if row:
+                self._record_hit(self._llm_hits, cache_key)
+        
+        if row and row[5] is not None:
+            response_json_raw = _decompress(row[5], row[6])
+            if response_json_raw is None:
+                logger.warning("cache_codec_unavailable", codec=row[6], cache_key=cache_key[:8])
+                return None
+        else:
+            response_json_raw = row[1] if row else None
+        
+        if row:
             logger.info(
                 "cache_hit_llm",
                 cache_key=cache_key[:8],
@@ -148,34 +559,44 @@ class OpenAICache:
                 cost_saved_eur=row[4]
             )
             
-            conn.close()
-            
-            return {
-                "response": row[0],
-                "response_json": json.loads(row[1]) if row[1] else None,
-                "usage": {
-                    "prompt_tokens": row[2],
-                    "completion_tokens": row[3],
-                    "total_tokens": row[2] + row[3],
-                },
-                "cost_eur": 0.0,  # No cost for cache hit
-                "original_cost_eur": row[4],
-                "from_cache": True,
-            }
-        
-        conn.close()
+            entry = self._llm_entry(row[0], response_json_raw, row[2], row[3], row[4])
+            with self._lock:
+                self._mem_put(self._llm_mem, cache_key, entry)
+            return entry.copy()
+        
         return None
     
+    @staticmethod
+    def _llm_entry(
+        response: str,
+        response_json_raw: Optional[Union[str, bytes]],
+        input_tokens: int,
+        output_tokens: int,
+        cost_eur: float
+    ) -> CachedLLMResponse:
+        """Build the value returned for a cached LLM response."""
+        return CachedLLMResponse(
+            response=response,
+            usage={
+                "prompt_tokens": input_tokens,
+                "completion_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+            original_cost_eur=cost_eur,
+            _json_raw=response_json_raw,
+        )
+    
     def save_llm_response(
         self,
         prompt: str,
         model: str,
-        params: Dict,
+        params: Optional[Dict],
         response: str,
         response_json: Optional[Dict],
         input_tokens: int,
         output_tokens: int,
-        cost_eur: float
+        cost_eur: float,
+        cache_key: Optional[str] = None
     ):
         """
         Save LLM response to cache.
@@ -183,40 +604,99 @@ class OpenAICache:
         Args:
             prompt: The prompt text
             model: Model name
-            params: Request parameters
+            params: Request parameters (not needed when cache_key is given)
             response: Response text
             response_json: Parsed JSON response (if applicable)
             input_tokens: Number of input tokens
             output_tokens: Number of output tokens
             cost_eur: Cost in EUR
+            cache_key: Precomputed prompt_key(prompt, model, params)
         """
-        cache_key = self._hash_prompt(prompt, model, params)
+        if cache_key is None:
+            cache_key = self._hash_prompt(prompt, model, params)
         prompt_hash = self._hash_text(prompt)
         
-        conn = sqlite3.connect(self.cache_path)
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO llm_cache
-            (cache_key, model, prompt_hash, response_text, response_json,
-             input_tokens, output_tokens, cost_eur)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                cache_key,
-                model,
-                prompt_hash,
-                response,
-                json.dumps(response_json) if response_json else None,
-                input_tokens,
-                output_tokens,
-                cost_eur
+        # Large JSON payloads go to the compressed column
+        response_json_raw = response_json_text = json.dumps(response_json) if response_json else None
+        response_json_blob = json_codec = None
+        if response_json_text and len(response_json_text) > JSON_COMPRESS_MIN_BYTES:
+            response_json_blob = _compress(response_json_text.encode())
+            json_codec = JSON_CODEC
+            response_json_text = None
+        
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO llm_cache
+                (cache_key, model, prompt_hash, response_text, response_json,
+                 response_json_blob, json_codec, input_tokens, output_tokens, cost_eur)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET
+                    model = excluded.model,
+                    prompt_hash = excluded.prompt_hash,
+                    response_text = excluded.response_text,
+                    response_json = excluded.response_json,
+                    response_json_blob = excluded.response_json_blob,
+                    json_codec = excluded.json_codec,
+                    input_tokens = excluded.input_tokens,
+                    output_tokens = excluded.output_tokens,
+                    cost_eur = excluded.cost_eur
+                """,
+                (
+                    cache_key,
+                    model,
+                    prompt_hash,
+                    response,
+                    response_json_text,
+                    response_json_blob,
+                    json_codec,
+                    input_tokens,
+                    output_tokens,
+                    cost_eur
+                )
             )
-        )
-        conn.commit()
-        conn.close()
+            self._mem_put(self._llm_mem, cache_key, self._llm_entry(
+                response, response_json_raw, input_tokens, output_tokens, cost_eur
+            ))
         
         logger.debug("cache_saved_llm", cache_key=cache_key[:8], cost_eur=cost_eur)
     
+    def get_extraction(self, input_key: str) -> Optional[str]:
+        """
+        Get a cached extraction result.
+        
+        Args:
+            input_key: Key computed by the caller from the extraction inputs
+            
+        Returns:
+            Result JSON as saved, or None if not cached
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result_json FROM extraction_cache WHERE input_key = ?",
+                (input_key,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def save_extraction(self, input_key: str, result_json: str):
+        """
+        Save an extraction result to cache.
+        
+        Args:
+            input_key: Key computed by the caller from the extraction inputs
+            result_json: Result serialized as JSON
+        """
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO extraction_cache (input_key, result_json) VALUES (?, ?)
+                ON CONFLICT(input_key) DO UPDATE SET
+                    result_json = excluded.result_json,
+                    created_at = CURRENT_TIMESTAMP
+                """,
+                (input_key, result_json)
+            )
+    
     def get_embedding(self, text: str, model: str) -> Optional[Dict[str, Any]]:
         """
         Get cached embedding.
@@ -228,51 +708,100 @@ class OpenAICache:
         Returns:
             Dict with embedding and metadata, or None if not cached
         """
-        text_hash = self._hash_text(f"{model}::{text}")
+        return self.get_embeddings_batch([text], model)[0]
+    
+    def get_embeddings_batch(self, texts: List[str], model: str) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get cached embeddings for several texts with one query per chunk.
         
-        conn = sqlite3.connect(self.cache_path)
-        cursor = conn.execute(
-            """
-            SELECT embedding_json, dimension, tokens, cost_eur
-            FROM embedding_cache
-            WHERE text_hash = ?
-            """,
-            (text_hash,)
-        )
-        row = cursor.fetchone()
+        Args:
+            texts: Texts to embed
+            model: Model name
+            
+        Returns:
+            List with a dict (as get_embedding) or None per text, in input order
+        """
+        hashes = [self._hash_text(f"{model}::{text}") for text in texts]
+        found: Dict[str, Dict[str, Any]] = {}
+        rows: Dict[str, tuple] = {}
         
-        if row:
-            # Update access stats
-            conn.execute(
-                """
-                UPDATE embedding_cache
-                SET last_accessed = CURRENT_TIMESTAMP, access_count = access_count + 1
-                WHERE text_hash = ?
-                """,
-                (text_hash,)
-            )
-            conn.commit()
+        with self._lock:
+            for text_hash in hashes:
+                if text_hash not in found:
+                    hot = self._mem_get(self._emb_mem, text_hash)
+                    if hot:
+                        found[text_hash] = hot
+                        self._record_hit(self._emb_hits, text_hash)
+            
+            pending = list(dict.fromkeys(h for h in hashes if h not in found))
+            rows.update(self._select_embedding_rows(pending))
             
+            # Move rows stored under legacy keys, then read them back
+            missing = {h: text for h, text in zip(hashes, texts) if h in pending and h not in rows}
+            if missing:
+                cursor = self._conn.executemany(
+                    "UPDATE OR IGNORE embedding_cache SET text_hash = ? WHERE text_hash = ?",
+                    [
+                        (h, legacy_key)
+                        for h, text in missing.items()
+                        for legacy_key in self._legacy_text_keys(f"{model}::{text}")
+                    ]
+                )
+                if cursor.rowcount > 0:
+                    logger.debug("cache_key_migrated", table="embedding_cache", count=cursor.rowcount)
+                    rows.update(self._select_embedding_rows(list(missing)))
+            
+            for text_hash in rows:
+                self._record_hit(self._emb_hits, text_hash)
+        
+        for text_hash, row in rows.items():
+            if row[4] is not None:
+                embedding = np.frombuffer(row[4], dtype=row[5]).astype(np.float32).tolist()
+            else:
+                embedding = json.loads(row[0])
+            found[text_hash] = self._embedding_entry(embedding, row[2], row[3])
+        
+        if rows:
             logger.info(
                 "cache_hit_embedding",
-                text_hash=text_hash[:8],
                 model=model,
-                cost_saved_eur=row[3]
+                hits=len(rows),
+                cost_saved_eur=sum(row[3] for row in rows.values())
             )
-            
-            conn.close()
-            
-            return {
-                "embedding": json.loads(row[0]),
-                "dimension": row[1],
-                "tokens": row[2],
-                "cost_eur": 0.0,
-                "original_cost_eur": row[3],
-                "from_cache": True,
-            }
-        
-        conn.close()
-        return None
+            with self._lock:
+                for text_hash in rows:
+                    self._mem_put(self._emb_mem, text_hash, found[text_hash])
+        
+        return [dict(found[h]) if h in found else None for h in hashes]
+    
+    def _select_embedding_rows(self, text_hashes: List[str]) -> Dict[str, tuple]:
+        """Fetch embedding rows by hash, in chunks under SQLite's variable limit (lock held)."""
+        rows = {}
+        for i in range(0, len(text_hashes), SELECT_CHUNK_SIZE):
+            chunk = text_hashes[i:i + SELECT_CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor = self._conn.execute(
+                f"""
+                SELECT embedding_json, dimension, tokens, cost_eur, embedding_blob, dtype, text_hash
+                FROM embedding_cache
+                WHERE text_hash IN ({placeholders})
+                """,
+                chunk
+            )
+            rows.update((row[6], row) for row in cursor)
+        return rows
+    
+    @staticmethod
+    def _embedding_entry(embedding: List[float], tokens: int, cost_eur: float) -> Dict[str, Any]:
+        """Build the dict returned for a cached embedding."""
+        return {
+            "embedding": embedding,
+            "dimension": len(embedding),
+            "tokens": tokens,
+            "cost_eur": 0.0,
+            "original_cost_eur": cost_eur,
+            "from_cache": True,
+        }
     
     def save_embedding(
         self,
@@ -292,28 +821,69 @@ class OpenAICache:
             tokens: Number of tokens
             cost_eur: Cost in EUR
         """
-        text_hash = self._hash_text(f"{model}::{text}")
+        self.save_embeddings_batch([{
+            "text": text,
+            "model": model,
+            "embedding": embedding,
+            "tokens": tokens,
+            "cost_eur": cost_eur,
+        }])
+    
+    def save_embeddings_batch(self, items: List[Dict[str, Any]]):
+        """
+        Save several embeddings to cache in one transaction.
         
-        conn = sqlite3.connect(self.cache_path)
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO embedding_cache
-            (text_hash, model, embedding_json, dimension, tokens, cost_eur)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (
+        Args:
+            items: Dicts with the arguments of save_embedding
+                (text, model, embedding, tokens, cost_eur)
+        """
+        if not items:
+            return
+        
+        rows = []
+        entries = {}
+        for item in items:
+            text_hash = self._hash_text(f"{item['model']}::{item['text']}")
+            stored = np.asarray(item["embedding"], dtype=EMBEDDING_DTYPE)
+            rows.append((
                 text_hash,
-                model,
-                json.dumps(embedding),
-                len(embedding),
-                tokens,
-                cost_eur
+                item["model"],
+                None,  # embedding_json: only rows from before embedding_blob have it
+                stored.tobytes(),
+                EMBEDDING_DTYPE,
+                len(item["embedding"]),
+                item["tokens"],
+                item["cost_eur"]
+            ))
+            # Cache what a later read from SQLite would return
+            entries[text_hash] = self._embedding_entry(
+                stored.astype(np.float32).tolist(), item["tokens"], item["cost_eur"]
             )
-        )
-        conn.commit()
-        conn.close()
         
-        logger.debug("cache_saved_embedding", text_hash=text_hash[:8], cost_eur=cost_eur)
+        with self._transaction() as conn:
+            conn.executemany(
+                """
+                INSERT INTO embedding_cache
+                (text_hash, model, embedding_json, embedding_blob, dtype,
+                 dimension, tokens, cost_eur)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(text_hash) DO UPDATE SET
+                    model = excluded.model,
+                    embedding_json = excluded.embedding_json,
+                    embedding_blob = excluded.embedding_blob,
+                    dtype = excluded.dtype,
+                    dimension = excluded.dimension,
+                    tokens = excluded.tokens,
+                    cost_eur = excluded.cost_eur
+                """,
+                rows
+            )
+            for text_hash, entry in entries.items():
+                self._mem_put(self._emb_mem, text_hash, entry)
+            self._flush_access_stats()
+        
+        logger.debug("cache_saved_embeddings", count=len(rows),
+                     cost_eur=sum(item["cost_eur"] for item in items))
     
     def track_cost(
         self,
@@ -335,19 +905,57 @@ class OpenAICache:
             cost_eur: Cost in EUR
             from_cache: Whether this was a cache hit
         """
-        today = datetime.utcnow().date().isoformat()
+        self.track_costs_batch([{
+            "model": model,
+            "operation": operation,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cost_eur": cost_eur,
+            "from_cache": from_cache,
+        }])
+    
+    def track_costs_batch(self, items: List[Dict[str, Any]]):
+        """
+        Track several costs in one transaction.
         
-        conn = sqlite3.connect(self.cache_path)
-        conn.execute(
-            """
-            INSERT INTO cost_tracking
-            (date, model, operation, input_tokens, output_tokens, cost_eur, from_cache)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (today, model, operation, input_tokens, output_tokens, cost_eur, int(from_cache))
-        )
-        conn.commit()
-        conn.close()
+        Items are summed per (model, operation, from_cache) into one row
+        each, with the number of requests it stands for: an embeddings batch
+        of hundreds of texts writes at most two rows (hits and misses).
+        
+        Args:
+            items: Dicts with the arguments of track_cost
+                (model, operation, input_tokens, output_tokens, cost_eur,
+                optional from_cache)
+        """
+        if not items:
+            return
+        
+        # (model, operation, from_cache) -> [input_tokens, output_tokens, cost_eur, requests]
+        totals: Dict[Tuple[str, str, int], List] = {}
+        for item in items:
+            key = (item["model"], item["operation"], int(item.get("from_cache", False)))
+            total = totals.setdefault(key, [0, 0, 0.0, 0])
+            total[0] += item["input_tokens"]
+            total[1] += item["output_tokens"]
+            total[2] += item["cost_eur"]
+            total[3] += 1
+        
+        today = self._today()
+        rows = [
+            (today, model, operation, *total[:3], from_cache, total[3])
+            for (model, operation, from_cache), total in totals.items()
+        ]
+        
+        with self._transaction() as conn:
+            conn.executemany(
+                """
+                INSERT INTO cost_tracking
+                (date, model, operation, input_tokens, output_tokens, cost_eur, from_cache, requests)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+            self._flush_access_stats()
     
     def get_stats(self, date: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -360,53 +968,39 @@ class OpenAICache:
             Dict with statistics
         """
         if date is None:
-            date = datetime.utcnow().date().isoformat()
-        
-        conn = sqlite3.connect(self.cache_path)
+            date = self._today()
         
-        # Total cost
-        cursor = conn.execute(
-            "SELECT SUM(cost_eur) FROM cost_tracking WHERE date = ?",
-            (date,)
-        )
-        total_cost = cursor.fetchone()[0] or 0.0
-        
-        # Cost by model
-        cursor = conn.execute(
-            """
-            SELECT model, SUM(cost_eur), COUNT(*)
-            FROM cost_tracking
-            WHERE date = ?
-            GROUP BY model
-            """,
-            (date,)
-        )
-        by_model = {row[0]: {"cost_eur": row[1], "count": row[2]} for row in cursor.fetchall()}
-        
-        # Cache stats
-        cursor = conn.execute(
-            """
-            SELECT
-                COUNT(*) FILTER (WHERE from_cache = 1) as cached,
-                COUNT(*) FILTER (WHERE from_cache = 0) as uncached,
-                SUM(cost_eur) FILTER (WHERE from_cache = 0) as actual_cost
-            FROM cost_tracking
-            WHERE date = ?
-            """,
-            (date,)
-        )
-        cache_stats = cursor.fetchone()
+        with self._lock:
+            # Per-model totals and cache split in one pass over the index
+            rows = self._conn.execute(
+                """
+                SELECT
+                    model,
+                    SUM(cost_eur),
+                    SUM(requests),
+                    COALESCE(SUM(requests) FILTER (WHERE from_cache = 1), 0),
+                    COALESCE(SUM(cost_eur) FILTER (WHERE from_cache = 0), 0.0)
+                FROM cost_tracking
+                WHERE date = ?
+                GROUP BY model
+                """,
+                (date,)
+            ).fetchall()
         
-        conn.close()
+        by_model = {row[0]: {"cost_eur": row[1], "count": row[2]} for row in rows}
+        total_cost = sum((row[1] or 0.0 for row in rows), 0.0)
+        hits = sum(row[3] for row in rows)
+        misses = sum(row[2] for row in rows) - hits
+        actual_cost = sum((row[4] or 0.0 for row in rows), 0.0)
         
         return {
             "date": date,
             "total_cost_eur": round(total_cost, 4),
             "by_model": by_model,
             "cache": {
-                "hits": cache_stats[0] or 0,
-                "misses": cache_stats[1] or 0,
-                "actual_cost_eur": round(cache_stats[2] or 0.0, 4),
+                "hits": hits,
+                "misses": misses,
+                "actual_cost_eur": round(actual_cost, 4),
             },
         }
 
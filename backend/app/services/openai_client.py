@@ -5,16 +5,21 @@ Combines budget_guard.py (per-request budget, dynamic pricing, context shrinking
 with response caching for maximum efficiency.
 """
 
+import asyncio
+import functools
+import importlib.util
 import json
 import os
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
+import httpx
 import structlog
 import tiktoken
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 
 from backend.app.services.budget_guard import (
-    get_gpt4o_mini_prices_cached,
+    get_chat_prices,
     get_embedding_prices_cached,
     plan_output_tokens,
     shrink_context,
@@ -22,11 +27,41 @@ from backend.app.services.budget_guard import (
     format_cost_info,
 )
 from backend.app.services.openai_cache import OpenAICache
+from backend.app.services.rate_limiter import RateLimiter
+from backend.app.services.ttl_cache import TTLCache
 from backend.app.services.price_tracker import RealTimeCostTracker
 from backend.app.services.document_cost_tracker import document_cost_tracker
 
 logger = structlog.get_logger()
 
+# OpenAI limits for one embeddings request
+EMBEDDING_BATCH_MAX_INPUTS = 2048
+EMBEDDING_BATCH_MAX_TOKENS = 300_000
+
+# Token counts kept per (role, content) message
+MESSAGE_TOKENS_CACHE_SIZE = 2048
+
+# Connection pool of the HTTP client shared by every sync OpenAI client (and
+# of each event loop's async client); idle connections are kept for a minute
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60.0)
+
+# HTTP/2 when h2 is installed: concurrent requests are multiplexed over one
+# TLS connection instead of opening (and handshaking) one each
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+# API requests per minute, shared by every client, thread and event loop of
+# the process (they all use the same API key)
+_request_limiter = RateLimiter(
+    calls=int(os.getenv("OPENAI_MAX_REQUESTS_PER_MINUTE", "3000")),
+    period=60.0
+)
+
+
+@functools.cache
+def _shared_http_client() -> httpx.Client:
+    """HTTP client (and keep-alive connection pool) shared process-wide."""
+    return httpx.Client(http2=HTTP2, limits=HTTP_LIMITS, follow_redirects=True)
+
 
 def print_cost(msg: str):
     """Print cost info to stdout (in addition to structured logging)."""
@@ -38,6 +73,24 @@ class BudgetExceededError(Exception):
     pass
 
 
+@dataclass
+class _EmbeddingBatch:
+    """Cache lookup results and pending API requests of one embeddings batch."""
+    texts: List[str]
+    model: str
+    results: List[Optional[Dict[str, Any]]]
+    cost_rows: List[Dict[str, Any]] = field(default_factory=list)
+    # Missed text -> indices in texts (duplicates are requested once)
+    misses: Dict[str, List[int]] = field(default_factory=dict)
+    # API requests: (texts, local token counts)
+    chunks: List[Tuple[List[str], List[int]]] = field(default_factory=list)
+    prices: Any = None
+    
+    @property
+    def hits(self) -> int:
+        return len(self.texts) - sum(len(indices) for indices in self.misses.values())
+
+
 class ManagedOpenAIClient:
     """
     OpenAI client with intelligent cost management.
@@ -65,7 +118,10 @@ class ManagedOpenAIClient:
             max_per_request_eur: Maximum EUR per request
             cache_db: Path to SQLite cache database
         """
-        self.client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+        self._api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.client = OpenAI(api_key=self._api_key, http_client=_shared_http_client())
+        self._async_client: Optional[AsyncOpenAI] = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
         self.max_per_request_eur = max_per_request_eur
         self.cache = OpenAICache(cache_db)
         self.cost_tracker = RealTimeCostTracker()  # Track real costs
@@ -77,6 +133,9 @@ class ManagedOpenAIClient:
             # Fallback to cl100k_base (GPT-4 encoding)
             self.tokenizer = tiktoken.get_encoding("cl100k_base")
         
+        # Multi-turn chats resend the same messages; only new ones are encoded
+        self._message_tokens = TTLCache(max_items=MESSAGE_TOKENS_CACHE_SIZE, ttl_sec=3600)
+        
         logger.info(
             "openai_client_initialized",
             max_per_request_eur=max_per_request_eur,
@@ -85,12 +144,80 @@ class ManagedOpenAIClient:
     
     def _count_tokens(self, text: str) -> int:
         """Count tokens in text using tiktoken."""
-        return len(self.tokenizer.encode(text))
+        # encode_ordinary skips special-token scanning (and never raises on
+        # text that happens to contain one)
+        return len(self.tokenizer.encode_ordinary(text))
+    
+    def _count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Count tokens of several texts (encoded in parallel by tiktoken)."""
+        if len(texts) == 1:
+            return [self._count_tokens(texts[0])]
+        return [len(ids) for ids in self.tokenizer.encode_ordinary_batch(texts)]
     
     def _messages_to_text(self, messages: List[Dict[str, str]]) -> str:
         """Convert messages list to single text for token counting."""
         return "\n".join(f"{m['role']}: {m['content']}" for m in messages)
     
+    def _message_chunks(self, messages: List[Dict[str, str]]) -> Iterator[bytes]:
+        """UTF-8 encoding of _messages_to_text(messages), piece by piece."""
+        for i, m in enumerate(messages):
+            if i:
+                yield b"\n"
+            yield m["role"].encode()
+            yield b": "
+            yield m["content"].encode()
+    
+    def _count_prompt_tokens(self, messages: List[Dict[str, str]]) -> int:
+        """
+        Count tokens of the prompt text from per-message counts.
+        
+        Message counts are memoized by (role, content); messages not seen
+        before are encoded together. Equal to counting
+        _messages_to_text(messages) up to BPE merges across message
+        boundaries; each "\n" separator counts as one token.
+        """
+        keys = [(m["role"], m["content"]) for m in messages]
+        counts = [self._message_tokens.get(key) for key in keys]
+        
+        fresh = [i for i, count in enumerate(counts) if count is None]
+        if fresh:
+            fresh_counts = self._count_tokens_batch([f"{keys[i][0]}: {keys[i][1]}" for i in fresh])
+            for i, count in zip(fresh, fresh_counts):
+                counts[i] = count
+                self._message_tokens.set(keys[i], count)
+        
+        return sum(counts) + max(len(messages) - 1, 0)
+    
+    def _get_async_client(self) -> AsyncOpenAI:
+        """
+        Get the async OpenAI client for the running event loop.
+        
+        The underlying HTTP connection pool is bound to an event loop, so a
+        new client is created when called from a different loop. Callers that
+        own a short-lived loop must aclose() before it ends.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = AsyncOpenAI(
+                api_key=self._api_key,
+                http_client=httpx.AsyncClient(http2=HTTP2, limits=HTTP_LIMITS, follow_redirects=True)
+            )
+            self._async_client_loop = loop
+        return self._async_client
+    
+    async def aclose(self) -> None:
+        """
+        Close the async client of the running event loop.
+        
+        Call before leaving a loop that will not be reused (e.g. at the end
+        of an asyncio.run call) - the connection pool can only be closed
+        while its loop is alive.
+        """
+        if self._async_client is not None and self._async_client_loop is asyncio.get_running_loop():
+            await self._async_client.close()
+            self._async_client = None
+            self._async_client_loop = None
+    
     def chat_completion(
         self,
         messages: List[Dict[str, str]],
@@ -99,6 +226,7 @@ class ManagedOpenAIClient:
         max_tokens: Optional[int] = None,
         response_format: Optional[Dict] = None,
         document_id: Optional[str] = None,
+        prompt_cache_key: Optional[str] = None,
         **kwargs
     ) -> Dict[str, Any]:
         """
@@ -110,16 +238,95 @@ class ManagedOpenAIClient:
             temperature: Sampling temperature
             max_tokens: Max output tokens (if None, calculated from budget)
             response_format: Response format spec (e.g., {"type": "json_object"})
+            document_id: Optional document ID for budget tracking
+            prompt_cache_key: Groups requests sharing a long prompt prefix (e.g.
+                the same system prompt) for OpenAI's prompt cache; not part
+                of the local cache key, as it does not change the response
             **kwargs: Additional OpenAI API parameters
             
         Returns:
-            Dict with:
+            Dict (a dict-compatible CachedLLMResponse on a cache hit) with:
                 - response: Response text
                 - response_json: Parsed JSON (if applicable)
                 - usage: Token usage dict
                 - cost_eur: Cost in EUR
                 - from_cache: Whether from cache
                 
+        Raises:
+            BudgetExceededError: If request would exceed per-request budget
+        """
+        cached, api_kwargs, prompt_text, cache_key = self._prepare_chat_completion(
+            messages, model, temperature, max_tokens, response_format, document_id,
+            prompt_cache_key=prompt_cache_key, **kwargs
+        )
+        if cached:
+            return cached
+        
+        _request_limiter.acquire()
+        response = self.client.chat.completions.create(**api_kwargs)
+        
+        return self._finish_chat_completion(
+            response, model, prompt_text, cache_key, response_format, document_id
+        )
+    
+    async def chat_completion_async(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "gpt-4o-mini",
+        temperature: float = 0.0,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict] = None,
+        document_id: Optional[str] = None,
+        prompt_cache_key: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Async variant of chat_completion.
+        
+        Caching, budget checks and cost tracking are identical; only the API
+        request is awaited, so several requests can be in flight at once.
+        
+        Args:
+            Same as chat_completion
+            
+        Returns:
+            Same as chat_completion
+            
+        Raises:
+            BudgetExceededError: If request would exceed per-request budget
+        """
+        cached, api_kwargs, prompt_text, cache_key = self._prepare_chat_completion(
+            messages, model, temperature, max_tokens, response_format, document_id,
+            prompt_cache_key=prompt_cache_key, **kwargs
+        )
+        if cached:
+            return cached
+        
+        await _request_limiter.acquire_async()
+        response = await self._get_async_client().chat.completions.create(**api_kwargs)
+        
+        return self._finish_chat_completion(
+            response, model, prompt_text, cache_key, response_format, document_id
+        )
+    
+    def _prepare_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: Optional[int],
+        response_format: Optional[Dict],
+        document_id: Optional[str],
+        prompt_cache_key: Optional[str] = None,
+        **kwargs
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]], str, Dict[str, Any]]:
+        """
+        Check the cache and budget and build the API request.
+        
+        Returns:
+            Tuple of (cached result or None, API kwargs or None,
+            prompt text (None on a cache hit), cache key)
+            
         Raises:
             BudgetExceededError: If request would exceed per-request budget
         """
@@ -130,10 +337,13 @@ class ManagedOpenAIClient:
             "response_format": response_format,
             **kwargs
         }
-        prompt_text = self._messages_to_text(messages)
+        cache_key = self.cache.prompt_key(self._message_chunks(messages), model, params)
+        
+        # The joined prompt text is only built on a cache miss
+        render_prompt = functools.cache(functools.partial(self._messages_to_text, messages))
         
         # Check cache first
-        cached = self.cache.get_llm_response(prompt_text, model, params)
+        cached = self.cache.get_llm_response(render_prompt, model, params, cache_key=cache_key)
         if cached:
             # Track as cache hit
             self.cache.track_cost(
@@ -156,16 +366,17 @@ class ManagedOpenAIClient:
             )
             print_cost(cost_msg)
             
-            return cached
+            return cached, None, None, cache_key
         
         # Not in cache - prepare request
         logger.info("cache_miss", model=model)
+        prompt_text = render_prompt()  # before any context shrinking
         
         # Get current prices
-        prices = get_gpt4o_mini_prices_cached()
+        prices = get_chat_prices(model)
         
         # Count input tokens
-        tokens_in = self._count_tokens(prompt_text)
+        tokens_in = self._count_prompt_tokens(messages)
         
         # Determine max_tokens within budget
         if max_tokens is None:
@@ -196,9 +407,9 @@ class ManagedOpenAIClient:
                             tokenizer=self._count_tokens
                         )
                         
-                        # Recalculate
-                        prompt_text = self._messages_to_text(messages)
-                        tokens_in = self._count_tokens(prompt_text)
+                        # Recalculate (the cache key stays that of the
+                        # original request, so repeating it hits the cache)
+                        tokens_in = self._count_prompt_tokens(messages)
                         max_tokens_budget, fits = plan_output_tokens(
                             tokens_in=tokens_in,
                             price_in_per_million=prices.input_per_million,
@@ -259,14 +470,33 @@ class ManagedOpenAIClient:
         if response_format:
             api_kwargs["response_format"] = response_format
         
-        response = self.client.chat.completions.create(**api_kwargs)
+        if prompt_cache_key:
+            # Not a parameter of this SDK version yet: sent in the body as is
+            api_kwargs["extra_body"] = {**api_kwargs.get("extra_body", {}), "prompt_cache_key": prompt_cache_key}
+        
+        return None, api_kwargs, prompt_text, cache_key
+    
+    def _finish_chat_completion(
+        self,
+        response: Any,
+        model: str,
+        prompt_text: str,
+        cache_key: str,
+        response_format: Optional[Dict],
+        document_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Parse an API response, cache it and record its cost.
         
+        Returns:
+            Result dict (see chat_completion)
+        """
         # Extract response
         response_text = response.choices[0].message.content
         
         # Try to parse as JSON if requested
         response_json = None
-        if response_format and response_format.get("type") == "json_object":
+        if response_format and response_format.get("type") in ("json_object", "json_schema"):
             try:
                 response_json = json.loads(response_text)
             except json.JSONDecodeError:
@@ -276,16 +506,25 @@ class ManagedOpenAIClient:
         usage = response.usage
         actual_cost = estimate_cost(usage.prompt_tokens, usage.completion_tokens, model)
         
+        # Prompt tokens served from OpenAI's prompt cache (reported as an
+        # extra field, unknown to this SDK version)
+        details = getattr(usage, "prompt_tokens_details", None) or {}
+        cached_tokens = (
+            details.get("cached_tokens") if isinstance(details, dict)
+            else getattr(details, "cached_tokens", None)
+        ) or 0
+        
         # Save to cache
         self.cache.save_llm_response(
             prompt=prompt_text,
             model=model,
-            params=params,
+            params=None,
             response=response_text,
             response_json=response_json,
             input_tokens=usage.prompt_tokens,
             output_tokens=usage.completion_tokens,
-            cost_eur=actual_cost
+            cost_eur=actual_cost,
+            cache_key=cache_key
         )
         
         # Track cost (both in cache DB and real-time tracker)
@@ -314,6 +553,7 @@ class ManagedOpenAIClient:
             "openai_response",
             model=model,
             tokens_in=usage.prompt_tokens,
+            tokens_in_cached=cached_tokens,
             tokens_out=usage.completion_tokens,
             cost_eur=actual_cost
         )
@@ -410,6 +650,7 @@ class ManagedOpenAIClient:
                 )
         
         # Make request
+        _request_limiter.acquire()
         response = self.client.embeddings.create(
             model=model,
             input=text
@@ -478,6 +719,256 @@ class ManagedOpenAIClient:
             "from_cache": False,
         }
     
+    def create_embeddings_batch(
+        self,
+        texts: List[str],
+        model: str = "text-embedding-3-small",
+        document_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Create embeddings for several texts with caching.
+        
+        Cache misses are sent in as few API requests as possible, and the
+        resulting cache and cost rows are written in one transaction each.
+        
+        Args:
+            texts: Texts to embed
+            model: Embedding model name
+            document_id: Optional document ID for budget tracking
+            
+        Returns:
+            List of dicts (same format as create_embedding), in input order
+            
+        Raises:
+            BudgetExceededError: If the misses would exceed the budget
+        """
+        batch = self._prepare_embeddings_batch(texts, model, document_id)
+        responses = []
+        for chunk_texts, _ in batch.chunks:
+            _request_limiter.acquire()
+            responses.append(self.client.embeddings.create(model=model, input=chunk_texts))
+        return self._finish_embeddings_batch(batch, responses, document_id)
+    
+    async def create_embeddings_batch_async(
+        self,
+        texts: List[str],
+        model: str = "text-embedding-3-small",
+        document_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Async variant of create_embeddings_batch.
+        
+        The API requests for the misses are in flight concurrently; cache
+        access and token counting run in a worker thread so they do not
+        block the event loop.
+        
+        Args:
+            Same as create_embeddings_batch
+            
+        Returns:
+            Same as create_embeddings_batch
+            
+        Raises:
+            BudgetExceededError: If the misses would exceed the budget
+        """
+        batch = await asyncio.to_thread(self._prepare_embeddings_batch, texts, model, document_id)
+        client = self._get_async_client()
+        
+        async def create(chunk_texts: List[str]) -> Any:
+            await _request_limiter.acquire_async()
+            return await client.embeddings.create(model=model, input=chunk_texts)
+        
+        responses = await asyncio.gather(*(create(chunk_texts) for chunk_texts, _ in batch.chunks))
+        return await asyncio.to_thread(self._finish_embeddings_batch, batch, responses, document_id)
+    
+    async def create_embedding_async(
+        self,
+        text: str,
+        model: str = "text-embedding-3-small",
+        document_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Async variant of create_embedding.
+        
+        Args:
+            Same as create_embedding
+            
+        Returns:
+            Same as create_embedding
+        """
+        return (await self.create_embeddings_batch_async([text], model, document_id))[0]
+    
+    def _prepare_embeddings_batch(
+        self,
+        texts: List[str],
+        model: str,
+        document_id: Optional[str]
+    ) -> _EmbeddingBatch:
+        """
+        Look up cached embeddings, check the budget for the misses and split
+        them into API requests.
+        
+        Raises:
+            BudgetExceededError: If the misses would exceed the budget
+        """
+        batch = _EmbeddingBatch(texts=texts, model=model, results=[None] * len(texts))
+        
+        # Check cache
+        for i, (text, cached) in enumerate(zip(texts, self.cache.get_embeddings_batch(texts, model))):
+            if cached:
+                batch.results[i] = cached
+                batch.cost_rows.append({
+                    "model": model,
+                    "operation": "embedding",
+                    "input_tokens": cached["tokens"],
+                    "output_tokens": 0,
+                    "cost_eur": 0.0,
+                    "from_cache": True,
+                })
+            else:
+                batch.misses.setdefault(text, []).append(i)
+        
+        if not batch.misses:
+            return batch
+        
+        logger.info("embedding_batch_cache_miss", model=model, texts=len(batch.misses),
+                    hits=batch.hits)
+        
+        # Check budget for the whole batch
+        batch.prices = get_embedding_prices_cached()
+        miss_texts = list(batch.misses)
+        token_counts = self._count_tokens_batch(miss_texts)
+        estimated_cost = (sum(token_counts) / 1_000_000) * batch.prices.embedding_per_million
+        
+        if document_id:
+            if not document_cost_tracker.can_spend(document_id, estimated_cost):
+                raise BudgetExceededError(
+                    f"Embeddings would cost €{estimated_cost:.4f} > remaining budget for document {document_id}"
+                )
+        else:
+            if estimated_cost > self.max_per_request_eur:
+                raise BudgetExceededError(
+                    f"Embeddings would cost €{estimated_cost:.4f} > budget €{self.max_per_request_eur}"
+                )
+        
+        # Split at the API input and token limits
+        start = 0
+        while start < len(miss_texts):
+            end = start
+            chunk_tokens = 0
+            while (
+                end < len(miss_texts)
+                and end - start < EMBEDDING_BATCH_MAX_INPUTS
+                and (end == start or chunk_tokens + token_counts[end] <= EMBEDDING_BATCH_MAX_TOKENS)
+            ):
+                chunk_tokens += token_counts[end]
+                end += 1
+            batch.chunks.append((miss_texts[start:end], token_counts[start:end]))
+            start = end
+        
+        return batch
+    
+    def _finish_embeddings_batch(
+        self,
+        batch: _EmbeddingBatch,
+        responses: List[Any],
+        document_id: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Merge API responses into the batch results, cache them and record costs.
+        
+        Args:
+            batch: Prepared batch
+            responses: One API response per entry of batch.chunks
+            document_id: Optional document ID for budget tracking
+        
+        Returns:
+            Result dicts in input order
+        """
+        model = batch.model
+        total_tokens = 0
+        total_cost = 0.0
+        cache_rows: List[Dict[str, Any]] = []
+        
+        for (chunk_texts, chunk_counts), response in zip(batch.chunks, responses):
+            # Usage is reported per request; split it by local token counts
+            chunk_cost = (response.usage.total_tokens / 1_000_000) * batch.prices.embedding_per_million
+            chunk_tokens = sum(chunk_counts)
+            total_tokens += response.usage.total_tokens
+            total_cost += chunk_cost
+            
+            for item in response.data:
+                text = chunk_texts[item.index]
+                tokens = chunk_counts[item.index]
+                cost = chunk_cost * tokens / chunk_tokens if chunk_tokens else 0.0
+                result = {
+                    "embedding": item.embedding,
+                    "dimension": len(item.embedding),
+                    "tokens": tokens,
+                    "cost_eur": cost,
+                    "from_cache": False,
+                }
+                for i in batch.misses[text]:
+                    batch.results[i] = result
+                cache_rows.append({
+                    "text": text,
+                    "model": model,
+                    "embedding": item.embedding,
+                    "tokens": tokens,
+                    "cost_eur": cost,
+                })
+                batch.cost_rows.append({
+                    "model": model,
+                    "operation": "embedding",
+                    "input_tokens": tokens,
+                    "output_tokens": 0,
+                    "cost_eur": cost,
+                    "from_cache": False,
+                })
+        
+        if batch.misses:
+            # Save to cache
+            self.cache.save_embeddings_batch(cache_rows)
+            
+            self.cost_tracker.record_request(
+                model=model,
+                input_tokens=total_tokens,
+                output_tokens=0,
+                cost_eur=total_cost,
+                from_cache=False
+            )
+            
+            # Record cost per document if document_id provided
+            if document_id:
+                document_cost_tracker.record_cost(document_id, total_cost)
+            
+            logger.info(
+                "embeddings_created",
+                model=model,
+                texts=len(batch.misses),
+                tokens=total_tokens,
+                cost_eur=total_cost
+            )
+        
+        # Track cost of hits and misses together
+        self.cache.track_costs_batch(batch.cost_rows)
+        
+        # Print cost info with colors (all hits: tokens and cost saved)
+        if not batch.misses:
+            total_tokens = sum(r["tokens"] for r in batch.results)
+            total_cost = sum(r.get("original_cost_eur", 0.0) for r in batch.results)
+        cost_msg = format_cost_info(
+            tokens_in=total_tokens,
+            tokens_out=0,
+            cost_eur=total_cost,
+            model=model,
+            budget_eur=self.max_per_request_eur,
+            from_cache=not batch.misses
+        )
+        print_cost(f"{cost_msg} ({len(batch.texts)} texts, {batch.hits} from cache)")
+        
+        return batch.results
+    
     def get_stats(self, date: Optional[str] = None) -> Dict[str, Any]:
         """
         Get cost statistics.
@@ -490,3 +981,20 @@ class ManagedOpenAIClient:
         """
         return self.cache.get_stats(date)
 
+
+@functools.lru_cache(maxsize=8)
+def get_client(max_per_request_eur: float = 0.30) -> ManagedOpenAIClient:
+    """
+    Process-wide ManagedOpenAIClient for a per-request budget.
+    
+    Callers share one cache connection, cost tracker and tokenizer instead
+    of each opening their own (two trackers on the same file would also
+    overwrite each other's totals).
+    
+    Args:
+        max_per_request_eur: Maximum EUR per request
+        
+    Returns:
+        Shared client
+    """
+    return ManagedOpenAIClient(max_per_request_eur=max_per_request_eur)
@@ -7,15 +7,42 @@ This module tracks the REAL cost of each request by:
 3. Maintaining accurate running totals
 """
 
-from datetime import datetime
-from typing import Dict, Optional
+import asyncio
+import atexit
+import gzip
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, Optional
 from pathlib import Path
-import json
 
+import orjson
 import structlog
 
 logger = structlog.get_logger()
 
+# Tracking file writes are coalesced: written at most every FLUSH_INTERVAL_SEC,
+# or once FLUSH_EVERY_RECORDS requests are pending, and always at exit
+FLUSH_INTERVAL_SEC = 5.0
+FLUSH_EVERY_RECORDS = 50
+
+# Cache hits only bump counters: they are written along with the next billed
+# request, the exit flush, or once this many have piled up
+FLUSH_EVERY_CACHE_HITS = 50
+
+# Daily totals older than this are moved out of the tracking file into monthly
+# gzip archives when the tracker starts
+RETENTION_DAYS = 90
+
+# Compact JSON by default; indented when set (easier to read by hand)
+_DUMP_OPTION = (
+    orjson.OPT_INDENT_2
+    if os.getenv("COST_TRACKING_PRETTY", "false").lower() == "true"
+    else 0
+)
+
 
 class RealTimeCostTracker:
     """
@@ -34,20 +61,80 @@ class RealTimeCostTracker:
         """
         self.tracking_file = Path(tracking_file)
         self.tracking_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Shared by request handlers across threads: guards the running
+        # totals and file writes (reentrant, record_request may flush)
+        self._lock = threading.RLock()
         self._load_tracking_data()
+        
+        self._dirty = False
+        self._pending = 0
+        self._cache_pending = 0
+        self._last_flush = time.monotonic()
+        self._batch_depth = 0
+        atexit.register(self.flush)
+        
+        # Reference to the current day's entry in daily_totals
+        self._today_cache = {"date": None, "ref": None}
+        
+        # Current UTC date string, recomputed when the day rolls over
+        self._today_epoch_day = -1
+        self._today_iso = ""
+        
+        self._archive_old_days()
     
     def _load_tracking_data(self):
         """Load existing tracking data."""
         if self.tracking_file.exists():
             try:
-                with open(self.tracking_file, 'r') as f:
-                    self.data = json.load(f)
+                self.data = orjson.loads(self.tracking_file.read_bytes())
             except Exception as e:
                 logger.warning(f"Failed to load tracking data: {e}")
                 self.data = self._empty_data()
         else:
             self.data = self._empty_data()
     
+    def _archive_old_days(self):
+        """
+        Move daily totals older than RETENTION_DAYS into gzip archives.
+        
+        Days are grouped by month into {stem}_YYYY-MM.json.gz next to the
+        tracking file, merged with whatever an earlier rotation archived.
+        Model stats are cumulative and stay in the tracking file.
+        """
+        cutoff = (datetime.utcnow().date() - timedelta(days=RETENTION_DAYS)).isoformat()
+        daily_totals = self.data["daily_totals"]
+        old_days = [day for day in daily_totals if day < cutoff]
+        if not old_days:
+            return
+        
+        by_month: Dict[str, Dict] = {}
+        for day in old_days:
+            by_month.setdefault(day[:7], {})[day] = daily_totals[day]
+        
+        try:
+            for month, days in by_month.items():
+                archive = self.tracking_file.with_name(f"{self.tracking_file.stem}_{month}.json.gz")
+                if archive.exists():
+                    with gzip.open(archive, 'rb') as f:
+                        days = {**orjson.loads(f.read()), **days}
+                
+                tmp_file = archive.with_suffix(f".{os.getpid()}.tmp")
+                with gzip.open(tmp_file, 'wb') as f:
+                    f.write(orjson.dumps(days, option=orjson.OPT_SORT_KEYS))
+                os.replace(tmp_file, archive)
+        except Exception as e:
+            logger.error(f"Failed to archive tracking data: {e}")
+            return
+        
+        # Only drop the days once every archive is on disk
+        for day in old_days:
+            del daily_totals[day]
+        self._dirty = True
+        self.flush()
+        
+        logger.info("cost_tracking_archived", days=len(old_days), months=sorted(by_month))
+    
     def _empty_data(self) -> Dict:
         """Create empty tracking data structure."""
         return {
@@ -60,11 +147,81 @@ class RealTimeCostTracker:
         """Save tracking data to file."""
         try:
             self.data["last_updated"] = datetime.utcnow().isoformat()
-            with open(self.tracking_file, 'w') as f:
-                json.dump(self.data, f, indent=2)
+            payload = orjson.dumps(self.data, option=_DUMP_OPTION)
+            
+            # Write a sibling file and swap it in, so a crash mid-write never
+            # leaves a truncated tracking file behind
+            tmp_file = self.tracking_file.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_file, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.tracking_file)
         except Exception as e:
             logger.error(f"Failed to save tracking data: {e}")
     
+    def flush(self):
+        """Write pending tracking data to file."""
+        with self._lock:
+            if self._dirty:
+                self._save_tracking_data()
+                self._dirty = False
+                self._pending = 0
+                self._cache_pending = 0
+            self._last_flush = time.monotonic()
+    
+    def _maybe_flush(self):
+        """Flush if enough requests are pending or the interval has elapsed."""
+        if self._batch_depth:
+            return
+        if (
+            self._pending >= FLUSH_EVERY_RECORDS
+            or time.monotonic() - self._last_flush >= FLUSH_INTERVAL_SEC
+        ):
+            self.flush()
+    
+    @contextmanager
+    def batch(self) -> Iterator["RealTimeCostTracker"]:
+        """
+        Group writes: requests recorded inside the block are written to file
+        once, when the outermost block exits.
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self.flush()
+    
+    def _today(self) -> str:
+        """Current UTC date in ISO format."""
+        epoch_day = int(time.time() // 86400)
+        if epoch_day != self._today_epoch_day:
+            self._today_iso = datetime.utcfromtimestamp(epoch_day * 86400).date().isoformat()
+            self._today_epoch_day = epoch_day
+        return self._today_iso
+    
+    def _daily_entry(self, today: str) -> Dict:
+        """
+        Running totals for a day, created on its first request.
+        
+        The entry of the current day is kept by reference, so later requests
+        update it without looking it up in daily_totals again.
+        """
+        if self._today_cache["date"] != today:
+            daily = self.data["daily_totals"].setdefault(today, {
+                "total_cost_eur": 0.0,
+                "requests": 0,
+                "cache_hits": 0,
+                "tokens_in": 0,
+                "tokens_out": 0,
+            })
+            self._today_cache = {"date": today, "ref": daily}
+        return self._today_cache["ref"]
+    
     def record_request(
         self,
         model: str,
@@ -83,47 +240,39 @@ class RealTimeCostTracker:
             cost_eur: Actual cost in EUR
             from_cache: Whether this was a cache hit
         """
-        today = datetime.utcnow().date().isoformat()
-        
-        # Initialize daily total if needed
-        if today not in self.data["daily_totals"]:
-            self.data["daily_totals"][today] = {
-                "total_cost_eur": 0.0,
-                "requests": 0,
-                "cache_hits": 0,
-                "tokens_in": 0,
-                "tokens_out": 0,
-            }
-        
-        # Initialize model stats if needed
-        if model not in self.data["model_stats"]:
-            self.data["model_stats"][model] = {
+        with self._lock:
+            daily = self._daily_entry(self._today())
+            model_stat = self.data["model_stats"].setdefault(model, {
                 "total_cost_eur": 0.0,
                 "requests": 0,
                 "tokens_in": 0,
                 "tokens_out": 0,
-            }
-        
-        # Update daily total
-        daily = self.data["daily_totals"][today]
-        daily["requests"] += 1
-        daily["tokens_in"] += input_tokens
-        daily["tokens_out"] += output_tokens
-        
-        if from_cache:
-            daily["cache_hits"] += 1
-        else:
-            daily["total_cost_eur"] += cost_eur
-        
-        # Update model stats (only for non-cached)
-        if not from_cache:
-            model_stat = self.data["model_stats"][model]
-            model_stat["requests"] += 1
-            model_stat["total_cost_eur"] += cost_eur
-            model_stat["tokens_in"] += input_tokens
-            model_stat["tokens_out"] += output_tokens
-        
-        self._save_tracking_data()
+            })
+            
+            # Update daily total
+            daily["requests"] += 1
+            daily["tokens_in"] += input_tokens
+            daily["tokens_out"] += output_tokens
+            
+            if from_cache:
+                daily["cache_hits"] += 1
+            else:
+                daily["total_cost_eur"] += cost_eur
+                
+                # Update model stats (only for non-cached)
+                model_stat["requests"] += 1
+                model_stat["total_cost_eur"] += cost_eur
+                model_stat["tokens_in"] += input_tokens
+                model_stat["tokens_out"] += output_tokens
+            
+            self._dirty = True
+            if from_cache:
+                self._cache_pending += 1
+                if self._cache_pending >= FLUSH_EVERY_CACHE_HITS and not self._batch_depth:
+                    self.flush()
+            else:
+                self._pending += 1
+                self._maybe_flush()
         
         logger.debug(
             "cost_recorded",
@@ -134,6 +283,26 @@ class RealTimeCostTracker:
             from_cache=from_cache
         )
     
+    async def record_request_async(
+        self,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        cost_eur: float,
+        from_cache: bool = False
+    ):
+        """
+        Async variant of record_request.
+        
+        Runs in a worker thread so a flush to disk never blocks the event loop.
+        
+        Args:
+            Same as record_request
+        """
+        await asyncio.to_thread(
+            self.record_request, model, input_tokens, output_tokens, cost_eur, from_cache
+        )
+    
     def get_daily_cost(self, date: Optional[str] = None) -> float:
         """
         Get total cost for a specific day.
@@ -145,7 +314,7 @@ class RealTimeCostTracker:
             Total cost in EUR
         """
         if date is None:
-            date = datetime.utcnow().date().isoformat()
+            date = self._today()
         
         return self.data["daily_totals"].get(date, {}).get("total_cost_eur", 0.0)
     
@@ -160,7 +329,7 @@ class RealTimeCostTracker:
             Dict with stats
         """
         if date is None:
-            date = datetime.utcnow().date().isoformat()
+            date = self._today()
         
         daily = self.data["daily_totals"].get(date, {
             "total_cost_eur": 0.0,
@@ -185,7 +354,7 @@ class RealTimeCostTracker:
     
     def get_summary(self) -> Dict:
         """Get overall summary."""
-        today = datetime.utcnow().date().isoformat()
+        today = self._today()
         
         return {
             "today": self.get_daily_stats(today),
@@ -2,23 +2,90 @@
 RAG (Retrieval-Augmented Generation) service for chatbot functionality.
 """
 
-import json
+import hashlib
+import heapq
+import io
+import statistics
+from operator import attrgetter
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 
+import numpy as np
+import orjson
 import structlog
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import Integer, bindparam, text
 
 from backend.app.models.incentive import Incentive, IncentiveEmbedding
 from backend.app.models.company import Company, CompanyEmbedding
-from backend.app.services.openai_client import ManagedOpenAIClient
+from backend.app.services.openai_client import ManagedOpenAIClient, get_client
 from backend.app.services.document_cost_tracker import document_cost_tracker
+from backend.app.services.ttl_cache import TTLCache
 
 logger = structlog.get_logger()
 
+# Descriptions are cut in SQL: the context only keeps the first 500 characters
+# of each document (title included), so longer text is never read
+CONTEXT_DESCRIPTION_CHARS = 600
 
-@dataclass
+# Vector search over both tables, built once at import. Each branch orders by
+# the <=> distance itself (not the derived similarity) so pgvector can use an
+# ANN index (halfvec, matching the HNSW expression indexes); UNION ALL keeps
+# it to one round trip. The embedding is left untyped so the native pgvector
+# adapter sends the numpy array as-is (a Vector() bind type would format it
+# as text again).
+_SEARCH_STMT = text("""
+    (SELECT 
+        'incentive' AS kind,
+        i.incentive_id AS id, i.title,
+        LEFT(i.description, :desc_chars) AS description, i.ai_description,
+        i.publication_date, i.start_date, i.end_date, i.total_budget,
+        i.source_link,
+        CAST(NULL AS text[]) AS cae_codes, CAST(NULL AS text) AS size,
+        CAST(NULL AS text) AS district,
+        1 - (ie.embedding <=> CAST(:qvec AS vector)) AS similarity
+    FROM incentives i
+    JOIN incentive_embeddings ie ON i.incentive_id = ie.incentive_id
+    WHERE ie.embedding IS NOT NULL
+    ORDER BY CAST(ie.embedding AS halfvec(1536)) <=> CAST(:qvec AS halfvec(1536))
+    LIMIT :k)
+    UNION ALL
+    (SELECT 
+        'company' AS kind,
+        c.company_id AS id, c.name AS title,
+        LEFT(c.raw->>'description', :desc_chars), NULL,
+        NULL, NULL, NULL, NULL,
+        NULL,
+        c.cae_codes, c.size, c.district,
+        1 - (ce.embedding <=> CAST(:qvec AS vector)) AS similarity
+    FROM companies c
+    JOIN company_embeddings ce ON c.company_id = ce.company_id
+    WHERE ce.embedding IS NOT NULL
+    ORDER BY CAST(ce.embedding AS halfvec(1536)) <=> CAST(:qvec AS halfvec(1536))
+    LIMIT :k)
+""").bindparams(
+    bindparam("k", type_=Integer),
+    bindparam("desc_chars", type_=Integer),
+)
+
+
+def _query_digest(query: str) -> str:
+    """Short digest of a query, stable across processes (unlike hash())."""
+    return hashlib.blake2b(query.encode("utf-8"), digest_size=8).hexdigest()
+
+
+@dataclass(slots=True, frozen=True)
+class RetrievedDoc:
+    """Document retrieved for a RAG query."""
+    type: str  # 'incentive' or 'company'
+    id: str
+    title: str
+    content: str
+    metadata: Dict[str, Any]
+    similarity: float
+
+
+@dataclass(slots=True)
 class RAGResult:
     """Result of RAG query."""
     answer: str
@@ -37,7 +104,11 @@ class RAGService:
         Args:
             openai_client: OpenAI client for LLM operations
         """
-        self.client = openai_client or ManagedOpenAIClient()
+        self.client = openai_client or get_client()
+        
+        # Retrieved documents by (normalized query digest, max_docs): repeated
+        # questions skip the embedding call and the vector search
+        self._retrieval_cache = TTLCache(max_items=1000, ttl_sec=900)
         
         # RAG prompt template
         self.rag_prompt = """Tu és um assistente especializado em incentivos públicos portugueses e empresas.
@@ -62,7 +133,7 @@ RESPOSTA:"""
         db: Session,
         query: str,
         max_docs: int = 5
-    ) -> List[Dict[str, Any]]:
+    ) -> Tuple[List[RetrievedDoc], float]:
         """
         Retrieve relevant documents using vector similarity.
         
@@ -72,111 +143,98 @@ RESPOSTA:"""
             max_docs: Maximum number of documents to retrieve
             
         Returns:
-            List of relevant documents with metadata
+            Tuple of (relevant documents with metadata, average similarity)
         """
+        cache_key = (
+            hashlib.blake2b(query.strip().lower().encode("utf-8")).digest(),
+            max_docs,
+        )
+        cached = self._retrieval_cache.get(cache_key)
+        if cached is not None:
+            documents, avg_similarity = cached
+            logger.debug("documents_retrieved_from_cache", query=query[:50], count=len(documents))
+            return list(documents), avg_similarity
+        
         try:
             # Generate query embedding
             query_embedding_result = self.client.create_embedding(
                 text=query,
                 model="text-embedding-3-small",
-                document_id=f"rag_query_{hash(query) % 1000000}"
+                document_id=f"rag_query_{_query_digest(query)}"
             )
             
             if not query_embedding_result or not query_embedding_result.get('embedding'):
                 logger.error("failed_to_generate_query_embedding")
-                return []
-            
-            query_embedding = query_embedding_result['embedding']
-            query_emb_list = query_embedding.tolist() if hasattr(query_embedding, 'tolist') else list(query_embedding)
-            embedding_str = '[' + ','.join(map(str, query_emb_list)) + ']'
-            
-            # Search in incentives
-            incentive_sql = f"""
-                SELECT 
-                    i.incentive_id, i.title, i.description, i.ai_description,
-                    i.publication_date, i.start_date, i.end_date, i.total_budget,
-                    i.source_link,
-                    (1 - cosine_distance(ie.embedding, '{embedding_str}'::vector)) as similarity
-                FROM incentives i
-                JOIN incentive_embeddings ie ON i.incentive_id = ie.incentive_id
-                WHERE ie.embedding IS NOT NULL
-                ORDER BY similarity DESC
-                LIMIT {max_docs}
-            """
+                return [], 0.0
             
-            incentive_results = db.execute(text(incentive_sql))
+            # float32 array bound as-is (pgvector adapter registered on connect)
+            query_embedding = np.asarray(query_embedding_result['embedding'], dtype=np.float32)
             
-            # Search in companies
-            company_sql = f"""
-                SELECT 
-                    c.company_id, c.name, c.cae_codes, c.size, c.district,
-                    c.raw,
-                    (1 - cosine_distance(ce.embedding, '{embedding_str}'::vector)) as similarity
-                FROM companies c
-                JOIN company_embeddings ce ON c.company_id = ce.company_id
-                WHERE ce.embedding IS NOT NULL
-                ORDER BY similarity DESC
-                LIMIT {max_docs}
-            """
-            
-            company_results = db.execute(text(company_sql))
+            results = db.execute(_SEARCH_STMT, {
+                'qvec': query_embedding,
+                'k': max_docs,
+                'desc_chars': CONTEXT_DESCRIPTION_CHARS,
+            })
             
             # Combine and format results
             documents = []
             
-            for row in incentive_results:
-                doc = {
-                    'type': 'incentive',
-                    'id': row.incentive_id,
-                    'title': row.title,
-                    'content': f"{row.title}\n{row.description or ''}",
-                    'metadata': {
-                        'publication_date': str(row.publication_date) if row.publication_date else None,
-                        'start_date': str(row.start_date) if row.start_date else None,
-                        'end_date': str(row.end_date) if row.end_date else None,
-                        'total_budget': str(row.total_budget) if row.total_budget else None,
-                        'source_link': row.source_link,
-                        'ai_description': row.ai_description
-                    },
-                    'similarity': row.similarity
-                }
+            for row in results:
+                if row.kind == 'incentive':
+                    doc = RetrievedDoc(
+                        type='incentive',
+                        id=row.id,
+                        title=row.title,
+                        content=f"{row.title}\n{row.description or ''}",
+                        metadata={
+                            'publication_date': str(row.publication_date) if row.publication_date else None,
+                            'start_date': str(row.start_date) if row.start_date else None,
+                            'end_date': str(row.end_date) if row.end_date else None,
+                            'total_budget': str(row.total_budget) if row.total_budget else None,
+                            'source_link': row.source_link,
+                            'ai_description': row.ai_description
+                        },
+                        similarity=row.similarity
+                    )
+                else:
+                    doc = RetrievedDoc(
+                        type='company',
+                        id=row.id,
+                        title=row.title,
+                        content=f"{row.title}\n{row.description or ''}",
+                        metadata={
+                            'cae_codes': row.cae_codes,
+                            'size': row.size,
+                            'district': row.district
+                        },
+                        similarity=row.similarity
+                    )
                 documents.append(doc)
             
-            for row in company_results:
-                doc = {
-                    'type': 'company',
-                    'id': row.company_id,
-                    'title': row.name,
-                    'content': f"{row.name}\n{row.raw.get('description', '') if row.raw else ''}",
-                    'metadata': {
-                        'cae_codes': row.cae_codes,
-                        'size': row.size,
-                        'district': row.district,
-                        'raw': row.raw
-                    },
-                    'similarity': row.similarity
-                }
-                documents.append(doc)
+            # Best max_docs across both tables
+            documents = heapq.nlargest(max_docs, documents, key=attrgetter('similarity'))
             
-            # Sort by similarity and limit
-            documents.sort(key=lambda x: x['similarity'], reverse=True)
-            documents = documents[:max_docs]
+            avg_similarity = statistics.fmean(d.similarity for d in documents) if documents else 0.0
             
             logger.info("documents_retrieved", 
                        query=query[:50],
                        count=len(documents),
-                       avg_similarity=sum(d['similarity'] for d in documents) / len(documents) if documents else 0)
+                       avg_similarity=avg_similarity)
+            
+            if documents:
+                self._retrieval_cache.set(cache_key, (tuple(documents), avg_similarity))
             
-            return documents
+            return documents, avg_similarity
             
         except Exception as e:
             logger.error("document_retrieval_failed", error=str(e), exc_info=True)
-            return []
+            return [], 0.0
 
     def _generate_answer(
         self,
         query: str,
-        documents: List[Dict[str, Any]]
+        documents: List[RetrievedDoc],
+        avg_similarity: float
     ) -> Tuple[str, float]:
         """
         Generate answer using retrieved documents.
@@ -184,6 +242,7 @@ RESPOSTA:"""
         Args:
             query: User query
             documents: Retrieved documents
+            avg_similarity: Average similarity of the documents
             
         Returns:
             Tuple of (answer, confidence)
@@ -191,17 +250,20 @@ RESPOSTA:"""
         if not documents:
             return "Não tenho informação suficiente para responder a esta pergunta.", 0.0
         
-        # Prepare context
-        context_parts = []
+        # Prepare context (compact metadata JSON: indentation only costs tokens)
+        buf = io.StringIO()
         for i, doc in enumerate(documents, 1):
-            context_part = f"DOCUMENTO {i} ({doc['type'].upper()}):\n"
-            context_part += f"Título: {doc['title']}\n"
-            context_part += f"Conteúdo: {doc['content'][:500]}...\n"
-            if doc['metadata']:
-                context_part += f"Metadados: {json.dumps(doc['metadata'], ensure_ascii=False, indent=2)}\n"
-            context_parts.append(context_part)
+            if i > 1:
+                buf.write("\n\n")
+            buf.write(f"DOCUMENTO {i} ({doc.type.upper()}):\n")
+            buf.write(f"Título: {doc.title}\n")
+            buf.write(f"Conteúdo: {doc.content[:500]}...\n")
+            if doc.metadata:
+                buf.write("Metadados: ")
+                buf.write(orjson.dumps(doc.metadata).decode())
+                buf.write("\n")
         
-        context = "\n\n".join(context_parts)
+        context = buf.getvalue()
         
         # Generate answer
         prompt = self.rag_prompt.format(
@@ -214,7 +276,7 @@ RESPOSTA:"""
                 messages=[{"role": "user", "content": prompt}],
                 model="gpt-4o-mini",
                 max_tokens=800,
-                document_id=f"rag_answer_{hash(query) % 1000000}"
+                document_id=f"rag_answer_{_query_digest(query)}"
             )
             
             if not response or not response.get('content'):
@@ -223,7 +285,6 @@ RESPOSTA:"""
             answer = response['content'].strip()
             
             # Calculate confidence based on document similarities
-            avg_similarity = sum(doc['similarity'] for doc in documents) / len(documents)
             confidence = min(avg_similarity * 1.2, 1.0)  # Boost confidence slightly
             
             return answer, confidence
@@ -252,20 +313,20 @@ RESPOSTA:"""
         logger.info("rag_query_started", question=question[:50])
         
         # Retrieve relevant documents
-        documents = self._retrieve_relevant_documents(db, question, max_documents)
+        documents, avg_similarity = self._retrieve_relevant_documents(db, question, max_documents)
         
         # Generate answer
-        answer, confidence = self._generate_answer(question, documents)
+        answer, confidence = self._generate_answer(question, documents, avg_similarity)
         
         # Prepare sources
         sources = []
         for doc in documents:
             source = {
-                'type': doc['type'],
-                'id': doc['id'],
-                'title': doc['title'],
-                'similarity': doc['similarity'],
-                'metadata': doc['metadata']
+                'type': doc.type,
+                'id': doc.id,
+                'title': doc.title,
+                'similarity': doc.similarity,
+                'metadata': doc.metadata
             }
             sources.append(source)
         
@@ -0,0 +1,54 @@
+"""
+Token-bucket rate limiter shared by threads and event loops.
+"""
+
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Allows up to `calls` acquisitions per `period` seconds.
+    
+    Acquisitions reserve a token right away (the bucket may go negative),
+    so concurrent callers queue up in order instead of polling, and each
+    one only waits for its own slot.
+    """
+    
+    def __init__(self, calls: int, period: float = 60.0):
+        """
+        Initialize limiter.
+        
+        Args:
+            calls: Requests allowed per period (also the burst size)
+            period: Period in seconds
+        """
+        if calls <= 0:
+            raise ValueError("calls must be positive")
+        self.capacity = calls
+        self.rate = calls / period
+        self._tokens = float(calls)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """Take a token; returns the seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+    
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+    
+    async def acquire_async(self) -> None:
+        """Wait (without blocking the event loop) until a request may be sent."""
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
@@ -0,0 +1,77 @@
+"""
+Small in-process cache with per-entry expiry and LRU eviction.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Bounded in-memory cache whose entries expire after a fixed TTL.
+    
+    When full, the least recently used entry is evicted. Safe to share
+    between threads (instances live on services used by FastAPI's
+    threadpool).
+    """
+    
+    def __init__(self, max_items: int = 1024, ttl_sec: float = 900):
+        """
+        Initialize cache.
+        
+        Args:
+            max_items: Maximum number of entries kept
+            ttl_sec: Seconds an entry stays valid after being set
+        """
+        self.max_items = max_items
+        self.ttl_sec = ttl_sec
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a value if present and not expired.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Cached value, or None
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry if full.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_sec, value)
+            self._data.move_to_end(key)
+            
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
@@ -4,21 +4,64 @@ Embedding service for creating vector representations.
 Generates embeddings for incentives and companies using OpenAI.
 """
 
-from typing import List, Optional, Dict, Any
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, Iterator, List, Optional, Dict, Any, Set, Tuple, Type, Union
 
+import numpy as np
 import structlog
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, bindparam, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.elements import BindParameter
+from pgvector.sqlalchemy import Vector
 
-# Import from backend
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
-from backend.app.services.openai_client import ManagedOpenAIClient
+from backend.app.db.session import SessionLocal
+from backend.app.services.openai_client import ManagedOpenAIClient, get_client
 from backend.app.models import Incentive, IncentiveEmbedding, Company, CompanyEmbedding
+from backend.app.models.embedding_text import (
+    company_embedding_text,
+    incentive_embedding_text,
+    text_digest,
+)
+from scraper.extractors.near_duplicates import NearDuplicateIndex
 
 logger = structlog.get_logger()
 
+# Embedding requests in flight at once in the async batch generators
+EMBEDDING_CONCURRENCY = 8
+
+
+
+def _is_embeddable(text: str) -> bool:
+    """
+    Whether a text has a field besides the name or title (its first line).
+    
+    A company with nothing but its name (no CAE codes, district or size)
+    has nothing to match on, whatever the length of the name: the batch
+    generators record it without an embedding.
+    """
+    return "\n" in text.strip()
+
+
+class _ArrayVector(Vector):
+    """
+    Vector bound as a numpy array, skipping Vector's formatting to a '[...]'
+    string: psycopg's pgvector dumper (registered on connect) sends it in
+    binary.
+    """
+    
+    cache_ok = True
+    
+    def bind_processor(self, dialect):
+        return None
+
+
+def _vector_param(embedding: Any) -> BindParameter:
+    """Bind an embedding as a float32 array."""
+    return bindparam(None, np.asarray(embedding, dtype=np.float32), type_=_ArrayVector())
+
 
 class EmbeddingService:
     """Service for generating and managing embeddings."""
@@ -26,7 +69,8 @@ class EmbeddingService:
     def __init__(
         self,
         openai_client: Optional[ManagedOpenAIClient] = None,
-        model: str = "text-embedding-3-small"
+        model: str = "text-embedding-3-small",
+        near_duplicate_max_bits: Optional[int] = None
     ):
         """
         Initialize embedding service.
@@ -34,11 +78,24 @@ class EmbeddingService:
         Args:
             openai_client: Managed OpenAI client
             model: Embedding model to use
+            near_duplicate_max_bits: When set, the batch generators reuse the
+                embedding of a text embedded earlier in the run with the same
+                numbers and a simhash at most this many bits away (0-3); off
+                by default, since a reused vector is only an approximation
+                of the text's own
         """
-        self.client = openai_client or ManagedOpenAIClient(
-            max_per_request_eur=0.30
-        )
+        self.client = openai_client or get_client(max_per_request_eur=0.30)
         self.model = model
+        # One index per record class: incentive and company texts never
+        # stand in for each other, and embed_all runs the two kinds in
+        # separate threads, so no index is shared between threads
+        self.near_duplicates: Dict[type, NearDuplicateIndex] = (
+            {
+                IncentiveEmbedding: NearDuplicateIndex(near_duplicate_max_bits),
+                CompanyEmbedding: NearDuplicateIndex(near_duplicate_max_bits),
+            }
+            if near_duplicate_max_bits is not None else {}
+        )
     
     def create_incentive_text(self, incentive: Incentive) -> str:
         """
@@ -47,70 +104,41 @@ class EmbeddingService:
         Combines title, description, and AI-extracted fields.
         
         Args:
-            incentive: Incentive model instance
+            incentive: Incentive model instance (or a row with its fields)
             
         Returns:
             Text for embedding
         """
-        parts = [
-            f"Título: {incentive.title}",
-        ]
-        
-        if incentive.description:
-            parts.append(f"Descrição: {incentive.description[:500]}")  # Truncate long descriptions
-        
-        if incentive.ai_description:
-            ai_desc = incentive.ai_description
-            
-            if ai_desc.get("caes"):
-                parts.append(f"CAE: {', '.join(ai_desc['caes'])}")
-            
-            if ai_desc.get("geographic_location"):
-                parts.append(f"Localização: {ai_desc['geographic_location']}")
-            
-            if ai_desc.get("company_size"):
-                parts.append(f"Tamanho de empresa: {', '.join(ai_desc['company_size'])}")
-            
-            if ai_desc.get("investment_objectives"):
-                parts.append(f"Objetivos: {', '.join(ai_desc['investment_objectives'])}")
-            
-            if ai_desc.get("specific_purposes"):
-                parts.append(f"Finalidades: {', '.join(ai_desc['specific_purposes'][:3])}")  # Top 3
-        
-        return "\n".join(parts)
+        return incentive_embedding_text(incentive)
     
     def create_company_text(self, company: Company) -> str:
         """
         Create text representation of company for embedding.
         
         Args:
-            company: Company model instance
+            company: Company model instance (or a row with its fields)
             
         Returns:
             Text for embedding
         """
-        parts = [f"Empresa: {company.name}"]
-        
-        if company.cae_codes:
-            parts.append(f"CAE: {', '.join(company.cae_codes)}")
-        
-        if company.district:
-            location_parts = [company.district]
-            if company.county:
-                location_parts.append(company.county)
-            parts.append(f"Localização: {', '.join(location_parts)}")
-        
-        if company.size:
-            parts.append(f"Tamanho: {company.size}")
-        
-        return "\n".join(parts)
+        return company_embedding_text(company)
+    
+    def _incentive_text(self, incentive: Incentive) -> str:
+        """Stored embedding text, built on the fly for rows saved before it existed."""
+        return incentive.embedding_text or self.create_incentive_text(incentive)
+    
+    def _company_text(self, company: Company) -> str:
+        """Stored embedding text, built on the fly for rows saved before it existed."""
+        return company.embedding_text or self.create_company_text(company)
     
     def generate_incentive_embedding(
         self,
         db: Session,
         incentive: Incentive,
         force_refresh: bool = False,
-        document_id: Optional[str] = None
+        document_id: Optional[str] = None,
+        existing_ids: Optional[Set[str]] = None,
+        commit: bool = True
     ) -> Optional[IncentiveEmbedding]:
         """
         Generate and save embedding for an incentive.
@@ -119,12 +147,17 @@ class EmbeddingService:
             db: Database session
             incentive: Incentive to embed
             force_refresh: Regenerate even if embedding exists
+            document_id: Optional document ID for budget tracking
+            existing_ids: Ids known to have an embedding, prefetched by batch
+                callers; when given, the lookup only runs for those ids
+            commit: Commit right away; batch callers pass False and commit
+                once per batch (the write is then kept in a savepoint)
             
         Returns:
             IncentiveEmbedding instance or None on failure
         """
         # Check if already exists
-        if not force_refresh:
+        if not force_refresh and (existing_ids is None or incentive.incentive_id in existing_ids):
             existing = db.query(IncentiveEmbedding).filter(
                 IncentiveEmbedding.incentive_id == incentive.incentive_id
             ).first()
@@ -144,21 +177,18 @@ class EmbeddingService:
             # Generate embedding
             result = self.client.create_embedding(text, model=self.model, document_id=document_id)
             
-            # Create or update embedding record
-            embedding_record = db.query(IncentiveEmbedding).filter(
-                IncentiveEmbedding.incentive_id == incentive.incentive_id
-            ).first()
-            
-            if embedding_record:
-                embedding_record.embedding = result["embedding"]
-            else:
-                embedding_record = IncentiveEmbedding(
-                    incentive_id=incentive.incentive_id,
-                    embedding=result["embedding"]
-                )
-                db.add(embedding_record)
+            # Create or update embedding record (one upsert, no lookup); when
+            # the caller commits, in a savepoint so a failure keeps its batch
+            with nullcontext() if commit else db.begin_nested():
+                embedding_record = db.scalars(
+                    self._upsert_statement(IncentiveEmbedding, "incentive_id", {
+                        incentive.incentive_id: (result["embedding"], text)
+                    }).returning(IncentiveEmbedding),
+                    execution_options={"populate_existing": True}
+                ).one()
             
-            db.commit()
+            if commit:
+                db.commit()
             
             logger.info(
                 "incentive_embedding_generated",
@@ -178,7 +208,8 @@ class EmbeddingService:
                 error=str(e),
                 exc_info=True
             )
-            db.rollback()
+            if commit:
+                db.rollback()
             return None
     
     def generate_company_embedding(
@@ -186,7 +217,9 @@ class EmbeddingService:
         db: Session,
         company: Company,
         force_refresh: bool = False,
-        document_id: Optional[str] = None
+        document_id: Optional[str] = None,
+        existing_ids: Optional[Set[str]] = None,
+        commit: bool = True
     ) -> Optional[CompanyEmbedding]:
         """
         Generate and save embedding for a company.
@@ -195,12 +228,17 @@ class EmbeddingService:
             db: Database session
             company: Company to embed
             force_refresh: Regenerate even if embedding exists
+            document_id: Optional document ID for budget tracking
+            existing_ids: Ids known to have an embedding, prefetched by batch
+                callers; when given, the lookup only runs for those ids
+            commit: Commit right away; batch callers pass False and commit
+                once per batch (the write is then kept in a savepoint)
             
         Returns:
             CompanyEmbedding instance or None on failure
         """
         # Check if already exists
-        if not force_refresh:
+        if not force_refresh and (existing_ids is None or company.company_id in existing_ids):
             existing = db.query(CompanyEmbedding).filter(
                 CompanyEmbedding.company_id == company.company_id
             ).first()
@@ -220,21 +258,18 @@ class EmbeddingService:
             # Generate embedding
             result = self.client.create_embedding(text, model=self.model, document_id=document_id)
             
-            # Create or update embedding record
-            embedding_record = db.query(CompanyEmbedding).filter(
-                CompanyEmbedding.company_id == company.company_id
-            ).first()
+            # Create or update embedding record (one upsert, no lookup); when
+            # the caller commits, in a savepoint so a failure keeps its batch
+            with nullcontext() if commit else db.begin_nested():
+                embedding_record = db.scalars(
+                    self._upsert_statement(CompanyEmbedding, "company_id", {
+                        company.company_id: (result["embedding"], text)
+                    }).returning(CompanyEmbedding),
+                    execution_options={"populate_existing": True}
+                ).one()
             
-            if embedding_record:
-                embedding_record.embedding = result["embedding"]
-            else:
-                embedding_record = CompanyEmbedding(
-                    company_id=company.company_id,
-                    embedding=result["embedding"]
-                )
-                db.add(embedding_record)
-            
-            db.commit()
+            if commit:
+                db.commit()
             
             logger.info(
                 "company_embedding_generated",
@@ -254,9 +289,227 @@ class EmbeddingService:
                 error=str(e),
                 exc_info=True
             )
-            db.rollback()
+            if commit:
+                db.rollback()
             return None
     
+    def _upsert_statement(
+        self,
+        record_cls: Union[Type[IncentiveEmbedding], Type[CompanyEmbedding]],
+        id_column: str,
+        embeddings: Dict[str, Tuple[Any, str]]
+    ):
+        """
+        INSERT ... ON CONFLICT DO UPDATE for embedding records.
+        
+        Args:
+            record_cls: IncentiveEmbedding or CompanyEmbedding
+            id_column: Name of the id column ("incentive_id" or "company_id")
+            embeddings: (embedding, embedded text) per id; a None embedding
+                records a skipped text (see _split_near_empty)
+            
+        Returns:
+            Insert statement (one round trip, no existence check)
+        """
+        stmt = insert(record_cls).values([
+            {
+                id_column: record_id,
+                "embedding": None if embedding is None else _vector_param(embedding),
+                "text_sha256": text_digest(text),
+            }
+            for record_id, (embedding, text) in embeddings.items()
+        ])
+        return stmt.on_conflict_do_update(
+            index_elements=[id_column],
+            set_={"embedding": stmt.excluded.embedding, "text_sha256": stmt.excluded.text_sha256}
+        )
+    
+    def _reuse_near_duplicates(
+        self,
+        texts: List[str],
+        near_duplicates: Optional[NearDuplicateIndex]
+    ) -> List[Optional[Any]]:
+        """Embeddings of near-duplicate texts seen earlier (None where missing)."""
+        if near_duplicates is None:
+            return [None] * len(texts)
+        return [near_duplicates.get(text) for text in texts]
+    
+    def _merge_embeddings(
+        self,
+        texts: List[str],
+        embeddings: List[Optional[Any]],
+        results: List[Dict[str, Any]],
+        near_duplicates: Optional[NearDuplicateIndex]
+    ) -> np.ndarray:
+        """
+        Fill the missing embeddings with the API results, in order.
+        
+        Each embedding is copied into a row of one float32 array and its
+        list of floats dropped, so a batch holds a single buffer instead of
+        one list of Python floats per text.
+        """
+        buffer = None
+        fresh = iter(results)
+        for i, embedding in enumerate(embeddings):
+            is_fresh = embedding is None
+            if is_fresh:
+                embedding = next(fresh)["embedding"]
+            if buffer is None:
+                buffer = np.empty((len(texts), len(embedding)), dtype=np.float32)
+            buffer[i] = embedding
+            if is_fresh and near_duplicates is not None:
+                # A copy, so the index does not keep the whole buffer alive
+                near_duplicates.add(texts[i], buffer[i].copy())
+        
+        reused = len(texts) - len(results)
+        if reused:
+            logger.info("near_duplicate_embeddings_reused", count=reused, size=len(texts))
+        return buffer
+    
+    def _split_near_empty(
+        self,
+        rows: List[Any],
+        texts: List[str],
+        id_column: str
+    ) -> Tuple[List[Any], List[str], Dict[str, Tuple[None, str]]]:
+        """
+        Separate the texts worth embedding (see _is_embeddable).
+        
+        Skipped rows are still written, with a NULL embedding and the digest
+        of their text, so they are only selected again once the text changes.
+        
+        Args:
+            rows: Rows to embed
+            texts: Text of each row
+            id_column: Name of the rows' id column
+            
+        Returns:
+            Tuple of (rows to embed, their texts, records of the skipped rows
+            for _upsert_statement)
+        """
+        kept_rows, kept_texts, skipped = [], [], {}
+        for row, text in zip(rows, texts):
+            if _is_embeddable(text):
+                kept_rows.append(row)
+                kept_texts.append(text)
+            else:
+                skipped[getattr(row, id_column)] = (None, text)
+        
+        if skipped:
+            logger.info("near_empty_texts_skipped", count=len(skipped), size=len(rows))
+        return kept_rows, kept_texts, skipped
+    
+    def _embed_texts(
+        self,
+        texts: List[str],
+        record_cls: Union[Type[IncentiveEmbedding], Type[CompanyEmbedding]]
+    ) -> np.ndarray:
+        """
+        Embed texts in one batch request, skipping near-duplicates if enabled.
+        
+        Args:
+            texts: Texts to embed
+            record_cls: IncentiveEmbedding or CompanyEmbedding (selects the
+                near-duplicate index)
+            
+        Returns:
+            Embeddings in input order, one row per text
+        """
+        near_duplicates = self.near_duplicates.get(record_cls)
+        embeddings = self._reuse_near_duplicates(texts, near_duplicates)
+        missing = [text for text, embedding in zip(texts, embeddings) if embedding is None]
+        results = self.client.create_embeddings_batch(missing, model=self.model) if missing else []
+        return self._merge_embeddings(texts, embeddings, results, near_duplicates)
+    
+    async def _embed_texts_async(
+        self,
+        texts: List[str],
+        record_cls: Union[Type[IncentiveEmbedding], Type[CompanyEmbedding]]
+    ) -> np.ndarray:
+        """Async variant of _embed_texts."""
+        near_duplicates = self.near_duplicates.get(record_cls)
+        embeddings = self._reuse_near_duplicates(texts, near_duplicates)
+        missing = [text for text, embedding in zip(texts, embeddings) if embedding is None]
+        results = (
+            await self.client.create_embeddings_batch_async(missing, model=self.model)
+            if missing else []
+        )
+        return self._merge_embeddings(texts, embeddings, results, near_duplicates)
+    
+    def _incentives_to_embed(self, db: Session, force_refresh: bool) -> Query:
+        """
+        Incentives without an up-to-date embedding (or all if force_refresh).
+        
+        Only the columns used to build the text are selected: plain rows
+        instead of full ORM instances.
+        """
+        query = db.query(
+            Incentive.incentive_id,
+            Incentive.title,
+            Incentive.description,
+            Incentive.ai_description,
+            Incentive.embedding_text,
+        )
+        if force_refresh:
+            return query
+        
+        # Missing, or computed from a text that has changed since (embeddings
+        # saved before digests were recorded are taken as current)
+        return query.outerjoin(IncentiveEmbedding).filter(or_(
+            IncentiveEmbedding.incentive_id.is_(None),
+            and_(
+                IncentiveEmbedding.text_sha256.isnot(None),
+                IncentiveEmbedding.text_sha256 != Incentive.embedding_text_sha256
+            )
+        ))
+    
+    def _companies_to_embed(self, db: Session, force_refresh: bool) -> Query:
+        """Companies without an up-to-date embedding (or all if force_refresh)."""
+        query = db.query(
+            Company.company_id,
+            Company.name,
+            Company.cae_codes,
+            Company.district,
+            Company.county,
+            Company.size,
+            Company.embedding_text,
+        )
+        if force_refresh:
+            return query
+        
+        return query.outerjoin(CompanyEmbedding).filter(or_(
+            CompanyEmbedding.company_id.is_(None),
+            and_(
+                CompanyEmbedding.text_sha256.isnot(None),
+                CompanyEmbedding.text_sha256 != Company.embedding_text_sha256
+            )
+        ))
+    
+    def _pages(self, query: Query, id_column: Any, batch_size: int) -> Iterator[List[Any]]:
+        """
+        Rows of a query in id order, batch_size at a time.
+        
+        Keyset pagination (id > last id seen): memory stays bounded by one
+        page, and unlike a server-side cursor it survives the commits made
+        between pages.
+        
+        Args:
+            query: Rows to page through
+            id_column: Primary key column to order and page by
+            batch_size: Rows per page
+            
+        Yields:
+            Lists of rows
+        """
+        last_id = None
+        while True:
+            page = query if last_id is None else query.filter(id_column > last_id)
+            rows = page.order_by(id_column).limit(batch_size).all()
+            if not rows:
+                return
+            yield rows
+            last_id = getattr(rows[-1], id_column.key)
+    
     def generate_batch_incentive_embeddings(
         self,
         db: Session,
@@ -274,50 +527,59 @@ class EmbeddingService:
         Returns:
             Dict with statistics
         """
-        # Get incentives without embeddings (or all if force_refresh)
-        if force_refresh:
-            incentives = db.query(Incentive).all()
-        else:
-            # Find incentives without embeddings
-            incentives = db.query(Incentive).outerjoin(IncentiveEmbedding).filter(
-                IncentiveEmbedding.incentive_id.is_(None)
-            ).all()
-        
-        total = len(incentives)
+        query = self._incentives_to_embed(db, force_refresh)
+        
+        total = query.count()
+        processed = 0
         success_count = 0
         failed_count = 0
+        skipped_count = 0
         
         logger.info("batch_embedding_started", total=total, force_refresh=force_refresh)
         
-        for i, incentive in enumerate(incentives, 1):
+        # One embeddings request (and one commit) per slice of batch_size;
+        # the client serves cached texts and only sends the misses
+        for chunk in self._pages(query, Incentive.incentive_id, batch_size):
+            processed += len(chunk)
+            texts = [self._incentive_text(incentive) for incentive in chunk]
+            first_id = chunk[0].incentive_id
+            chunk, texts, records = self._split_near_empty(chunk, texts, "incentive_id")
+            skipped_count += len(records)
             try:
-                result = self.generate_incentive_embedding(db, incentive, force_refresh)
-                if result:
-                    success_count += 1
-                else:
-                    failed_count += 1
+                if chunk:
+                    embeddings = self._embed_texts(texts, IncentiveEmbedding)
+                    records.update({
+                        incentive.incentive_id: (embedding, text)
+                        for incentive, embedding, text in zip(chunk, embeddings, texts)
+                    })
                 
-                if i % 10 == 0:
-                    logger.info(
-                        "batch_progress",
-                        processed=i,
-                        total=total,
-                        success=success_count,
-                        failed=failed_count
-                    )
+                db.execute(self._upsert_statement(IncentiveEmbedding, "incentive_id", records))
+                db.commit()
+                success_count += len(chunk)
             
             except Exception as e:
                 logger.error(
-                    "batch_item_failed",
-                    incentive_id=incentive.incentive_id,
+                    "batch_chunk_failed",
+                    first_incentive_id=first_id,
+                    size=len(chunk),
                     error=str(e)
                 )
-                failed_count += 1
+                db.rollback()
+                failed_count += len(chunk)
+            
+            logger.info(
+                "batch_progress",
+                processed=processed,
+                total=total,
+                success=success_count,
+                failed=failed_count
+            )
         
         stats = {
             "total": total,
             "success": success_count,
             "failed": failed_count,
+            "skipped": skipped_count,
         }
         
         logger.info("batch_embedding_completed", **stats)
@@ -341,52 +603,217 @@ class EmbeddingService:
         Returns:
             Dict with statistics
         """
-        # Get companies without embeddings (or all if force_refresh)
-        if force_refresh:
-            companies = db.query(Company).all()
-        else:
-            companies = db.query(Company).outerjoin(CompanyEmbedding).filter(
-                CompanyEmbedding.company_id.is_(None)
-            ).all()
+        query = self._companies_to_embed(db, force_refresh)
         
-        total = len(companies)
+        total = query.count()
+        processed = 0
         success_count = 0
         failed_count = 0
+        skipped_count = 0
         
         logger.info("batch_company_embedding_started", total=total, force_refresh=force_refresh)
         
-        for i, company in enumerate(companies, 1):
+        # One embeddings request (and one commit) per slice of batch_size;
+        # the client serves cached texts and only sends the misses
+        for chunk in self._pages(query, Company.company_id, batch_size):
+            processed += len(chunk)
+            texts = [self._company_text(company) for company in chunk]
+            first_id = chunk[0].company_id
+            chunk, texts, records = self._split_near_empty(chunk, texts, "company_id")
+            skipped_count += len(records)
             try:
-                result = self.generate_company_embedding(db, company, force_refresh)
-                if result:
-                    success_count += 1
-                else:
-                    failed_count += 1
+                if chunk:
+                    embeddings = self._embed_texts(texts, CompanyEmbedding)
+                    records.update({
+                        company.company_id: (embedding, text)
+                        for company, embedding, text in zip(chunk, embeddings, texts)
+                    })
                 
-                if i % 10 == 0:
-                    logger.info(
-                        "batch_progress",
-                        processed=i,
-                        total=total,
-                        success=success_count,
-                        failed=failed_count
-                    )
+                db.execute(self._upsert_statement(CompanyEmbedding, "company_id", records))
+                db.commit()
+                success_count += len(chunk)
             
             except Exception as e:
                 logger.error(
-                    "batch_company_item_failed",
-                    company_id=company.company_id,
+                    "batch_company_chunk_failed",
+                    first_company_id=first_id,
+                    size=len(chunk),
                     error=str(e)
                 )
-                failed_count += 1
+                db.rollback()
+                failed_count += len(chunk)
+            
+            logger.info(
+                "batch_progress",
+                processed=processed,
+                total=total,
+                success=success_count,
+                failed=failed_count
+            )
         
         stats = {
             "total": total,
             "success": success_count,
             "failed": failed_count,
+            "skipped": skipped_count,
         }
         
         logger.info("batch_company_embedding_completed", **stats)
         
         return stats
-
+    
+    def embed_all(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int = 50,
+        force_refresh: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate incentive and company embeddings side by side.
+        
+        Both batch generators wait on OpenAI most of the time, so they run in
+        two threads, each with its own session; the client's process-wide
+        rate limiter keeps them under one requests-per-minute budget.
+        
+        Args:
+            session_factory: Creates the session of each thread
+            batch_size: Number to process at once
+            force_refresh: Regenerate all embeddings
+            
+        Returns:
+            Dict with the statistics of "incentives" and "companies"
+        """
+        def run(generate: Callable[..., Dict[str, Any]]) -> Dict[str, Any]:
+            db = session_factory()
+            try:
+                return generate(db, batch_size=batch_size, force_refresh=force_refresh)
+            finally:
+                db.close()
+        
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            incentives = executor.submit(run, self.generate_batch_incentive_embeddings)
+            companies = executor.submit(run, self.generate_batch_company_embeddings)
+            return {"incentives": incentives.result(), "companies": companies.result()}
+    
+    async def _embed_batches_async(
+        self,
+        db: Session,
+        query: Query,
+        id_column: Any,
+        text_fn: Callable[[Any], str],
+        record_cls: Union[Type[IncentiveEmbedding], Type[CompanyEmbedding]],
+        batch_size: int,
+        max_concurrency: int,
+        event: str
+    ) -> Dict[str, Any]:
+        """
+        Embed rows in pages of batch_size, several pages in flight at once.
+        
+        At most max_concurrency pages are pending, so memory stays bounded;
+        each page is written and committed on the event loop thread as soon
+        as its embeddings arrive, so the session is never used from two
+        places at once.
+        
+        Args:
+            db: Database session
+            query: Rows to embed
+            id_column: Primary key column (IncentiveEmbedding/CompanyEmbedding key)
+            text_fn: Builds the text to embed for a row
+            record_cls: IncentiveEmbedding or CompanyEmbedding
+            batch_size: Number of texts per request
+            max_concurrency: Maximum requests in flight
+            event: Log event prefix
+            
+        Returns:
+            Dict with statistics
+        """
+        total = query.count()
+        stats = {"total": total, "success": 0, "failed": 0, "skipped": 0}
+        
+        logger.info(f"{event}_started", total=total, concurrency=max_concurrency)
+        
+        async def embed_chunk(chunk: List[Any]) -> None:
+            texts = [text_fn(row) for row in chunk]
+            first_id = getattr(chunk[0], id_column.key)
+            chunk, texts, records = self._split_near_empty(chunk, texts, id_column.key)
+            stats["skipped"] += len(records)
+            try:
+                if chunk:
+                    embeddings = await self._embed_texts_async(texts, record_cls)
+                    records.update({
+                        getattr(row, id_column.key): (embedding, text)
+                        for row, embedding, text in zip(chunk, embeddings, texts)
+                    })
+                
+                db.execute(self._upsert_statement(record_cls, id_column.key, records))
+                db.commit()
+                stats["success"] += len(chunk)
+            
+            except Exception as e:
+                logger.error(
+                    f"{event}_chunk_failed",
+                    first_id=first_id,
+                    size=len(chunk),
+                    error=str(e)
+                )
+                db.rollback()
+                stats["failed"] += len(chunk)
+        
+        pending = set()
+        for chunk in self._pages(query, id_column, batch_size):
+            if len(pending) >= max_concurrency:
+                _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            pending.add(asyncio.create_task(embed_chunk(chunk)))
+        await asyncio.gather(*pending)
+        
+        logger.info(f"{event}_completed", **stats)
+        
+        return stats
+    
+    async def generate_batch_incentive_embeddings_async(
+        self,
+        db: Session,
+        batch_size: int = 50,
+        force_refresh: bool = False,
+        max_concurrency: int = EMBEDDING_CONCURRENCY
+    ) -> Dict[str, Any]:
+        """
+        Async variant of generate_batch_incentive_embeddings.
+        
+        Args:
+            db: Database session
+            batch_size: Number of texts per request
+            force_refresh: Regenerate all embeddings
+            max_concurrency: Maximum requests in flight
+            
+        Returns:
+            Dict with statistics
+        """
+        return await self._embed_batches_async(
+            db, self._incentives_to_embed(db, force_refresh), Incentive.incentive_id,
+            self._incentive_text, IncentiveEmbedding, batch_size, max_concurrency, "batch_embedding"
+        )
+    
+    async def generate_batch_company_embeddings_async(
+        self,
+        db: Session,
+        batch_size: int = 50,
+        force_refresh: bool = False,
+        max_concurrency: int = EMBEDDING_CONCURRENCY
+    ) -> Dict[str, Any]:
+        """
+        Async variant of generate_batch_company_embeddings.
+        
+        Args:
+            db: Database session
+            batch_size: Number of texts per request
+            force_refresh: Regenerate all embeddings
+            max_concurrency: Maximum requests in flight
+            
+        Returns:
+            Dict with statistics
+        """
+        return await self._embed_batches_async(
+            db, self._companies_to_embed(db, force_refresh), Company.company_id,
+            self._company_text, CompanyEmbedding, batch_size, max_concurrency, "batch_company_embedding"
+        )
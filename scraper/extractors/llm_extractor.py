@@ -4,20 +4,20 @@ LLM-based extractor for structured incentive data.
 Extracts structured JSON from incentive descriptions using GPT-4o-mini.
 """
 
+import asyncio
+import functools
+import hashlib
 import json
-from typing import Optional, List, Literal
+import re
+from typing import Any, Callable, Dict, Generator, Optional, List, Literal
 from datetime import date
 from decimal import Decimal
 
 import structlog
 from pydantic import BaseModel, Field, ValidationError
 
-# Import from backend (will need to adjust Python path)
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
-from backend.app.services.openai_client import ManagedOpenAIClient, BudgetExceededError
+from backend.app.services.openai_client import ManagedOpenAIClient, BudgetExceededError, get_client
+from scraper.extractors.pdf_extractor import PDFExtractor
 
 logger = structlog.get_logger()
 
@@ -100,88 +100,217 @@ class AIDescription(BaseModel):
         }
 
 
-EXTRACTION_SYSTEM_PROMPT = """Você é um assistente especializado em analisar documentos de incentivos públicos portugueses.
-
-Sua tarefa é extrair informação estruturada de descrições de incentivos e retornar APENAS um objeto JSON válido.
+EXTRACTION_SYSTEM_PROMPT = """Extrai informação estruturada de descrições de incentivos públicos portugueses. Retorna APENAS um objeto JSON com este schema:
+{"caes": ["código CAE", ...], "geographic_location": "localização", "company_size": ["micro" | "pme" | "grande" | "não aplicável"], "investment_objectives": ["objetivo", ...], "specific_purposes": ["finalidade específica", ...], "eligibility_criteria": ["critério", ...], "publication_date": "YYYY-MM-DD" | null, "start_date": "YYYY-MM-DD" | null, "end_date": "YYYY-MM-DD" | null, "total_budget": número_em_euros | null}
 
-O JSON deve seguir EXATAMENTE este schema:
-{
-  "caes": ["código CAE 1", "código CAE 2", ...],
-  "geographic_location": "localização ou regiões aplicáveis",
-  "company_size": ["micro" | "pme" | "grande" | "não aplicável"],
-  "investment_objectives": ["objetivo 1", "objetivo 2", ...],
-  "specific_purposes": ["finalidade específica 1", ...],
-  "eligibility_criteria": ["critério 1", "critério 2", ...],
-  "publication_date": "YYYY-MM-DD ou null",
-  "start_date": "YYYY-MM-DD ou null",
-  "end_date": "YYYY-MM-DD ou null",
-  "total_budget": número_em_euros_ou_null
-}
+REGRAS:
+- Informação em falta: [], "" ou null
+- caes: strings de 4-5 dígitos (ex: "8413", "47190")
+- company_size: só "micro", "pme", "grande" ou "não aplicável"; sem menção de tamanho, ["não aplicável"]
+- geographic_location: cidades/regiões separadas por vírgula
+- Descrições específicas mas concisas
+- Datas (YYYY-MM-DD) e orçamento: procura ATENTAMENTE
+  - publication_date: publicação/aviso/lançamento ("publicado em", "aviso de", "lançado em")
+  - start_date: INÍCIO de candidaturas ("início", "abertura", "candidaturas a partir de")
+  - end_date: ENCERRAMENTO de candidaturas ("fim", "até", "prazo", "encerramento", "limite")
+  - total_budget: orçamento total/dotação/verba/financiamento, SEMPRE em euros ("mil" = ×1000, "milhão/milhões" = ×1000000; ex: "2 milhões €" = 2000000.0)
 
-REGRAS IMPORTANTES:
-1. Retorne APENAS o JSON, sem texto adicional antes ou depois
-2. Use valores vazios ([],  "", null) se a informação não estiver disponível
-3. CAE codes devem ser strings de 4-5 dígitos (ex: "8413", "47190")
-4. company_size só pode conter: "micro", "pme", "grande", ou "não aplicável"
-5. Se não mencionar tamanho de empresa, use ["não aplicável"]
-6. Seja específico mas conciso nas descrições
-7. Para localização, use nomes de cidades/regiões separados por vírgula
-
-ATENÇÃO ESPECIAL - DATAS E ORÇAMENTO:
-8. publication_date: Procure ATENTAMENTE por datas de publicação, aviso, ou lançamento do programa
-   - Termos comuns: "publicado em", "aviso de", "data de publicação", "lançado em"
-   - Formato: YYYY-MM-DD (ex: "2024-03-15")
-   
-9. start_date: Procure ATENTAMENTE por data de INÍCIO de candidaturas/submissões
-   - Termos comuns: "início", "abertura", "candidaturas a partir de", "submissões começam"
-   - Formato: YYYY-MM-DD
-   
-10. end_date: Procure ATENTAMENTE por data de ENCERRAMENTO/LIMITE de candidaturas
-    - Termos comuns: "fim", "até", "prazo", "encerramento", "candidaturas até", "limite"
-    - Formato: YYYY-MM-DD
-    
-11. total_budget: Procure ATENTAMENTE por valores de orçamento total, dotação, ou financiamento disponível
-    - Termos comuns: "orçamento", "dotação", "milhões €", "milhares €", "verba", "financiamento"
-    - Converta SEMPRE para número em euros (ex: "2 milhões €" = 2000000.0)
-    - Se mencionar "mil", multiplique por 1000; se mencionar "milhão/milhões", multiplique por 1000000
-
-EXEMPLOS:
-
-Exemplo 1 - Incentivo com informação completa:
+EXEMPLO:
 Input: "Apoio a PME do setor da construção (CAE 41, 42, 43) localizadas em Lisboa e Porto para eficiência energética. Investimento mínimo: €50.000. Publicado em 15/03/2024, candidaturas de 01/04/2024 a 30/06/2024. Orçamento total: €2.000.000."
+Output: {"caes": ["41", "42", "43"], "geographic_location": "Lisboa, Porto", "company_size": ["pme"], "investment_objectives": ["Eficiência energética"], "specific_purposes": ["Reabilitação energética de edifícios"], "eligibility_criteria": ["Investimento mínimo de €50.000", "Empresas do setor da construção"], "publication_date": "2024-03-15", "start_date": "2024-04-01", "end_date": "2024-06-30", "total_budget": 2000000.00}"""
+
+# The system prompt is the first message, identical on every call: keep
+# anything request-specific in the user message, so OpenAI's prompt cache can
+# reuse the shared prefix (once requests are long enough, 1024+ tokens).
+# Extraction requests share this key, derived from the prompt so it changes
+# whenever the prompt does
+EXTRACTION_PROMPT_CACHE_KEY = (
+    "incentive-extraction-"
+    + hashlib.blake2b(EXTRACTION_SYSTEM_PROMPT.encode(), digest_size=8).hexdigest()
+)
+
+# Several incentives per request: the system prompt is paid once per batch.
+# Starts with the single-incentive prompt, so both share the cached prefix
+BATCH_EXTRACTION_SYSTEM_PROMPT = EXTRACTION_SYSTEM_PROMPT + """
+
+VÁRIOS INCENTIVOS: o input tem vários incentivos numerados ([1], [2], ...). Retorna {"results": [objeto do incentivo 1, objeto do incentivo 2, ...]}, um objeto por incentivo, na mesma ordem."""
 
-Output:
-{
-  "caes": ["41", "42", "43"],
-  "geographic_location": "Lisboa, Porto",
-  "company_size": ["pme"],
-  "investment_objectives": ["Eficiência energética"],
-  "specific_purposes": ["Reabilitação energética de edifícios"],
-  "eligibility_criteria": ["Investimento mínimo de €50.000", "Empresas do setor da construção"],
-  "publication_date": "2024-03-15",
-  "start_date": "2024-04-01",
-  "end_date": "2024-06-30",
-  "total_budget": 2000000.00
-}
 
-Exemplo 2 - Incentivo com informação limitada:
-Input: "Financiamento para digitalização empresarial. Abertura de candidaturas em Janeiro."
-
-Output:
-{
-  "caes": [],
-  "geographic_location": "",
-  "company_size": ["não aplicável"],
-  "investment_objectives": ["Digitalização"],
-  "specific_purposes": ["Transformação digital"],
-  "eligibility_criteria": [],
-  "publication_date": null,
-  "start_date": null,
-  "end_date": null,
-  "total_budget": null
+def _strict_json_schema(schema: Any) -> Any:
+    """
+    Adapt a Pydantic JSON schema to OpenAI's strict Structured Outputs.
+    
+    Strict mode needs every property listed as required (optional fields
+    stay nullable) and no additional properties, and does not take
+    annotations such as defaults or formats, which are dropped (dates are
+    still checked by Pydantic). Decimal fields accept numbers only.
+    
+    Args:
+        schema: Schema or sub-schema from model_json_schema()
+    
+    Returns:
+        Strict schema
+    """
+    if isinstance(schema, list):
+        return [_strict_json_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    
+    strict = {
+        key: (
+            {name: _strict_json_schema(prop) for name, prop in value.items()}
+            if key == "properties" else _strict_json_schema(value)
+        )
+        for key, value in schema.items()
+        if key not in _SCHEMA_ANNOTATIONS
+    }
+    if "anyOf" in strict and {"type": "number"} in strict["anyOf"]:
+        strict["anyOf"] = [option for option in strict["anyOf"] if option != {"type": "string"}]
+    if strict.get("type") == "object":
+        strict["required"] = list(strict.get("properties", {}))
+        strict["additionalProperties"] = False
+    return strict
+
+
+_SCHEMA_ANNOTATIONS = {"title", "description", "default", "format", "example"}
+
+# Structured Outputs: generation is constrained to the AIDescription schema
+_AI_DESCRIPTION_SCHEMA = _strict_json_schema(AIDescription.model_json_schema())
+EXTRACTION_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "ai_description", "strict": True, "schema": _AI_DESCRIPTION_SCHEMA},
+}
+BATCH_EXTRACTION_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "ai_descriptions",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {"results": {"type": "array", "items": _AI_DESCRIPTION_SCHEMA}},
+            "required": ["results"],
+            "additionalProperties": False,
+        },
+    },
 }
 
-Agora processe o documento fornecido."""
+# Appended to the context when a draft extraction came back empty
+EMPTY_EXTRACTION_FEEDBACK = (
+    "\n\n[A extração anterior veio vazia, mas o texto é longo. "
+    "Revê-o com atenção e extrai toda a informação disponível.]"
+)
+
+# Descriptions longer than this rarely have nothing to extract: an empty draft
+# result for them is escalated
+EMPTY_EXTRACTION_MIN_CHARS = 500
+
+# Token budget shared by the document excerpts of an extraction request
+DOCUMENT_CONTEXT_TOKENS = 2000
+
+# Cues of what the extraction looks for (CAE codes, company sizes, amounts,
+# deadlines, dates): sentences with more of them are sent first
+_RELEVANT_SENTENCE_RE = re.compile(
+    r"\b(?:CAE\s*\d+|PME|micro|grande|milh[ãa]o|milh[õo]es|orçamento|dotação|prazo"
+    r"|candidaturas?|até|\d{1,2}/\d{1,2}/\d{4})\b|€",
+    re.IGNORECASE
+)
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?;])\s+|\n\s*\n")
+
+# Outermost JSON object of a response with text around it
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_pdf_extractor() -> PDFExtractor:
+    """PDF extractor shared by all extractions (created on first use)."""
+    return PDFExtractor()
+
+
+def select_document_context(
+    document_texts: List[str],
+    count_tokens_batch: Callable[[List[str]], List[int]],
+    max_tokens: int = DOCUMENT_CONTEXT_TOKENS
+) -> List[str]:
+    """
+    Pick the document sentences to send, within a shared token budget.
+    
+    Sentences are ranked by how many extraction cues they contain (earlier
+    ones first on ties) and taken while they fit; sentences repeated across
+    documents (boilerplate shared by several PDFs) are sent once. Each
+    document's picks keep their original order.
+    
+    Args:
+        document_texts: Document texts
+        count_tokens_batch: Token counts of a list of texts
+        max_tokens: Token budget for all documents together
+    
+    Returns:
+        Excerpt per document, for documents with at least one sentence picked
+    """
+    seen = set()
+    candidates = []  # (document index, sentence), in reading order
+    for doc_index, doc_text in enumerate(document_texts):
+        for sentence in _SENTENCE_SPLIT_RE.split(doc_text):
+            sentence = " ".join(sentence.split())
+            if sentence and sentence not in seen:
+                seen.add(sentence)
+                candidates.append((doc_index, sentence))
+    
+    if not candidates:
+        return []
+    
+    token_counts = count_tokens_batch([sentence for _, sentence in candidates])
+    ranked = sorted(
+        range(len(candidates)),
+        key=lambda i: (-len(_RELEVANT_SENTENCE_RE.findall(candidates[i][1])), i)
+    )
+    
+    selected = []
+    budget = max_tokens
+    for i in ranked:
+        if token_counts[i] <= budget:
+            selected.append(i)
+            budget -= token_counts[i]
+    
+    excerpts: Dict[int, List[str]] = {}
+    for i in sorted(selected):
+        doc_index, sentence = candidates[i]
+        excerpts.setdefault(doc_index, []).append(sentence)
+    return [" ".join(sentences) for _, sentences in sorted(excerpts.items())]
+
+
+def _extraction_input_key(
+    title: str,
+    description: str,
+    document_texts: Optional[List[str]]
+) -> str:
+    """
+    Cache key of an extraction: its inputs and the prompt they are sent with.
+    
+    Args:
+        title: Incentive title
+        description: Incentive description
+        document_texts: Document texts (order does not matter)
+    
+    Returns:
+        Hex digest
+    """
+    key = hashlib.blake2b(digest_size=16)
+    for part in (EXTRACTION_PROMPT_CACHE_KEY, title, description or "", *sorted(document_texts or [])):
+        key.update(part.encode("utf-8"))
+        key.update(b"\x00")
+    return key.hexdigest()
+
+
+def _looks_empty(ai_desc: AIDescription, description: str) -> bool:
+    """Whether an extraction found nothing in a description that is long enough to have something."""
+    return len(description or "") > EMPTY_EXTRACTION_MIN_CHARS and not any((
+        ai_desc.caes,
+        ai_desc.company_size,
+        ai_desc.investment_objectives,
+        ai_desc.specific_purposes,
+        ai_desc.eligibility_criteria,
+    ))
 
 
 class LLMExtractor:
@@ -190,19 +319,253 @@ class LLMExtractor:
     def __init__(
         self,
         openai_client: Optional[ManagedOpenAIClient] = None,
-        max_retries: int = 2
+        max_retries: int = 2,
+        draft_model: str = "gpt-4o-mini",
+        verify_model: str = "gpt-4o"
     ):
         """
         Initialize LLM extractor.
         
+        Extractions start with `draft_model`; a draft that fails validation
+        or comes back empty for a long description is retried with
+        `verify_model`, by default the stronger gpt-4o (re-sending the
+        prompt to the draft model would only double its cost). Both must
+        be models the budget guard has prices for.
+        
         Args:
             openai_client: Managed OpenAI client (or create new one)
             max_retries: Maximum extraction retries on validation errors
+            draft_model: Model for the first attempt
+            verify_model: Model for attempts after an escalation
         """
-        self.client = openai_client or ManagedOpenAIClient(
-            max_per_request_eur=0.30
-        )
+        self.client = openai_client or get_client(max_per_request_eur=0.30)
         self.max_retries = max_retries
+        self.draft_model = draft_model
+        self.verify_model = verify_model
+    
+    def _count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Token counts of texts, with the client's tokenizer."""
+        return [len(tokens) for tokens in self.client.tokenizer.encode_ordinary_batch(texts)]
+    
+    def _fetch_document_texts(self, document_urls: List[str]) -> Optional[List[str]]:
+        """Download the PDFs linked from document pages and extract their text."""
+        logger.info("extracting_pdfs", urls_count=len(document_urls))
+        pdf_texts = _get_pdf_extractor().get_all_pdfs_text_from_pages(
+            document_urls,
+            max_pdfs_per_page=2  # Limit to avoid too much context
+        )
+        
+        if not pdf_texts:
+            return None
+        
+        logger.info("pdfs_extracted", count=len(pdf_texts))
+        return list(pdf_texts.values())
+    
+    def _build_context(
+        self,
+        title: str,
+        description: str,
+        document_texts: Optional[List[str]]
+    ) -> str:
+        """Build the user message of an extraction request."""
+        context_parts = [
+            f"TÍTULO: {title}",
+            f"DESCRIÇÃO: {description or '(não disponível)'}",
+        ]
+        
+        if document_texts:
+            # The most relevant sentences of all documents, within one budget
+            excerpts = select_document_context(document_texts, self._count_tokens_batch)
+            if excerpts:
+                context_parts.append("\nDOCUMENTOS ADICIONAIS:")
+            for i, excerpt in enumerate(excerpts, 1):
+                context_parts.append(f"\nDocumento {i}:\n{excerpt}")
+        
+        return "\n".join(context_parts)
+    
+    def _get_cached_extraction(self, input_key: str, title: str) -> Optional[AIDescription]:
+        """Result of an earlier extraction with the same inputs and prompt."""
+        cached = self.client.cache.get_extraction(input_key)
+        if cached is None:
+            return None
+        
+        logger.info("llm_extraction_cache_hit", title=title[:50])
+        return AIDescription.model_validate_json(cached)
+    
+    @staticmethod
+    def _request_kwargs(context: str, document_id: Optional[str], model: str) -> dict:
+        """Arguments of the chat completion for an extraction request."""
+        return {
+            "messages": [
+                {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+                {"role": "user", "content": context}
+            ],
+            "model": model,
+            "temperature": 0.0,
+            "response_format": EXTRACTION_RESPONSE_FORMAT,
+            "document_id": document_id,
+            "prompt_cache_key": EXTRACTION_PROMPT_CACHE_KEY,
+        }
+    
+    @staticmethod
+    def _parse_extraction(result: dict) -> AIDescription:
+        """
+        Parse and validate an extraction response.
+        
+        The JSON is parsed and validated in one pass by pydantic-core.
+        
+        Raises:
+            ValidationError: If no JSON object can be read from the response,
+                or it does not match AIDescription
+        """
+        response_text = result["response"]
+        
+        try:
+            return AIDescription.model_validate_json(response_text)
+        except ValidationError as e:
+            if not any(error["type"] == "json_invalid" for error in e.errors()):
+                raise
+            logger.error("json_parse_error", error=str(e), response=response_text[:200])
+            
+            # Try to extract JSON from text
+            json_match = _JSON_OBJECT_RE.search(response_text)
+            if not json_match:
+                raise
+            return AIDescription.model_validate_json(json_match.group(0))
+    
+    def _accept_extraction(
+        self,
+        ai_desc: AIDescription,
+        result: dict,
+        title: str,
+        input_key: str
+    ) -> AIDescription:
+        """Log a successful extraction and cache its result."""
+        logger.info(
+            "llm_extraction_success",
+            title=title[:50],
+            cost_eur=result["cost_eur"],
+            from_cache=result["from_cache"],
+            caes_found=len(ai_desc.caes),
+            criteria_found=len(ai_desc.eligibility_criteria)
+        )
+        
+        self.client.cache.save_extraction(input_key, ai_desc.model_dump_json())
+        return ai_desc
+    
+    def _escalate(self, title: str, reason: str) -> str:
+        """Log an escalation from the draft model; returns the model to use next."""
+        logger.info(
+            "llm_extraction_escalated",
+            title=title[:50],
+            reason=reason,
+            draft_model=self.draft_model,
+            verify_model=self.verify_model
+        )
+        return self.verify_model
+    
+    def _handle_attempt_error(
+        self,
+        error: Exception,
+        title: str,
+        attempt: int,
+        context: str
+    ) -> Optional[str]:
+        """
+        Log a failed extraction attempt and decide whether to retry.
+        
+        Returns:
+            Context for the next attempt (with validation feedback added), or
+            None to give up
+        """
+        if isinstance(error, ValidationError):
+            logger.warning(
+                "validation_error",
+                title=title[:50],
+                attempt=attempt,
+                error=str(error)
+            )
+            
+            if attempt < self.max_retries:
+                # Add validation feedback to context
+                return context + f"\n\n[ERRO DE VALIDAÇÃO: {str(error)}. Por favor corrija e retorne JSON válido.]"
+            
+            logger.error("max_retries_reached", title=title[:50])
+            return None
+        
+        if isinstance(error, BudgetExceededError):
+            logger.error(
+                "budget_exceeded",
+                title=title[:50],
+                error=str(error)
+            )
+            # Don't retry on budget errors
+            return None
+        
+        logger.error(
+            "extraction_failed",
+            title=title[:50],
+            attempt=attempt,
+            error=str(error),
+            exc_info=True
+        )
+        return context if attempt < self.max_retries else None
+    
+    def _extraction_attempts(
+        self,
+        title: str,
+        description: str,
+        context: str,
+        document_id: Optional[str],
+        input_key: str
+    ) -> Generator[dict, tuple[Optional[dict], Optional[Exception]], Optional[AIDescription]]:
+        """
+        Retry and escalation logic shared by extract and aextract.
+        
+        Yields the chat_completion kwargs of each attempt and must be sent
+        back its (result, error) outcome, so callers only make the request
+        (sync or async). Escalates from the draft model when a result fails
+        validation or looks empty.
+        
+        Returns:
+            Accepted AIDescription, or None when extraction fails
+        """
+        model = self.draft_model
+        escalated = False
+        for attempt in range(1, self.max_retries + 1):
+            logger.info(
+                "llm_extraction_attempt",
+                title=title[:50],
+                attempt=attempt,
+                model=model,
+                context_length=len(context)
+            )
+            result, error = yield self._request_kwargs(context, document_id, model)
+            
+            if error is None:
+                try:
+                    ai_desc = self._parse_extraction(result)
+                except Exception as e:
+                    error = e
+            
+            if error is not None:
+                context = self._handle_attempt_error(error, title, attempt, context)
+                if context is None:
+                    return None
+                if isinstance(error, ValidationError) and not escalated:
+                    model = self._escalate(title, "validation_error")
+                    escalated = True
+                continue
+            
+            if not escalated and attempt < self.max_retries and _looks_empty(ai_desc, description):
+                context += EMPTY_EXTRACTION_FEEDBACK
+                model = self._escalate(title, "empty")
+                escalated = True
+                continue
+            
+            return self._accept_extraction(ai_desc, result, title, input_key)
+        
+        return None
     
     def extract(
         self,
@@ -226,153 +589,234 @@ class LLMExtractor:
         """
         # Extract PDFs if URLs provided
         if document_urls and not document_texts:
-            from scraper.extractors.pdf_extractor import PDFExtractor
-            pdf_extractor = PDFExtractor()
+            document_texts = self._fetch_document_texts(document_urls)
+        
+        # Same inputs and prompt as an earlier extraction: reuse its result
+        input_key = _extraction_input_key(title, description, document_texts)
+        cached = self._get_cached_extraction(input_key, title)
+        if cached is not None:
+            return cached
+        
+        context = self._build_context(title, description, document_texts)
+        
+        attempts = self._extraction_attempts(title, description, context, document_id, input_key)
+        try:
+            request = next(attempts)
+            while True:
+                try:
+                    outcome = (self.client.chat_completion(**request), None)
+                except Exception as e:
+                    outcome = (None, e)
+                request = attempts.send(outcome)
+        except StopIteration as finished:
+            return finished.value
+    
+    async def aextract(
+        self,
+        title: str,
+        description: str,
+        document_texts: Optional[List[str]] = None,
+        document_urls: Optional[List[str]] = None,
+        document_id: Optional[str] = None
+    ) -> Optional[AIDescription]:
+        """
+        Async variant of extract.
+        
+        The API request is awaited and PDF downloads run in a worker thread,
+        so several extractions can be in flight at once.
+        
+        Args:
+            Same as extract
             
-            logger.info("extracting_pdfs", urls_count=len(document_urls))
-            pdf_texts = pdf_extractor.get_all_pdfs_text_from_pages(
-                document_urls,
-                max_pdfs_per_page=2  # Limit to avoid too much context
-            )
+        Returns:
+            Same as extract
+        """
+        if document_urls and not document_texts:
+            document_texts = await asyncio.to_thread(self._fetch_document_texts, document_urls)
+        
+        input_key = _extraction_input_key(title, description, document_texts)
+        cached = self._get_cached_extraction(input_key, title)
+        if cached is not None:
+            return cached
+        
+        context = self._build_context(title, description, document_texts)
+        
+        attempts = self._extraction_attempts(title, description, context, document_id, input_key)
+        try:
+            request = next(attempts)
+            while True:
+                try:
+                    outcome = (await self.client.chat_completion_async(**request), None)
+                except Exception as e:
+                    outcome = (None, e)
+                request = attempts.send(outcome)
+        except StopIteration as finished:
+            return finished.value
+    
+    async def _aextract_group(self, incentives: List[dict]) -> List[Optional[AIDescription]]:
+        """
+        Extract several incentives with a single LLM call.
+        
+        Args:
+            incentives: Incentive dicts with 'title', 'description'
             
-            if pdf_texts:
-                document_texts = list(pdf_texts.values())
-                logger.info("pdfs_extracted", count=len(document_texts))
-        # Prepare context
-        context_parts = [
-            f"TÍTULO: {title}",
-            f"DESCRIÇÃO: {description or '(não disponível)'}",
-        ]
+        Returns:
+            AIDescription per incentive, in order (None where the item was
+            missing or invalid)
+            
+        Raises:
+            ValueError: If the response is not a results list of the right length
+        """
+        context = "\n\n".join(
+            f"[{i}] TÍTULO: {inc.get('title', '')}\n"
+            f"DESCRIÇÃO: {inc.get('description') or '(não disponível)'}"
+            for i, inc in enumerate(incentives, 1)
+        )
         
-        if document_texts:
-            context_parts.append("\nDOCUMENTOS ADICIONAIS:")
-            for i, doc_text in enumerate(document_texts[:3], 1):  # Max 3 docs
-                # Truncate each doc to 500 chars
-                truncated = doc_text[:500] + ("..." if len(doc_text) > 500 else "")
-                context_parts.append(f"\nDocumento {i}:\n{truncated}")
+        result = await self.client.chat_completion_async(
+            messages=[
+                {"role": "system", "content": BATCH_EXTRACTION_SYSTEM_PROMPT},
+                {"role": "user", "content": context}
+            ],
+            model=self.draft_model,
+            temperature=0.0,
+            response_format=BATCH_EXTRACTION_RESPONSE_FORMAT,
+            prompt_cache_key=EXTRACTION_PROMPT_CACHE_KEY
+        )
         
-        context = "\n".join(context_parts)
+        items = json.loads(result["response"]).get("results")
+        if not isinstance(items, list) or len(items) != len(incentives):
+            raise ValueError(
+                f"expected {len(incentives)} results, got "
+                f"{len(items) if isinstance(items, list) else type(items).__name__}"
+            )
         
-        # Try extraction with retries
-        for attempt in range(1, self.max_retries + 1):
+        ai_descs = []
+        for inc, item in zip(incentives, items):
             try:
-                logger.info(
-                    "llm_extraction_attempt",
-                    title=title[:50],
-                    attempt=attempt,
-                    context_length=len(context)
-                )
-                
-                # Call LLM
-                result = self.client.chat_completion(
-                    messages=[
-                        {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
-                        {"role": "user", "content": context}
-                    ],
-                    model="gpt-4o-mini",
-                    temperature=0.0,
-                    response_format={"type": "json_object"},
-                    document_id=document_id
-                )
-                
-                # Parse and validate
-                response_text = result["response"]
-                
-                try:
-                    json_data = json.loads(response_text)
-                except json.JSONDecodeError as e:
-                    logger.error("json_parse_error", error=str(e), response=response_text[:200])
-                    
-                    # Try to extract JSON from text
-                    import re
-                    json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                    if json_match:
-                        json_data = json.loads(json_match.group(0))
-                    else:
-                        raise
-                
-                # Validate with Pydantic
-                ai_desc = AIDescription(**json_data)
-                
-                logger.info(
-                    "llm_extraction_success",
-                    title=title[:50],
-                    cost_eur=result["cost_eur"],
-                    from_cache=result["from_cache"],
-                    caes_found=len(ai_desc.caes),
-                    criteria_found=len(ai_desc.eligibility_criteria)
-                )
-                
-                return ai_desc
-                
+                ai_desc = AIDescription.model_validate(item)
             except ValidationError as e:
                 logger.warning(
-                    "validation_error",
-                    title=title[:50],
-                    attempt=attempt,
+                    "batch_item_validation_error",
+                    incentive_id=inc.get("incentive_id"),
                     error=str(e)
                 )
-                
-                if attempt < self.max_retries:
-                    # Add validation feedback to context
-                    context += f"\n\n[ERRO DE VALIDAÇÃO: {str(e)}. Por favor corrija e retorne JSON válido.]"
-                else:
-                    logger.error("max_retries_reached", title=title[:50])
-                    return None
+                ai_descs.append(None)
+                continue
             
-            except BudgetExceededError as e:
-                logger.error(
-                    "budget_exceeded",
-                    title=title[:50],
-                    error=str(e)
-                )
-                # Don't retry on budget errors
-                return None
+            # Left to the per-item path, which escalates empty drafts
+            if _looks_empty(ai_desc, inc.get("description", "")):
+                ai_descs.append(None)
+                continue
             
-            except Exception as e:
-                logger.error(
-                    "extraction_failed",
-                    title=title[:50],
-                    attempt=attempt,
-                    error=str(e),
-                    exc_info=True
-                )
-                
-                if attempt >= self.max_retries:
-                    return None
+            self.client.cache.save_extraction(
+                _extraction_input_key(inc.get("title", ""), inc.get("description", ""), None),
+                ai_desc.model_dump_json()
+            )
+            ai_descs.append(ai_desc)
         
-        return None
+        logger.info(
+            "llm_batch_extraction_success",
+            size=len(incentives),
+            valid=sum(ai_desc is not None for ai_desc in ai_descs),
+            cost_eur=result["cost_eur"],
+            from_cache=result["from_cache"]
+        )
+        
+        return ai_descs
     
-    def extract_batch(
+    async def aextract_batch(
         self,
-        incentives: List[dict]
+        incentives: List[dict],
+        batch_size: int = 8,
+        concurrency: int = 16
     ) -> List[tuple[str, Optional[AIDescription]]]:
         """
         Extract structured data for multiple incentives.
         
+        Incentives are sent `batch_size` at a time in one request, so the
+        system prompt is paid once per batch, with up to `concurrency`
+        requests in flight; items the batch response gets wrong (or whole
+        batches that fail) are retried one by one.
+        
         Args:
             incentives: List of incentive dicts with 'incentive_id', 'title', 'description'
+            batch_size: Incentives per LLM call (1 = one call each)
+            concurrency: Maximum LLM requests in flight
             
         Returns:
             List of (incentive_id, AIDescription or None) tuples
         """
-        results = []
+        semaphore = asyncio.Semaphore(concurrency)
         
-        for inc in incentives:
-            incentive_id = inc.get("incentive_id")
-            title = inc.get("title", "")
-            description = inc.get("description", "")
-            
+        # Incentives extracted before with the same inputs are not sent again
+        extracted: Dict[int, Optional[AIDescription]] = {}
+        for i, inc in enumerate(incentives):
+            cached = self.client.cache.get_extraction(
+                _extraction_input_key(inc.get("title", ""), inc.get("description", ""), None)
+            )
+            if cached is not None:
+                extracted[i] = AIDescription.model_validate_json(cached)
+        pending = [i for i in range(len(incentives)) if i not in extracted]
+        
+        async def extract_one(i: int) -> None:
+            inc = incentives[i]
             try:
-                ai_desc = self.extract(title, description)
-                results.append((incentive_id, ai_desc))
+                async with semaphore:
+                    extracted[i] = await self.aextract(inc.get("title", ""), inc.get("description", ""))
             except Exception as e:
                 logger.error(
                     "batch_extraction_failed",
-                    incentive_id=incentive_id,
+                    incentive_id=inc.get("incentive_id"),
                     error=str(e)
                 )
-                results.append((incentive_id, None))
+                extracted[i] = None
         
-        return results
-
+        async def extract_group(group: List[int]) -> None:
+            ai_descs = [None] * len(group)
+            if len(group) > 1:
+                try:
+                    async with semaphore:
+                        ai_descs = await self._aextract_group([incentives[i] for i in group])
+                except Exception as e:
+                    logger.warning("batch_extraction_fallback", size=len(group), error=str(e))
+            
+            for i, ai_desc in zip(group, ai_descs):
+                extracted[i] = ai_desc
+            await asyncio.gather(*(extract_one(i) for i, ai_desc in zip(group, ai_descs) if ai_desc is None))
+        
+        await asyncio.gather(*(
+            extract_group(pending[start:start + batch_size])
+            for start in range(0, len(pending), batch_size)
+        ))
+        
+        return [(inc.get("incentive_id"), extracted[i]) for i, inc in enumerate(incentives)]
+    
+    def extract_batch(
+        self,
+        incentives: List[dict],
+        batch_size: int = 8,
+        concurrency: int = 16
+    ) -> List[tuple[str, Optional[AIDescription]]]:
+        """
+        Extract structured data for multiple incentives (see aextract_batch).
+        
+        Must not be called from a running event loop; await aextract_batch
+        there instead.
+        
+        Args:
+            incentives: List of incentive dicts with 'incentive_id', 'title', 'description'
+            batch_size: Incentives per LLM call (1 = one call each)
+            concurrency: Maximum LLM requests in flight
+            
+        Returns:
+            List of (incentive_id, AIDescription or None) tuples
+        """
+        async def run() -> List[tuple[str, Optional[AIDescription]]]:
+            try:
+                return await self.aextract_batch(incentives, batch_size, concurrency)
+            finally:
+                # The loop ends with asyncio.run - release its connection pool
+                await self.client.aclose()
+        
+        return asyncio.run(run())
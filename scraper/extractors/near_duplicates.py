@@ -0,0 +1,124 @@
+"""
+Near-duplicate lookup for embedding texts, based on 64-bit simhash.
+
+Texts that only differ in accents, case or a few words (boilerplate
+incentive descriptions with the same region phrasing) get signatures a few
+bits apart, so their embeddings can be reused instead of requested.
+
+Numbers are what set otherwise templated texts apart (CAE codes, amounts,
+deadlines): they are shingled like words, and two texts only match if they
+contain exactly the same numbers.
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+SIGNATURE_BITS = 64
+
+# The signature is split in BLOCKS blocks: two signatures at most BLOCKS - 1
+# bits apart share at least one block exactly, so only entries indexed under
+# one of the query's blocks need to be compared
+BLOCKS = 4
+_BLOCK_BITS = SIGNATURE_BITS // BLOCKS
+_BLOCK_MASK = (1 << _BLOCK_BITS) - 1
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def _normalize(text: str) -> List[str]:
+    """Lowercase words and numbers without accents; punctuation dropped."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _TOKEN_RE.findall(text)
+
+
+def _numbers(words: List[str]) -> Tuple[str, ...]:
+    """Distinct numeric tokens, sorted."""
+    return tuple(sorted({word for word in words if word.isdigit()}))
+
+
+def simhash(text: str) -> int:
+    """
+    64-bit simhash of the word 3-shingles of a text.
+    
+    Args:
+        text: Text to sign
+    
+    Returns:
+        Signature as an int
+    """
+    return _simhash_words(_normalize(text))
+
+
+def _simhash_words(words: List[str]) -> int:
+    """simhash of normalized words."""
+    shingles = [" ".join(words[i:i + 3]) for i in range(max(len(words) - 2, 1))]
+    
+    weights = [0] * SIGNATURE_BITS
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIGNATURE_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+class NearDuplicateIndex:
+    """In-memory index of embeddings by simhash, for near-duplicate reuse."""
+    
+    def __init__(self, max_bits: int = 3):
+        """
+        Initialize index.
+        
+        Args:
+            max_bits: Maximum signature distance (in bits) for a match;
+                at most BLOCKS - 1
+        """
+        if not 0 <= max_bits < BLOCKS:
+            raise ValueError(f"max_bits must be between 0 and {BLOCKS - 1}")
+        self.max_bits = max_bits
+        self._buckets: Dict[Tuple[int, int], List[Tuple[int, Tuple[str, ...], Any]]] = {}
+    
+    @staticmethod
+    def _blocks(signature: int) -> List[Tuple[int, int]]:
+        return [
+            (i, signature >> (i * _BLOCK_BITS) & _BLOCK_MASK)
+            for i in range(BLOCKS)
+        ]
+    
+    def get(self, text: str) -> Optional[Any]:
+        """
+        Get the embedding of an indexed text close enough to this one.
+        
+        Args:
+            text: Text to look up
+        
+        Returns:
+            Embedding of an indexed text with the same numbers and a
+            signature at most max_bits away, or None
+        """
+        words = _normalize(text)
+        signature, numbers = _simhash_words(words), _numbers(words)
+        for block in self._blocks(signature):
+            for other, other_numbers, embedding in self._buckets.get(block, ()):
+                if other_numbers == numbers and (signature ^ other).bit_count() <= self.max_bits:
+                    return embedding
+        return None
+    
+    def add(self, text: str, embedding: Any) -> None:
+        """
+        Index the embedding of a text.
+        
+        Args:
+            text: Embedded text
+            embedding: Its embedding
+        """
+        words = _normalize(text)
+        entry = (_simhash_words(words), _numbers(words), embedding)
+        for block in self._blocks(entry[0]):
+            self._buckets.setdefault(block, []).append(entry)
+    
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._buckets.values()) // BLOCKS
@@ -101,7 +101,9 @@ def test_tokenize_text(matching_service):
 
 def test_calculate_bm25_score(matching_service, sample_incentive, sample_company):
     """Testa o cálculo do score BM25."""
-    score = matching_service._calculate_bm25_score(sample_incentive, sample_company)
+    score = matching_service._calculate_bm25_score(
+        matching_service._incentive_context(sample_incentive), sample_company
+    )
     
     assert isinstance(score, float)
     assert 0.0 <= score <= 1.0
@@ -110,7 +112,7 @@ def test_calculate_bm25_score(matching_service, sample_incentive, sample_company
 def test_apply_deterministic_filters_no_penalties(matching_service, sample_incentive, sample_company):
     """Testa filtros determinísticos sem penalizações."""
     penalty, penalties_applied = matching_service._apply_deterministic_filters(
-        sample_incentive, sample_company
+        matching_service._incentive_context(sample_incentive), sample_company
     )
     
     assert penalty == 1.0
@@ -131,7 +133,7 @@ def test_apply_deterministic_filters_size_penalty(matching_service, sample_incen
     company.raw = {}
     
     penalty, penalties_applied = matching_service._apply_deterministic_filters(
-        sample_incentive, company
+        matching_service._incentive_context(sample_incentive), company
     )
     
     assert penalty == 0.8  # size_mismatch penalty
@@ -153,7 +155,7 @@ def test_apply_deterministic_filters_cae_penalty(matching_service, sample_incent
     company.raw = {}
     
     penalty, penalties_applied = matching_service._apply_deterministic_filters(
-        sample_incentive, company
+        matching_service._incentive_context(sample_incentive), company
     )
     
     assert penalty == 0.7  # cae_mismatch penalty
@@ -165,6 +167,9 @@ def test_apply_deterministic_filters_geo_penalty(matching_service):
     """Testa filtros determinísticos com penalização geográfica."""
     # Incentivo com localização específica
     incentive = Mock(spec=Incentive)
+    incentive.incentive_id = "test_incentive"
+    incentive.title = "Test Incentive"
+    incentive.description = None
     incentive.ai_description = {
         "geographic_location": "Algarve"
     }
@@ -181,7 +186,7 @@ def test_apply_deterministic_filters_geo_penalty(matching_service):
     company.raw = {}
     
     penalty, penalties_applied = matching_service._apply_deterministic_filters(
-        incentive, company
+        matching_service._incentive_context(incentive), company
     )
     
     assert penalty == 0.9  # geo_mismatch penalty
@@ -227,6 +232,7 @@ def test_find_matches_no_llm(mock_llm_rerank, matching_service):
     mock_row.parish = None
     mock_row.website = None
     mock_row.raw = {}
+    mock_row.raw_description = None
     mock_row.embedding = np.array([0.1, 0.2, 0.3])
     mock_row.vector_similarity = 0.8
     
@@ -241,3 +247,154 @@ def test_find_matches_no_llm(mock_llm_rerank, matching_service):
     assert matches[0].company_id == "test_company"
     assert matches[0].company_name == "Test Company"
     assert 0.0 <= matches[0].score <= 1.0
+
+
+@patch('backend.app.services.matching_service.score_companies')
+@patch('backend.app.services.matching_service.index_available')
+def test_bm25_scores_from_index(mock_index_available, mock_score_companies, matching_service, sample_incentive):
+    """Testa o scoring BM25 a partir do índice pré-calculado."""
+    mock_index_available.return_value = True
+    # c3 não está no índice (carregada depois de o índice ser construído)
+    mock_score_companies.return_value = {"c1": 2.0, "c2": 0.0}
+    
+    ctx = matching_service._incentive_context(sample_incentive)
+    
+    scores = matching_service._bm25_scores_from_index(Mock(), ctx, ["c1", "c2", "c3"])
+    
+    assert set(scores) == {"c1", "c2"}
+    assert scores["c1"] > scores["c2"]
+    assert scores["c2"] == 0.5  # Sem termos em comum: sigmoid(0)
+
+
+@patch('backend.app.services.matching_service.index_available')
+def test_bm25_scores_from_index_not_built(mock_index_available, matching_service, sample_incentive):
+    """Sem índice BM25, o scoring cai para o cálculo por candidato."""
+    mock_index_available.return_value = False
+    
+    ctx = matching_service._incentive_context(sample_incentive)
+    
+    assert matching_service._bm25_scores_from_index(Mock(), ctx, ["c1"]) is None
+
+
+def test_llm_rerank_uses_cache(matching_service, mock_openai_client, sample_incentive, sample_company):
+    """Re-ranking repetido para o mesmo incentivo e candidatos não volta a chamar o LLM."""
+    mock_openai_client.chat_completion.return_value = {
+        "response": '{"rankings": [{"company_index": 1, "score": 8, "reason": "Área relevante"}]}',
+        "cost_eur": 0.0
+    }
+    
+    first = matching_service._llm_rerank(sample_incentive, [sample_company])
+    second = matching_service._llm_rerank(sample_incentive, [sample_company])
+    
+    assert first == second == {"test_company": (0.8, "Área relevante")}
+    assert mock_openai_client.chat_completion.call_count == 1
+
+
+def test_bm25_document_stats_follow_company_changes(matching_service, sample_incentive, sample_company):
+    """As estatísticas BM25 da empresa são reaproveitadas, mas refletem alterações nos dados."""
+    ctx = matching_service._incentive_context(sample_incentive)
+    before = matching_service._calculate_bm25_score(ctx, sample_company)
+    assert matching_service._calculate_bm25_score(ctx, sample_company) == before
+    
+    sample_company.raw = {"description": "sustainability renewable energy"}
+    
+    assert matching_service._calculate_bm25_score(ctx, sample_company) > before
+
+
+def test_split_rerank_candidates(matching_service, sample_incentive, sample_company):
+    """Candidatos evidentes são decididos sem LLM; os restantes seguem para o LLM."""
+    sample_incentive.ai_description = {"caes": ["12345", "67890"]}
+    
+    def candidate(company_id, vector, penalties):
+        company = Mock(spec=Company)
+        company.company_id = company_id
+        company.cae_codes = ["12345", "67890"]
+        penalty = 1.0
+        for factor in penalties.values():
+            penalty *= factor
+        return {
+            'company': company,
+            'component_scores': {'vector': vector, 'penalty': penalty},
+            'penalties_applied': penalties
+        }
+    
+    decided, ambiguous = matching_service._split_rerank_candidates(sample_incentive, [
+        candidate("high", 0.9, {}),
+        candidate("low", 0.9, {'size': 0.8, 'geo': 0.9}),
+        candidate("middle", 0.7, {}),
+    ])
+    
+    assert decided["high"][0] == 0.9
+    assert decided["low"][0] == 0.1
+    assert [c.company_id for c in ambiguous] == ["middle"]
+
+
+def test_find_matches_batch_reranks_concurrently(matching_service, mock_openai_client, sample_incentive, sample_company):
+    """O batch faz o re-ranking LLM de vários incentivos via chamadas assíncronas."""
+    import asyncio
+    from unittest.mock import AsyncMock
+    
+    mock_openai_client.chat_completion_async = AsyncMock(return_value={
+        "response": '{"rankings": [{"company_index": 1, "score": 8, "reason": "Área relevante"}]}',
+        "cost_eur": 0.0
+    })
+    scored = [{
+        'company': sample_company,
+        'score': 0.5,
+        'component_scores': {'vector': 0.7, 'bm25': 0.5, 'penalty': 1.0},
+        'penalties_applied': {}
+    }]
+    
+    with patch.object(matching_service, '_score_candidates',
+                      side_effect=lambda db, incentive_id, pool, keep: (
+                          None if incentive_id == "missing" else (sample_incentive, list(scored))
+                      )):
+        matches = asyncio.run(matching_service.find_matches_batch(
+            Mock(), ["a", "b", "missing"], top_k=1
+        ))
+    
+    assert matches["missing"] == []
+    assert matches["a"][0].company_id == "test_company"
+    assert matches["a"][0].component_scores['llm'] == 0.8
+    assert matches["b"][0].explanation == "Área relevante"
+
+
+@patch('backend.app.services.matching_service.load_idf')
+def test_bm25_fallback_uses_cached_idf(mock_load_idf, matching_service, sample_incentive, sample_company):
+    """O fallback BM25 usa o IDF global, carregado uma vez e reutilizado."""
+    sample_company.raw = {"description": "sustainability"}
+    ctx = matching_service._incentive_context(sample_incentive)
+    baseline = matching_service._calculate_bm25_score(ctx, sample_company)
+    
+    mock_load_idf.return_value = {"sustainability": 5.0}
+    matching_service._refresh_idf(Mock())
+    matching_service._refresh_idf(Mock())
+    
+    assert mock_load_idf.call_count == 1
+    assert matching_service._calculate_bm25_score(ctx, sample_company) > baseline
+
+
+@patch('backend.app.services.matching_service.load_avg_doc_len')
+@patch('backend.app.services.matching_service.load_idf')
+def test_bm25_fallback_matches_index_weights(mock_load_idf, mock_load_avg_doc_len,
+                                             matching_service, sample_incentive, sample_company):
+    """O fallback BM25 pontua como os pesos do índice (mesma fórmula, IDF e comprimento médio)."""
+    from backend.app.services.bm25_index import K1, B, company_document_text, document_stats
+    
+    sample_company.raw = {"description": "sustainability sustainability energy"}
+    ctx = matching_service._incentive_context(sample_incentive)
+    mock_load_idf.return_value = {token: 2.0 for token in ctx.query_set}
+    mock_load_avg_doc_len.return_value = 12.0
+    matching_service._refresh_idf(Mock())
+    
+    # Weight sum as written by build_company_bm25_index
+    counts, doc_len = document_stats(company_document_text(sample_company))
+    length_norm = K1 * (1 - B + B * doc_len / 12.0)
+    indexed = sum(
+        counts[token] * (K1 + 1) / (counts[token] + length_norm) * 2.0
+        for token in ctx.query_set if counts.get(token)
+    )
+    
+    assert matching_service._calculate_bm25_score(ctx, sample_company) == pytest.approx(
+        matching_service._normalize_bm25(indexed, len(ctx.query_set))
+    )
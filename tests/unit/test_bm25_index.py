@@ -0,0 +1,62 @@
+"""
+Unit tests for the BM25 index queries.
+"""
+
+from unittest.mock import MagicMock
+
+from backend.app.services.bm25_index import (
+    INDEXED_TOKEN,
+    index_available,
+    load_idf,
+    score_companies,
+)
+
+
+def failing_session():
+    """Session whose queries fail."""
+    db = MagicMock()
+    db.execute.side_effect = RuntimeError("relation does not exist")
+    return db
+
+
+class TestSavepoints:
+    """Failed index queries must leave the caller's transaction alone."""
+    
+    def test_index_available(self):
+        """Should roll back only the savepoint when the probe fails."""
+        db = failing_session()
+        assert index_available(db) is False
+        db.begin_nested.assert_called_once()
+        db.rollback.assert_not_called()
+    
+    def test_load_idf(self):
+        """Should roll back only the savepoint when loading the IDF fails."""
+        db = failing_session()
+        assert load_idf(db) is None
+        db.begin_nested.assert_called_once()
+        db.rollback.assert_not_called()
+    
+    def test_score_companies(self):
+        """Should roll back only the savepoint when scoring fails."""
+        db = failing_session()
+        assert score_companies(db, ["energia"], ["c1"]) is None
+        db.begin_nested.assert_called_once()
+        db.rollback.assert_not_called()
+
+
+class TestScoreCompanies:
+    """Tests for score_companies function."""
+    
+    def test_looks_up_indexed_marker(self):
+        """Should query the marker token, so indexed companies without matches are returned."""
+        db = MagicMock()
+        db.execute.return_value = [MagicMock(company_id="c1", bm25=0.0)]
+        
+        assert score_companies(db, [], ["c1", "c2"]) == {"c1": 0.0}
+        assert db.execute.call_args[0][1]["tokens"] == [INDEXED_TOKEN]
+    
+    def test_no_candidates(self):
+        """Should not query without candidates."""
+        db = MagicMock()
+        assert score_companies(db, ["energia"], []) == {}
+        db.execute.assert_not_called()
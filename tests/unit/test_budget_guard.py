@@ -0,0 +1,42 @@
+"""
+Unit tests for the budget guard cost estimates.
+"""
+
+import pytest
+
+from backend.app.services import budget_guard
+from backend.app.services.budget_guard import estimate_cost
+
+
+@pytest.fixture(autouse=True)
+def fallback_prices(monkeypatch):
+    """Price from FALLBACK_PRICES at 1 EUR per USD, without network or cache files."""
+    def fetch_fails(*args, **kwargs):
+        raise RuntimeError("offline")
+    
+    monkeypatch.setattr(budget_guard, "get_exchange_rate_cached", lambda: 1.0)
+    monkeypatch.setattr(budget_guard, "_load_prices_cache", lambda *args, **kwargs: None)
+    monkeypatch.setattr(budget_guard, "_save_prices_cache", lambda *args, **kwargs: None)
+    monkeypatch.setattr(budget_guard, "fetch_gpt4o_mini_prices", fetch_fails)
+    monkeypatch.setattr(budget_guard, "fetch_embedding_small_price", fetch_fails)
+
+
+class TestEstimateCost:
+    """Tests for estimate_cost function."""
+    
+    def test_gpt4o_mini(self):
+        """Should price gpt-4o-mini input and output tokens."""
+        assert estimate_cost(1_000_000, 1_000_000, "gpt-4o-mini") == pytest.approx(0.75)
+    
+    def test_gpt4o_priced_as_itself(self):
+        """Should price the verify model at its own, higher prices."""
+        assert estimate_cost(1_000_000, 1_000_000, "gpt-4o") == pytest.approx(12.50)
+    
+    def test_embedding_output_is_free(self):
+        """Should only charge embedding input tokens."""
+        assert estimate_cost(1_000_000, 500, "text-embedding-3-small") == pytest.approx(0.02)
+    
+    def test_unknown_model_raises(self):
+        """Should refuse to guess the price of an unknown model."""
+        with pytest.raises(ValueError, match="gpt-5"):
+            estimate_cost(1000, 100, "gpt-5")
@@ -0,0 +1,39 @@
+"""
+Unit tests for the document excerpt selection of the LLM extractor.
+"""
+
+from scraper.extractors.llm_extractor import select_document_context
+
+
+def count_words(texts):
+    """Word counts, standing in for a tokenizer."""
+    return [len(text.split()) for text in texts]
+
+
+DOCUMENTS = [
+    "Introdução ao programa. Destina-se a PME com CAE 62010. "
+    "Candidaturas até 30/06/2024. Texto sem interesse!",
+    "Introdução ao programa. Outro documento.\n\nDotação de 500 mil €.",
+]
+
+
+class TestSelectDocumentContext:
+    """Tests for select_document_context function."""
+    
+    def test_keeps_everything_within_budget(self):
+        """Should send every sentence once when the budget allows."""
+        excerpts = select_document_context(DOCUMENTS, count_words, max_tokens=1000)
+        assert excerpts[0].startswith("Introdução ao programa.")
+        assert excerpts[1] == "Outro documento. Dotação de 500 mil €."
+    
+    def test_prefers_relevant_sentences_in_original_order(self):
+        """Should pick sentences with extraction cues first, in reading order."""
+        excerpts = select_document_context(DOCUMENTS, count_words, max_tokens=14)
+        assert excerpts == [
+            "Destina-se a PME com CAE 62010. Candidaturas até 30/06/2024.",
+            "Dotação de 500 mil €.",
+        ]
+    
+    def test_empty_documents(self):
+        """Should return no excerpts for empty documents."""
+        assert select_document_context(["", "  \n"], count_words) == []
@@ -0,0 +1,46 @@
+"""
+Unit tests for skipping texts not worth an embedding.
+"""
+
+from types import SimpleNamespace
+
+from backend.app.models.embedding_text import company_embedding_text
+from scraper.extractors.embedding_service import EmbeddingService, _is_embeddable
+
+
+def company(name, cae_codes=None, district=None, size=None):
+    """Company-like row."""
+    return SimpleNamespace(
+        company_id=name, name=name, cae_codes=cae_codes, district=district, county=None, size=size
+    )
+
+
+class TestIsEmbeddable:
+    """Tests for _is_embeddable function."""
+    
+    def test_name_only_companies_are_skipped_whatever_the_name_length(self):
+        """Should skip a company with nothing but its name, short or long."""
+        assert not _is_embeddable(company_embedding_text(company("Sonae SA")))
+        assert not _is_embeddable(company_embedding_text(company("Farmácia Central do Porto Lda")))
+    
+    def test_any_other_field_makes_a_company_embeddable(self):
+        """Should embed a company with CAE codes, a district or a size."""
+        assert _is_embeddable(company_embedding_text(company("Sonae SA", cae_codes=["47111"])))
+        assert _is_embeddable(company_embedding_text(company("Sonae SA", district="Porto")))
+        assert _is_embeddable(company_embedding_text(company("Sonae SA", size="grande")))
+
+
+class TestSplitNearEmpty:
+    """Tests for EmbeddingService._split_near_empty."""
+    
+    def test_skipped_rows_are_recorded_without_embedding(self):
+        """Should return the skipped rows as records with no embedding and their text."""
+        service = EmbeddingService.__new__(EmbeddingService)
+        rows = [company("Sonae SA"), company("Farmácia", district="Lisboa")]
+        texts = [company_embedding_text(row) for row in rows]
+        
+        kept_rows, kept_texts, skipped = service._split_near_empty(rows, texts, "company_id")
+        
+        assert kept_rows == rows[1:]
+        assert kept_texts == texts[1:]
+        assert skipped == {"Sonae SA": (None, texts[0])}
@@ -0,0 +1,193 @@
+"""
+Unit tests for batched LLM extraction and the Structured Outputs schema.
+"""
+
+import asyncio
+import json
+from decimal import Decimal
+from typing import List, Optional
+
+import pytest
+from pydantic import BaseModel, Field
+
+from scraper.extractors.llm_extractor import (
+    AIDescription,
+    BATCH_EXTRACTION_RESPONSE_FORMAT,
+    EXTRACTION_RESPONSE_FORMAT,
+    LLMExtractor,
+    _extraction_input_key,
+    _strict_json_schema,
+)
+
+
+class StubCache:
+    """In-memory stand-in for the extraction cache."""
+    
+    def __init__(self):
+        self.extractions = {}
+    
+    def get_extraction(self, input_key):
+        return self.extractions.get(input_key)
+    
+    def save_extraction(self, input_key, result_json):
+        self.extractions[input_key] = result_json
+
+
+class StubClient:
+    """
+    Stand-in for ManagedOpenAIClient.
+    
+    Group requests are answered by `group_response(size)`; single
+    extractions return the incentive title as their only CAE.
+    """
+    
+    def __init__(self, group_response=None):
+        self.group_response = group_response
+        self.requests = []
+        self.cache = StubCache()
+    
+    async def chat_completion_async(self, messages, response_format=None, **kwargs):
+        context = messages[-1]["content"]
+        if response_format is BATCH_EXTRACTION_RESPONSE_FORMAT:
+            self.requests.append("group")
+            response = self.group_response(context.count("TÍTULO:"))
+        else:
+            title = context.split("\n", 1)[0].removeprefix("TÍTULO: ")
+            self.requests.append(title)
+            response = json.dumps({"caes": [title]})
+        return {"response": response, "cost_eur": 0.0, "from_cache": False}
+
+
+def group_results(*items):
+    """Group response text with the given result items."""
+    return json.dumps({"results": list(items)})
+
+
+INCENTIVES = [
+    {"incentive_id": f"inc-{i}", "title": f"t{i}", "description": "Apoio a PME"}
+    for i in range(3)
+]
+
+
+def run_batch(client, incentives=INCENTIVES, batch_size=8):
+    """Run aextract_batch on a stub client; returns {incentive_id: caes}."""
+    extractor = LLMExtractor(openai_client=client)
+    results = asyncio.run(extractor.aextract_batch(incentives, batch_size=batch_size))
+    return {incentive_id: ai_desc and ai_desc.caes for incentive_id, ai_desc in results}
+
+
+class TestAextractGroup:
+    """Tests for LLMExtractor._aextract_group."""
+    
+    def test_wrong_length_raises(self):
+        """Should reject a results list that does not match the group."""
+        client = StubClient(lambda size: group_results({"caes": ["1"]}))
+        extractor = LLMExtractor(openai_client=client)
+        
+        with pytest.raises(ValueError, match="expected 3 results, got 1"):
+            asyncio.run(extractor._aextract_group(INCENTIVES))
+    
+    def test_invalid_item_is_none_and_valid_items_cached(self):
+        """Should return None for an invalid item and cache the valid ones."""
+        client = StubClient(lambda size: group_results(
+            {"caes": ["1"]}, {"company_size": ["enorme"]}, {"caes": ["3"]}
+        ))
+        extractor = LLMExtractor(openai_client=client)
+        
+        ai_descs = asyncio.run(extractor._aextract_group(INCENTIVES))
+        
+        assert [ai_desc and ai_desc.caes for ai_desc in ai_descs] == [["1"], None, ["3"]]
+        assert len(client.cache.extractions) == 2
+
+
+class TestAextractBatch:
+    """Tests for LLMExtractor.aextract_batch."""
+    
+    def test_group_results(self):
+        """Should extract a whole group with a single request."""
+        client = StubClient(lambda size: group_results(*({"caes": ["g"]} for _ in range(size))))
+        
+        assert run_batch(client) == {"inc-0": ["g"], "inc-1": ["g"], "inc-2": ["g"]}
+        assert client.requests == ["group"]
+    
+    def test_failed_group_falls_back_to_single_extractions(self):
+        """Should extract each item on its own when the group response is wrong."""
+        client = StubClient(lambda size: group_results({"caes": ["g"]}))
+        
+        assert run_batch(client) == {"inc-0": ["t0"], "inc-1": ["t1"], "inc-2": ["t2"]}
+        assert client.requests[0] == "group"
+        assert sorted(client.requests[1:]) == ["t0", "t1", "t2"]
+    
+    def test_invalid_item_retried_alone(self):
+        """Should only re-extract the items the group response got wrong."""
+        client = StubClient(lambda size: group_results(
+            {"caes": ["g"]}, {"company_size": ["enorme"]}, {"caes": ["g"]}
+        ))
+        
+        assert run_batch(client) == {"inc-0": ["g"], "inc-1": ["t1"], "inc-2": ["g"]}
+        assert client.requests == ["group", "t1"]
+    
+    def test_cached_incentives_not_sent(self):
+        """Should reuse cached extractions and only send the rest."""
+        client = StubClient()
+        cached = INCENTIVES[0]
+        client.cache.save_extraction(
+            _extraction_input_key(cached["title"], cached["description"], None),
+            AIDescription(caes=["cached"]).model_dump_json()
+        )
+        
+        results = run_batch(client, INCENTIVES[:2])
+        
+        assert results == {"inc-0": ["cached"], "inc-1": ["t1"]}
+        assert client.requests == ["t1"]
+
+
+class Funding(BaseModel):
+    """Nested model for the schema tests."""
+    
+    amount: Optional[Decimal] = Field(default=None, description="Amount in EUR")
+
+
+class Program(BaseModel):
+    """Model for the schema tests."""
+    
+    name: str = Field(description="Program name")
+    regions: List[str] = Field(default_factory=list)
+    funding: Funding = Field(default_factory=Funding)
+
+
+class TestStrictJsonSchema:
+    """Tests for _strict_json_schema function."""
+    
+    def test_every_object_strict(self):
+        """Should require every property and forbid others, nested objects included."""
+        schema = _strict_json_schema(Program.model_json_schema())
+        
+        assert schema["required"] == ["name", "regions", "funding"]
+        assert schema["additionalProperties"] is False
+        funding = schema["$defs"]["Funding"]
+        assert funding["required"] == ["amount"]
+        assert funding["additionalProperties"] is False
+    
+    def test_annotations_dropped(self):
+        """Should drop titles, descriptions and defaults but keep property names."""
+        schema = _strict_json_schema(Program.model_json_schema())
+        
+        assert "title" not in schema
+        assert schema["properties"]["name"] == {"type": "string"}
+        assert schema["properties"]["regions"] == {"type": "array", "items": {"type": "string"}}
+    
+    def test_decimal_accepts_numbers_only(self):
+        """Should keep a nullable number for optional Decimal fields."""
+        schema = _strict_json_schema(Program.model_json_schema())
+        
+        assert schema["$defs"]["Funding"]["properties"]["amount"] == {
+            "anyOf": [{"type": "number"}, {"type": "null"}]
+        }
+    
+    def test_response_formats_are_strict(self):
+        """Should send strict schemas for single and batched extraction."""
+        for response_format in (EXTRACTION_RESPONSE_FORMAT, BATCH_EXTRACTION_RESPONSE_FORMAT):
+            json_schema = response_format["json_schema"]
+            assert json_schema["strict"] is True
+            assert json_schema["schema"]["additionalProperties"] is False
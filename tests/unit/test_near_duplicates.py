@@ -0,0 +1,61 @@
+"""
+Unit tests for the near-duplicate embedding index.
+"""
+
+import pytest
+from scraper.extractors.near_duplicates import simhash, NearDuplicateIndex
+
+
+BASE = (
+    "Título: Apoio à inovação 2023\n"
+    "CAE: 62010, 62020\n"
+    "Localização: Norte\n"
+    "Objetivos: digitalização, inovação produtiva, internacionalização das PME"
+)
+
+
+class TestSimhash:
+    """Tests for simhash function."""
+    
+    def test_ignores_accents_and_case(self):
+        """Should give the same signature when only accents or case change."""
+        variant = BASE.replace("à inovação", "A INOVACAO")
+        assert simhash(BASE) == simhash(variant)
+    
+    def test_numbers_are_shingled(self):
+        """Should change the signature when a number changes."""
+        assert simhash(BASE) != simhash(BASE.replace("62020", "10711"))
+    
+    def test_different_texts_are_far_apart(self):
+        """Should give distant signatures for unrelated texts."""
+        other = "Título: Programa de eficiência energética\nLocalização: Alentejo"
+        assert (simhash(BASE) ^ simhash(other)).bit_count() > 3
+
+
+class TestNearDuplicateIndex:
+    """Tests for NearDuplicateIndex class."""
+    
+    def test_returns_embedding_of_near_duplicate(self):
+        """Should return the embedding indexed for a near-identical text."""
+        index = NearDuplicateIndex(max_bits=3)
+        index.add(BASE, [0.1, 0.2])
+        assert index.get(BASE.replace("inovação produtiva", "INOVACAO PRODUTIVA")) == [0.1, 0.2]
+        assert len(index) == 1
+    
+    def test_different_numbers_never_match(self):
+        """Should not reuse an embedding across texts with other CAE codes or years."""
+        index = NearDuplicateIndex(max_bits=3)
+        index.add(BASE, [0.1, 0.2])
+        assert index.get(BASE.replace("62020", "62090")) is None
+        assert index.get(BASE.replace("2023", "2024")) is None
+    
+    def test_returns_none_for_unrelated_text(self):
+        """Should return None when nothing close enough is indexed."""
+        index = NearDuplicateIndex(max_bits=3)
+        index.add(BASE, [0.1, 0.2])
+        assert index.get("Empresa: Padaria Central\nCAE: 10711") is None
+    
+    def test_rejects_distance_the_blocks_cannot_guarantee(self):
+        """Should reject max_bits that the block split cannot find."""
+        with pytest.raises(ValueError):
+            NearDuplicateIndex(max_bits=4)
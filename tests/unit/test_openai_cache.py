@@ -0,0 +1,214 @@
+"""
+Unit tests for the SQLite OpenAI cache.
+"""
+
+import hashlib
+import sqlite3
+
+import numpy as np
+import pytest
+
+from backend.app.services import openai_cache
+from backend.app.services.openai_cache import OpenAICache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Cache in a temporary database."""
+    cache = OpenAICache(str(tmp_path / "cache.db"))
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def use_key_scheme(monkeypatch):
+    """Function switching new keys to a scheme (BLAKE2b stands in for BLAKE3 as "b3")."""
+    monkeypatch.setitem(openai_cache._KEY_HASHERS, "b3", hashlib.blake2b)
+    
+    def use(scheme):
+        monkeypatch.setattr(openai_cache, "KEY_SCHEME", scheme)
+        monkeypatch.setattr(openai_cache, "_key_hasher", openai_cache._KEY_HASHERS[scheme])
+    
+    return use
+
+
+def stored_keys(cache, table, column):
+    """Keys of every row of a cache table."""
+    return [row[0] for row in cache._conn.execute(f"SELECT {column} FROM {table}")]
+
+
+PARAMS = {"temperature": 0.0}
+
+
+def save_response(cache, cache_key):
+    """Store a canned response under the given key."""
+    cache.save_llm_response(
+        "prompt", "gpt-4o-mini", PARAMS, "resposta", None, 10, 2, 0.001, cache_key=cache_key
+    )
+
+
+class TestKeyMigration:
+    """Tests for the lazy move of rows stored under legacy keys."""
+    
+    def test_unversioned_prompt_key(self, cache):
+        """Should find a response stored under the plain SHA-256 key and rekey it."""
+        legacy_key = cache._legacy_prompt_keys("prompt", "gpt-4o-mini", PARAMS)[0]
+        save_response(cache, legacy_key)
+        
+        cached = cache.get_llm_response("prompt", "gpt-4o-mini", PARAMS)
+        
+        assert cached["response"] == "resposta"
+        assert stored_keys(cache, "llm_cache", "cache_key") == [
+            cache.prompt_key("prompt", "gpt-4o-mini", PARAMS)
+        ]
+    
+    def test_s256_prompt_key_moves_to_b3(self, cache, use_key_scheme):
+        """Should move a response saved without BLAKE3 to its b3 key."""
+        use_key_scheme("s256")
+        save_response(cache, cache.prompt_key("prompt", "gpt-4o-mini", PARAMS))
+        use_key_scheme("b3")
+        
+        cached = cache.get_llm_response("prompt", "gpt-4o-mini", PARAMS)
+        
+        assert cached["response"] == "resposta"
+        [key] = stored_keys(cache, "llm_cache", "cache_key")
+        assert key.startswith("b3:")
+        assert key == cache.prompt_key("prompt", "gpt-4o-mini", PARAMS)
+    
+    def test_s256_embedding_keys_move_to_b3(self, tmp_path, use_key_scheme):
+        """Should move embeddings saved without BLAKE3 to their b3 keys in one batch."""
+        path = str(tmp_path / "cache.db")
+        use_key_scheme("s256")
+        writer = OpenAICache(path)
+        for text in ("um", "dois"):
+            writer.save_embedding(text, "text-embedding-3-small", [0.5, 0.25], 2, 0.0001)
+        writer.close()
+        
+        use_key_scheme("b3")
+        reader = OpenAICache(path)
+        
+        cached = reader.get_embeddings_batch(["um", "dois", "três"], "text-embedding-3-small")
+        
+        assert [entry and entry["embedding"] for entry in cached] == [[0.5, 0.25], [0.5, 0.25], None]
+        keys = stored_keys(reader, "embedding_cache", "text_hash")
+        assert len(keys) == 2 and all(key.startswith("b3:") for key in keys)
+        reader.close()
+
+
+class TestEmbeddingStorage:
+    """Tests for the float16 embedding storage."""
+    
+    EMBEDDING = [0.1, -0.5, 1 / 3, 0.0]
+    
+    def test_round_trip(self, tmp_path):
+        """Should return float16 precision floats, the same from memory and from disk."""
+        path = str(tmp_path / "cache.db")
+        writer = OpenAICache(path)
+        writer.save_embedding("texto", "text-embedding-3-small", self.EMBEDDING, 4, 0.0001)
+        from_memory = writer.get_embedding("texto", "text-embedding-3-small")
+        writer.close()
+        
+        reader = OpenAICache(path)
+        from_disk = reader.get_embedding("texto", "text-embedding-3-small")
+        reader.close()
+        
+        assert from_disk == from_memory
+        assert from_disk["dimension"] == 4
+        assert all(isinstance(value, float) for value in from_disk["embedding"])
+        np.testing.assert_allclose(from_disk["embedding"], self.EMBEDDING, atol=1e-3)
+    
+    def test_stored_as_float16_blob(self, cache):
+        """Should store 2 bytes per dimension."""
+        cache.save_embedding("texto", "text-embedding-3-small", self.EMBEDDING, 4, 0.0001)
+        
+        blob, dtype = cache._conn.execute(
+            "SELECT embedding_blob, dtype FROM embedding_cache"
+        ).fetchone()
+        
+        assert dtype == "float16"
+        assert len(blob) == 2 * len(self.EMBEDDING)
+    
+    def test_no_json_copy(self, cache):
+        """Should leave embedding_json NULL for blob rows."""
+        cache.save_embedding("texto", "text-embedding-3-small", self.EMBEDDING, 4, 0.0001)
+        
+        assert cache._conn.execute("SELECT embedding_json FROM embedding_cache").fetchone() == (None,)
+    
+    def test_older_not_null_table_is_rebuilt(self, tmp_path):
+        """Should relax embedding_json on an older cache and keep its rows readable."""
+        path = tmp_path / "cache.db"
+        conn = sqlite3.connect(path)
+        conn.execute("""
+            CREATE TABLE embedding_cache (
+                text_hash TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                embedding_json TEXT NOT NULL,
+                dimension INTEGER NOT NULL,
+                tokens INTEGER NOT NULL,
+                cost_eur REAL NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_accessed TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                access_count INTEGER DEFAULT 1
+            )
+        """)
+        legacy_key = hashlib.sha256(b"text-embedding-3-small::antigo").hexdigest()
+        conn.execute(
+            "INSERT INTO embedding_cache (text_hash, model, embedding_json, dimension, tokens, cost_eur) "
+            "VALUES (?, 'text-embedding-3-small', '[0.5, 0.25]', 2, 2, 0.0001)",
+            (legacy_key,)
+        )
+        conn.commit()
+        conn.close()
+        
+        cache = OpenAICache(str(path))
+        
+        not_null = {row[1]: row[3] for row in cache._conn.execute("PRAGMA table_info(embedding_cache)")}
+        assert not_null["embedding_json"] == 0
+        assert cache.get_embedding("antigo", "text-embedding-3-small")["embedding"] == [0.5, 0.25]
+        cache.close()
+
+
+class TestGetStats:
+    """Tests for OpenAICache.get_stats."""
+    
+    def test_day_with_misses_only(self, cache):
+        """Should count zero hits when no request came from cache."""
+        cache.track_cost("gpt-4o-mini", "chat_completion", 100, 20, 0.001, from_cache=False)
+        
+        stats = cache.get_stats()
+        
+        assert stats["cache"]["hits"] == 0
+        assert stats["cache"]["misses"] == 1
+        assert stats["by_model"]["gpt-4o-mini"]["count"] == 1
+    
+    def test_day_with_hits_only(self, cache):
+        """Should report no actual cost when every request came from cache."""
+        cache.track_cost("gpt-4o-mini", "chat_completion", 100, 20, 0.0, from_cache=True)
+        
+        stats = cache.get_stats()
+        
+        assert stats["cache"] == {"hits": 1, "misses": 0, "actual_cost_eur": 0.0}
+    
+    def test_batched_rows_count_every_request(self, cache):
+        """Should count each request of an aggregated batch row."""
+        cache.track_costs_batch([
+            {"model": "gpt-4o-mini", "operation": "chat_completion", "input_tokens": 10,
+             "output_tokens": 5, "cost_eur": 0.01, "from_cache": False},
+            {"model": "gpt-4o-mini", "operation": "chat_completion", "input_tokens": 10,
+             "output_tokens": 5, "cost_eur": 0.01, "from_cache": False},
+            {"model": "gpt-4o-mini", "operation": "chat_completion", "input_tokens": 10,
+             "output_tokens": 5, "cost_eur": 0.0, "from_cache": True},
+        ])
+        
+        stats = cache.get_stats()
+        
+        assert stats["cache"]["hits"] == 1
+        assert stats["cache"]["misses"] == 2
+        assert stats["total_cost_eur"] == pytest.approx(0.02)
+    
+    def test_empty_day(self, cache):
+        """Should return zeros for a day without requests."""
+        stats = cache.get_stats("2000-01-01")
+        
+        assert stats["total_cost_eur"] == 0.0
+        assert stats["cache"] == {"hits": 0, "misses": 0, "actual_cost_eur": 0.0}
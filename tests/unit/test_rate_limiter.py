@@ -0,0 +1,38 @@
+"""
+Unit tests for the token-bucket rate limiter.
+"""
+
+import time
+
+import pytest
+from backend.app.services.rate_limiter import RateLimiter
+
+
+class TestRateLimiter:
+    """Tests for RateLimiter class."""
+    
+    def test_burst_up_to_capacity_does_not_wait(self):
+        """Should let the first `calls` requests through right away."""
+        limiter = RateLimiter(calls=5, period=60.0)
+        assert [limiter._reserve() for _ in range(5)] == [0.0] * 5
+    
+    def test_waits_are_queued_in_order(self):
+        """Should give each request past the burst its own, later slot."""
+        limiter = RateLimiter(calls=2, period=1.0)
+        delays = [limiter._reserve() for _ in range(4)]
+        assert delays[:2] == [0.0, 0.0]
+        assert delays[2] == pytest.approx(0.5, abs=0.05)
+        assert delays[3] == pytest.approx(1.0, abs=0.05)
+    
+    def test_tokens_refill_over_time(self):
+        """Should not wait again once the period has refilled the bucket."""
+        limiter = RateLimiter(calls=20, period=1.0)
+        for _ in range(20):
+            limiter._reserve()
+        time.sleep(0.1)
+        assert limiter._reserve() == 0.0
+    
+    def test_rejects_non_positive_calls(self):
+        """Should raise on a limit of zero calls."""
+        with pytest.raises(ValueError):
+            RateLimiter(calls=0)
@@ -0,0 +1,41 @@
+"""
+Unit tests for the in-process TTL cache.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.app.services.ttl_cache import TTLCache
+
+
+class TestTTLCache:
+    """Tests for TTLCache class."""
+    
+    def test_expired_entry_is_dropped(self):
+        """Should return None for, and forget, an expired entry."""
+        cache = TTLCache(ttl_sec=-1)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+    
+    def test_least_recently_used_is_evicted(self):
+        """Should evict the entry read least recently when full."""
+        cache = TTLCache(max_items=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    
+    def test_shared_between_threads(self):
+        """Should not fail when threads expire and evict the same keys."""
+        cache = TTLCache(max_items=4, ttl_sec=0)
+        
+        def churn(worker: int) -> None:
+            for i in range(5000):
+                cache.set(i % 8, worker)
+                cache.get((i + worker) % 8)
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(churn, range(8)))
+        
+        assert len(cache) <= 4